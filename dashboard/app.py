@@ -8,6 +8,8 @@ Provides real-time monitoring of corporate client health, experience, and cost m
 import streamlit as st
 from pathlib import Path
 
+from utils.data_loader import start_table_watcher
+
 # Page configuration - must be first Streamlit command
 st.set_page_config(
     page_title="IVI Dashboard - Bupa Arabia",
@@ -113,6 +115,9 @@ st.markdown("""
 def main():
     """Main application entry point."""
     
+    # Refresh cached tables when the scoring job rewrites them
+    start_table_watcher()
+    
     # Sidebar navigation
     st.sidebar.markdown("### Bupa Arabia")
     st.sidebar.markdown("## IVI Dashboard")
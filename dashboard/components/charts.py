@@ -3,10 +3,13 @@ Reusable chart components for IVI Dashboard.
 Uses Plotly for interactive visualizations.
 """
 
+import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from typing import Optional, List, Dict
 
+from .figure_cache import cache_figure
+
 
 # Bupa Arabia color scheme
 COLORS = {
@@ -164,37 +167,57 @@ def create_subscore_gauges(
     return fig
 
 
+@cache_figure
 def create_ivi_distribution(
-    scores: List[float],
+    scores: Optional[List[float]] = None,
     selected_score: Optional[float] = None,
-    height: int = 300
+    height: int = 300,
+    bin_counts: Optional[Dict[str, List[int]]] = None,
+    bin_width: int = 5
 ) -> go.Figure:
     """
     Create a histogram showing IVI score distribution.
     
+    Bars are binned on the server, so the figure carries one value per bin
+    and risk tier rather than one per contract.
+    
     Args:
-        scores: List of IVI scores
+        scores: List of IVI scores (ignored when bin_counts is given)
         selected_score: Optional score to highlight
         height: Chart height in pixels
+        bin_counts: Precomputed counts per bin, keyed by IVI_RISK
+            (e.g. from aggregates.score_bin_counts)
+        bin_width: Score points per bin
     
     Returns:
         Plotly figure object
     """
+    n_bins = -(-100 // bin_width)
+    
+    if bin_counts is None:
+        values = np.clip(np.asarray(scores if scores is not None else [], dtype=np.float64), 0, 99.999)
+        bin_index = (values // bin_width).astype(np.int64)
+        risk = np.where(values < 30, 'HIGH_RISK', np.where(values < 60, 'MODERATE_RISK', 'LOW_RISK'))
+        bin_counts = {
+            level: np.bincount(bin_index[risk == level], minlength=n_bins).tolist()
+            for level in RISK_COLORS
+        }
+    
     fig = go.Figure()
     
-    # Create histogram with risk-based coloring
-    fig.add_trace(go.Histogram(
-        x=scores,
-        nbinsx=20,
-        marker_color=[
-            COLORS['danger'] if s < 30 else 
-            COLORS['warning'] if s < 60 else 
-            COLORS['success']
-            for s in scores
-        ],
-        opacity=0.7,
-        name='Contracts'
-    ))
+    # Stacked bars with risk-based coloring
+    centers = [(i + 0.5) * bin_width for i in range(n_bins)]
+    for level, color in RISK_COLORS.items():
+        if level not in bin_counts:
+            continue
+        fig.add_trace(go.Bar(
+            x=centers,
+            y=bin_counts[level],
+            width=bin_width * 0.95,
+            marker_color=color,
+            opacity=0.7,
+            name=level
+        ))
     
     # Add selected score marker if provided
     if selected_score is not None:
@@ -219,6 +242,7 @@ def create_ivi_distribution(
         height=height,
         margin=dict(l=50, r=20, t=50, b=50),
         showlegend=False,
+        barmode='stack',
         bargap=0.05
     )
     
@@ -273,6 +297,7 @@ def create_risk_pie_chart(
     return fig
 
 
+@cache_figure
 def create_segment_heatmap(segment_data: Dict[str, int], height: int = 400) -> go.Figure:
     """
     Create a heatmap showing contract counts by segment.
@@ -329,6 +354,7 @@ def create_segment_heatmap(segment_data: Dict[str, int], height: int = 400) -> g
     return fig
 
 
+@cache_figure
 def create_cost_waterfall(
     base: float,
     demographics: float,
@@ -378,6 +404,7 @@ def create_cost_waterfall(
     return fig
 
 
+@cache_figure
 def create_radar_comparison(
     client_values: Dict[str, float],
     benchmark_values: Dict[str, float],
@@ -441,6 +468,7 @@ def create_radar_comparison(
     return fig
 
 
+@cache_figure
 def create_kpi_bar_comparison(
     client_value: float,
     benchmark_value: float,
@@ -492,6 +520,7 @@ def create_kpi_bar_comparison(
     return fig
 
 
+@cache_figure
 def create_trend_line(
     dates: List[str],
     values: List[float],
@@ -534,6 +563,122 @@ def create_trend_line(
     return fig
 
 
+@cache_figure
+def create_scatter_gl(
+    x_values: List[float],
+    y_values: List[float],
+    groups: List[str],
+    sizes: Optional[List[float]] = None,
+    x_title: str = '',
+    y_title: str = '',
+    title: str = '',
+    height: int = 500
+) -> go.Figure:
+    """
+    Create a WebGL scatter plot colored by risk tier.
+
+    Args:
+        x_values: X values
+        y_values: Y values
+        groups: IVI_RISK label per point
+        sizes: Optional marker size weights (e.g. member counts)
+        x_title: X-axis title
+        y_title: Y-axis title
+        title: Chart title
+        height: Chart height in pixels
+
+    Returns:
+        Plotly figure object
+    """
+    # Scale size weights to 4-20px by square root, like a bubble chart
+    if sizes is not None:
+        max_size = max(sizes) or 1
+        marker_sizes = [4 + 16 * (s / max_size) ** 0.5 for s in sizes]
+    else:
+        marker_sizes = [6] * len(x_values)
+
+    fig = go.Figure()
+
+    for risk, color in RISK_COLORS.items():
+        idx = [i for i, g in enumerate(groups) if g == risk]
+        if not idx:
+            continue
+        fig.add_trace(go.Scattergl(
+            x=[x_values[i] for i in idx],
+            y=[y_values[i] for i in idx],
+            mode='markers',
+            name=risk,
+            marker=dict(
+                color=color,
+                size=[marker_sizes[i] for i in idx],
+                opacity=0.6,
+                line=dict(width=0)
+            )
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        height=height,
+        margin=dict(l=50, r=20, t=50, b=50)
+    )
+
+    return fig
+
+
+@cache_figure
+def create_density_heatmap(
+    x_edges: List[float],
+    y_edges: List[float],
+    counts: List[List[float]],
+    x_title: str = '',
+    y_title: str = '',
+    title: str = '',
+    height: int = 500
+) -> go.Figure:
+    """
+    Create a 2D density heatmap from precomputed bin counts.
+
+    Args:
+        x_edges: X bin edges
+        y_edges: Y bin edges
+        counts: Counts per cell (rows = y bins, columns = x bins)
+        x_title: X-axis title
+        y_title: Y-axis title
+        title: Chart title
+        height: Chart height in pixels
+
+    Returns:
+        Plotly figure object
+    """
+    x_centers = [(a + b) / 2 for a, b in zip(x_edges[:-1], x_edges[1:])]
+    y_centers = [(a + b) / 2 for a, b in zip(y_edges[:-1], y_edges[1:])]
+
+    fig = go.Figure(data=go.Heatmap(
+        z=[[c if c > 0 else None for c in row] for row in counts],
+        x=x_centers,
+        y=y_centers,
+        colorscale=[
+            [0, '#E8F4FD'],
+            [0.5, COLORS['secondary']],
+            [1, COLORS['primary']]
+        ],
+        hoverongaps=False,
+        colorbar={'title': 'Contracts'}
+    ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        height=height,
+        margin=dict(l=50, r=20, t=50, b=50)
+    )
+
+    return fig
+
+
 def format_metric(value: float, format_spec: str) -> str:
     """
     Format a metric value for display.
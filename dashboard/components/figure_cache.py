@@ -0,0 +1,167 @@
+"""
+Figure memoization for the IVI Dashboard chart builders.
+
+Builders decorated with cache_figure are keyed on a cheap fingerprint of
+their arguments. Each figure is stored once as serialized JSON in a
+process-wide LRU bounded by FIGURE_CACHE_BYTES. Calls return a
+SerializedFigure that hands the cached spec to st.plotly_chart as is, so
+reruns that don't change a chart's inputs skip building, validating and
+converting the figure again. Only builders whose figures are costly to
+build (many points or cells) are worth wrapping.
+"""
+
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Total size of cached figure JSON
+FIGURE_CACHE_BYTES = 64 * 1024 * 1024
+
+_figures: 'OrderedDict[str, str]' = OrderedDict()
+_figures_bytes = 0
+_figures_lock = threading.Lock()
+
+
+def _update_fingerprint(h, value: Any) -> None:
+    """Feed one argument into a running hash."""
+    if isinstance(value, np.ndarray):
+        h.update(f'ndarray:{value.dtype}:{value.shape}'.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        try:
+            values = np.asarray(value)
+        except (TypeError, ValueError):
+            values = None
+        if values is not None and values.ndim == 1 and values.dtype.kind in 'biuf':
+            # Numeric and boolean lists only; strings and objects are hashed item by item
+            h.update(f'array:{values.dtype}:{len(values)}'.encode())
+            h.update(values.tobytes())
+        else:
+            h.update(f'{type(value).__name__}:{len(value)}'.encode())
+            for item in value:
+                _update_fingerprint(h, item)
+    elif isinstance(value, dict):
+        h.update(f'dict:{len(value)}'.encode())
+        for key in sorted(value, key=repr):
+            h.update(repr(key).encode())
+            _update_fingerprint(h, value[key])
+    elif hasattr(value, 'hash_rows'):
+        # Polars DataFrame
+        h.update(f'polars:{value.schema}'.encode())
+        h.update(value.hash_rows(seed=0).to_numpy().tobytes())
+    else:
+        h.update(repr(value).encode())
+
+
+def figure_fingerprint(name: str, args: tuple, kwargs: dict) -> str:
+    """
+    Fingerprint a chart builder call.
+
+    Args:
+        name: Qualified builder name
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Hex digest identifying the call
+    """
+    h = hashlib.blake2b(name.encode(), digest_size=16)
+    _update_fingerprint(h, args)
+    _update_fingerprint(h, kwargs)
+    return h.hexdigest()
+
+
+def figure_json(builder: Callable[..., go.Figure], *args, **kwargs) -> str:
+    """
+    Serialized figure JSON for a builder call, built at most once per fingerprint.
+
+    Args:
+        builder: Chart builder returning a Plotly figure
+        *args: Builder positional arguments
+        **kwargs: Builder keyword arguments
+
+    Returns:
+        Figure JSON string
+    """
+    global _figures_bytes
+
+    key = figure_fingerprint(f'{builder.__module__}.{builder.__qualname__}', args, kwargs)
+
+    with _figures_lock:
+        cached = _figures.get(key)
+        if cached is not None:
+            _figures.move_to_end(key)
+            return cached
+
+    serialized = builder(*args, **kwargs).to_json()
+
+    with _figures_lock:
+        if key not in _figures and len(serialized) <= FIGURE_CACHE_BYTES:
+            _figures[key] = serialized
+            _figures_bytes += len(serialized)
+            while _figures_bytes > FIGURE_CACHE_BYTES:
+                _, evicted = _figures.popitem(last=False)
+                _figures_bytes -= len(evicted)
+
+    return serialized
+
+
+class SerializedFigure(go.Figure):
+    """
+    Read-only figure backed by cached, already validated figure JSON.
+
+    st.plotly_chart takes a figure's to_dict() as is, whereas a plain dict
+    would be rebuilt and validated as a go.Figure. This class returns the
+    cached spec without building any traces. Use figure() for an editable
+    copy.
+    """
+
+    def __init__(self, serialized: str):
+        super().__init__()
+        self._serialized = serialized
+        self._spec = json.loads(serialized)
+
+    def to_dict(self) -> dict:
+        return self._spec
+
+    def to_plotly_json(self) -> dict:
+        return self._spec
+
+    def to_json(self, *args, **kwargs) -> str:
+        return self._serialized
+
+    def figure(self) -> go.Figure:
+        """Editable go.Figure of the cached spec."""
+        return go.Figure(self._spec, _validate=False)
+
+
+def cache_figure(builder: Callable[..., go.Figure]) -> Callable[..., SerializedFigure]:
+    """
+    Memoize a chart builder.
+
+    Args:
+        builder: Chart builder returning a Plotly figure
+
+    Returns:
+        Wrapped builder returning a SerializedFigure for st.plotly_chart
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs) -> SerializedFigure:
+        return SerializedFigure(figure_json(builder, *args, **kwargs))
+
+    return wrapper
+
+
+def clear_figure_cache() -> None:
+    """Drop every cached figure."""
+    global _figures_bytes
+
+    with _figures_lock:
+        _figures.clear()
+        _figures_bytes = 0
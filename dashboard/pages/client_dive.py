@@ -5,8 +5,8 @@ Provides detailed analysis of individual client contracts.
 """
 
 import streamlit as st
-import polars as pl
 import sys
+import time
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -14,13 +14,23 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.data_loader import (
     load_ivi_scores,
+    load_ivi_scores_filtered,
     load_shap_subscores,
+    load_ivi_index,
+    load_shap_index,
+    load_search_index,
     get_client_details,
+    get_client_shap,
     get_benchmark_stats,
+    get_benchmarks,
+    score_whatif,
     KPI_DEFINITIONS,
     SEGMENT_RECOMMENDATIONS
 )
+from utils.benchmarks import benchmark_name
+from utils.search import search_contracts, SEARCH_PAGE_SIZE
 from utils.recommendations import generate_recommendations, get_kpi_assessment
+from utils.whatif import WHATIF_KPIS
 from components.charts import (
     create_ivi_gauge,
     create_subscore_gauges,
@@ -40,41 +50,58 @@ def render_page():
         unsafe_allow_html=True
     )
     
-    # Load data
+    # Sidebar filters
+    selected_year = st.session_state.get('selected_year', '2022')
+    min_members = st.session_state.get('min_members', 5)
+    
+    # Load data (filtered frame drives the contract list and benchmarks)
     try:
         df = load_ivi_scores()
+        df_filtered = load_ivi_scores_filtered(year=selected_year, min_members=min_members)
         shap_df = load_shap_subscores()
+        ivi_index = load_ivi_index()
+        shap_index = load_shap_index()
+        search_index = load_search_index(year=selected_year, min_members=min_members)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return
     
-    # Apply year filter
-    selected_year = st.session_state.get('selected_year', '2022')
-    if selected_year:
-        df_filtered = df.filter(pl.col('YEAR') == selected_year)
-    else:
-        df_filtered = df
-    
-    # Apply minimum members filter
-    min_members = st.session_state.get('min_members', 5)
-    df_filtered = df_filtered.filter(pl.col('TOTAL_MEMBERS') >= min_members)
-    
     # Client selector
     st.markdown("### Select Client")
     
     col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
-        # Get unique contract numbers
-        contracts = df_filtered['CONTRACT_NO'].unique().sort().to_list()
+        # Search server-side; only one page of matches goes to the selectbox
+        query = st.text_input(
+            "Search",
+            placeholder="Contract number, client name or region...",
+            on_change=lambda: st.session_state.update(contract_page=1)
+        )
+        
+        page = st.session_state.get('contract_page', 1) - 1
+        contracts, total_matches = search_contracts(search_index, query, page=page)
+        page_count = max(1, -(-total_matches // SEARCH_PAGE_SIZE))
+        if page >= page_count:
+            # Sidebar filters shrank the result set below the current page
+            st.session_state['contract_page'] = 1
+            contracts, total_matches = search_contracts(search_index, query)
         
-        # Search/select contract
         selected_contract = st.selectbox(
             "Contract Number",
             contracts,
             index=0 if contracts else None,
-            placeholder="Search or select a contract..."
+            placeholder="Search or select a contract...",
+            help=f"{total_matches:,} matching contracts"
         )
+        
+        if page_count > 1:
+            st.number_input(
+                f"Page (of {page_count})",
+                min_value=1,
+                max_value=page_count,
+                key='contract_page'
+            )
     
     with col2:
         # Quick filter by risk
@@ -100,18 +127,20 @@ def render_page():
         return
     
     # Get client details
-    client_data = get_client_details(df, selected_contract, year_select)
+    client_data = get_client_details(df, selected_contract, year_select, index=ivi_index)
     
     if not client_data:
         st.warning(f"No data found for contract {selected_contract} in {year_select}")
         return
     
     # Get benchmark stats
-    benchmark = get_benchmark_stats(df_filtered)
+    benchmark = get_benchmarks(year=selected_year, min_members=min_members)
+    if benchmark is None:
+        benchmark = get_benchmark_stats(df_filtered)
     
     # Get SHAP subscores if available
-    shap_client = shap_df.filter(pl.col('CONTRACT_NO') == selected_contract)
-    has_shap = shap_client.height > 0
+    shap_row = get_client_shap(shap_df, selected_contract, year_select, index=shap_index)
+    has_shap = shap_row is not None
     
     st.markdown("---")
     
@@ -176,7 +205,6 @@ def render_page():
     
     # Get subscores from SHAP or rule-based
     if has_shap:
-        shap_row = shap_client.row(0, named=True)
         h_score = shap_row.get('H_SCORE', 50)
         e_score = shap_row.get('E_SCORE', 50)
         u_score = shap_row.get('U_SCORE', 50)
@@ -235,6 +263,11 @@ def render_page():
     
     st.markdown("---")
     
+    # What-if simulator (live rescoring with the production model)
+    render_whatif_panel(client_data, benchmark, has_shap)
+    
+    st.markdown("---")
+    
     # Recommendations section
     st.markdown("### Recommended Actions")
     
@@ -291,6 +324,87 @@ def render_page():
         )
 
 
+def whatif_slider_range(kpi: str, current: float, bench_val) -> tuple:
+    """Slider (max, step) for a KPI: rates span 0-1, others twice the larger of client and benchmark."""
+    if '%' in KPI_DEFINITIONS[kpi]['format']:
+        return 1.0, 0.01
+    top = max(current, bench_val or 0.0) * 2 or 1.0
+    step = float(f'{top / 100:.1g}')
+    return round(-(-top // step) * step, 10), step
+
+
+def render_whatif_panel(client_data: dict, benchmark: dict, has_shap: bool):
+    """Render the what-if simulator: KPI sliders and the rescored IVI / H / E / U."""
+    contract_no, year = client_data['CONTRACT_NO'], client_data['YEAR']
+    
+    st.markdown("### What-if Simulator")
+    st.caption(
+        "Adjust KPIs to rescore this contract with the production model. "
+        "All slider changes are applied together; every other feature keeps the contract's values."
+    )
+    
+    try:
+        baseline = score_whatif(contract_no, year)
+    except Exception as e:
+        st.info(f"What-if scoring unavailable: {e}")
+        return
+    if baseline is None:
+        st.info("This contract-year is not in the scored population.")
+        return
+    
+    kpis = [k for k in WHATIF_KPIS if client_data.get(k) is not None]
+    keys = [f'whatif_{contract_no}_{year}_{k}' for k in kpis]
+    
+    col1, col2 = st.columns([3, 2])
+    
+    with col1:
+        changes = []
+        for kpi, key in zip(kpis, keys):
+            definition = KPI_DEFINITIONS[kpi]
+            current = float(client_data[kpi])
+            top, step = whatif_slider_range(kpi, current, benchmark.get(benchmark_name(kpi)))
+            value = st.slider(
+                definition['name'],
+                min_value=0.0,
+                max_value=max(top, current),
+                value=current,
+                step=step,
+                key=key,
+                help=f"Current: {current:{definition['format']}}",
+            )
+            if abs(value - current) > step / 2:
+                changes.append((kpi, round(value, 10)))
+        
+        st.button(
+            "Reset",
+            on_click=lambda: [st.session_state.pop(key, None) for key in keys],
+        )
+    
+    with col2:
+        start = time.perf_counter()
+        result = score_whatif(contract_no, year, tuple(changes))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        st.metric(
+            "IVI Score",
+            f"{result['IVI_SCORE']:.1f}",
+            delta=f"{result['IVI_SCORE'] - baseline['IVI_SCORE']:+.1f}",
+        )
+        st.markdown(f"**Risk:** {result['IVI_RISK'].replace('_', ' ')}")
+        
+        # Same H/E/U source as the dimension panels above
+        suffix = '' if has_shap and 'H_SCORE' in result else '_RULE'
+        for dim, label in [('H', 'Health (H)'), ('E', 'Experience (E)'), ('U', 'Cost (U)')]:
+            score_key = f'{dim}_SCORE{suffix}'
+            st.metric(
+                label,
+                f"{result[score_key]:.0f}",
+                delta=f"{result[score_key] - baseline[score_key]:+.1f}",
+            )
+        
+        st.caption(f"Rescored in {elapsed_ms:.1f} ms")
+
+
 def render_dimension_panel(
     title: str,
     score: float,
@@ -324,8 +438,8 @@ def render_dimension_panel(
     for kpi_key, kpi_name, kpi_format in kpis:
         client_val = client_data.get(kpi_key, 0)
         
-        # Get benchmark key (convert to lowercase with prefix)
-        benchmark_key = f"avg_{kpi_key.lower()}"
+        # Get benchmark key (e.g. LOSS_RATIO -> avg_loss_ratio)
+        benchmark_key = benchmark_name(kpi_key)
         bench_val = benchmark.get(benchmark_key, client_val)
         
         # Handle percentage formatting
@@ -10,17 +10,23 @@ import plotly.express as px
 import plotly.graph_objects as go
 import sys
 from pathlib import Path
+from typing import Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.data_loader import (
-    load_ivi_scores,
+    load_ivi_scores_filtered,
     load_feature_importance,
+    load_correlation_matrix,
+    load_kpi_sketch,
     KPI_DEFINITIONS,
     FEATURE_GROUPS
 )
-from components.charts import COLORS
+from utils.correlation import kpi_correlations
+from utils.distributions import merge_sketch, sketch_quantiles, sketch_box_stats
+from utils.sampling import SCATTER_POINT_LIMIT, downsample_points, bin_points
+from components.charts import COLORS, create_scatter_gl, create_density_heatmap
 
 
 def render_page():
@@ -33,22 +39,17 @@ def render_page():
         unsafe_allow_html=True
     )
     
-    # Load data
+    # Sidebar filters
+    selected_year = st.session_state.get('selected_year')
+    min_members = st.session_state.get('min_members', 5)
+    
+    # Load data with filters pushed down to the parquet scan
     try:
-        df = load_ivi_scores()
+        df = load_ivi_scores_filtered(year=selected_year, min_members=min_members)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return
     
-    # Apply year filter
-    selected_year = st.session_state.get('selected_year')
-    if selected_year:
-        df = df.filter(pl.col('YEAR') == selected_year)
-    
-    # Apply minimum members filter
-    min_members = st.session_state.get('min_members', 5)
-    df = df.filter(pl.col('TOTAL_MEMBERS') >= min_members)
-    
     # KPI selector
     st.markdown("### Select KPI to Analyze")
     
@@ -119,30 +120,46 @@ def render_page():
     
     # Render appropriate analysis
     if analysis_type == "Distribution":
-        render_distribution_analysis(df, selected_kpi, kpi_info)
+        render_distribution_analysis(selected_kpi, kpi_info, selected_year, min_members)
     elif analysis_type == "Correlation":
-        render_correlation_analysis(df, selected_kpi)
+        render_correlation_analysis(df, selected_kpi, selected_year, min_members)
     elif analysis_type == "Segmentation":
         render_segmentation_analysis(df, selected_kpi)
     else:
         render_top_bottom_analysis(df, selected_kpi, kpi_info)
 
 
-def render_distribution_analysis(df: pl.DataFrame, kpi: str, kpi_info: dict):
+def render_distribution_analysis(
+    kpi: str,
+    kpi_info: dict,
+    year: Optional[str],
+    min_members: int
+):
     """Render distribution analysis for a KPI."""
     
     st.markdown("### Distribution Analysis")
     
+    # Charts and percentiles are merged from the precomputed KPI sketch
+    sketch = load_kpi_sketch(kpi)
+    merged = merge_sketch(sketch, year, min_members)
+    by_risk = merge_sketch(sketch, year, min_members, by=['IVI_RISK'])
+    
+    if merged['sketch'] is None or merged['sketch'].height == 0:
+        st.info("No values for this KPI with current filters.")
+        return
+    
     col1, col2 = st.columns(2)
     
     with col1:
         # Histogram
-        kpi_data = df[kpi].drop_nulls().to_list()
+        edges = merged['hist_edges']
+        histogram = merged['histogram']
         
         fig = go.Figure()
-        fig.add_trace(go.Histogram(
-            x=kpi_data,
-            nbinsx=30,
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:])[histogram['HIST_BIN'].to_numpy()] / 2,
+            y=histogram['count'].to_list(),
+            width=edges[1] - edges[0],
             marker_color=COLORS['primary'],
             opacity=0.7
         ))
@@ -150,38 +167,51 @@ def render_distribution_analysis(df: pl.DataFrame, kpi: str, kpi_info: dict):
             title=f'{kpi_info["name"]} Distribution',
             xaxis_title=kpi_info['name'],
             yaxis_title='Count',
+            bargap=0,
             height=400
         )
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
         # Box plot by risk level
-        plot_df = df.select([kpi, 'IVI_RISK']).drop_nulls().to_pandas()
+        risk_colors = {
+            'HIGH_RISK': COLORS['danger'],
+            'MODERATE_RISK': COLORS['warning'],
+            'LOW_RISK': COLORS['success']
+        }
         
-        fig = px.box(
-            plot_df,
-            x='IVI_RISK',
-            y=kpi,
-            color='IVI_RISK',
-            color_discrete_map={
-                'HIGH_RISK': COLORS['danger'],
-                'MODERATE_RISK': COLORS['warning'],
-                'LOW_RISK': COLORS['success']
-            },
-            title=f'{kpi_info["name"]} by Risk Level'
+        fig = go.Figure()
+        for risk, color in risk_colors.items():
+            bins = by_risk['sketch'].filter(pl.col('IVI_RISK') == risk)
+            if bins.height == 0:
+                continue
+            stats = sketch_box_stats(bins)
+            fig.add_trace(go.Box(
+                name=risk,
+                q1=[stats['q1']],
+                median=[stats['median']],
+                q3=[stats['q3']],
+                lowerfence=[stats['lowerfence']],
+                upperfence=[stats['upperfence']],
+                marker_color=color
+            ))
+        fig.update_layout(
+            title=f'{kpi_info["name"]} by Risk Level',
+            xaxis_title='IVI_RISK',
+            yaxis_title=kpi,
+            height=400,
+            showlegend=False
         )
-        fig.update_layout(height=400, showlegend=False)
         st.plotly_chart(fig, use_container_width=True)
     
     # Percentile analysis
     st.markdown("### Percentile Analysis")
     
     percentiles = [10, 25, 50, 75, 90, 95, 99]
-    kpi_values = df[kpi].drop_nulls()
     
     pct_data = {
         'Percentile': [f'P{p}' for p in percentiles],
-        'Value': [kpi_values.quantile(p/100) for p in percentiles]
+        'Value': sketch_quantiles(merged['sketch'], [p/100 for p in percentiles])
     }
     
     import pandas as pd
@@ -191,42 +221,72 @@ def render_distribution_analysis(df: pl.DataFrame, kpi: str, kpi_info: dict):
     st.dataframe(pct_df.T, use_container_width=True)
 
 
-def render_correlation_analysis(df: pl.DataFrame, kpi: str):
+def render_correlation_analysis(
+    df: pl.DataFrame,
+    kpi: str,
+    year: Optional[str],
+    min_members: int
+):
     """Render correlation analysis for a KPI."""
     
+    method = st.radio(
+        "Correlation Method",
+        ["Pearson", "Spearman"],
+        horizontal=True
+    )
+    matrix = load_correlation_matrix(year=year, min_members=min_members, method=method.lower())
+    
     st.markdown("### Correlation with IVI Score")
     
     # Scatter plot with IVI
-    plot_df = df.select([kpi, 'IVI_SCORE', 'IVI_RISK', 'TOTAL_MEMBERS']).drop_nulls().to_pandas()
+    plot_df = df.select([kpi, 'IVI_SCORE', 'IVI_RISK', 'TOTAL_MEMBERS']).drop_nulls()
     
     # Cap outliers for visualization
     upper_cap = plot_df[kpi].quantile(0.99)
-    plot_df[kpi] = plot_df[kpi].clip(upper=upper_cap)
-    
-    fig = px.scatter(
-        plot_df,
-        x=kpi,
-        y='IVI_SCORE',
-        color='IVI_RISK',
-        size='TOTAL_MEMBERS',
-        color_discrete_map={
-            'HIGH_RISK': COLORS['danger'],
-            'MODERATE_RISK': COLORS['warning'],
-            'LOW_RISK': COLORS['success']
-        },
-        title=f'{kpi} vs IVI Score',
-        opacity=0.6
-    )
-    fig.update_layout(height=500)
-    st.plotly_chart(fig, use_container_width=True)
+    plot_df = plot_df.with_columns(pl.col(kpi).clip(upper_bound=upper_cap))
+    
+    view = 'Sampled points'
+    if plot_df.height > SCATTER_POINT_LIMIT:
+        view = st.radio(
+            "Large selection view",
+            ['Sampled points', 'Density'],
+            horizontal=True,
+            key='kpi_scatter_view'
+        )
     
-    # Correlation coefficient
-    kpi_clean = df.select([kpi, 'IVI_SCORE']).drop_nulls()
-    correlation = kpi_clean[kpi].to_numpy().flatten()
-    ivi_scores = kpi_clean['IVI_SCORE'].to_numpy().flatten()
+    if view == 'Density':
+        bins = bin_points(plot_df, kpi, 'IVI_SCORE')
+        fig = create_density_heatmap(
+            bins['x_edges'].tolist(),
+            bins['y_edges'].tolist(),
+            bins['counts'].tolist(),
+            x_title=kpi,
+            y_title='IVI_SCORE',
+            title=f'{kpi} vs IVI Score'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        st.caption(f"Density of all {plot_df.height:,} contracts")
+    else:
+        points = downsample_points(plot_df, kpi, 'IVI_SCORE')
+        fig = create_scatter_gl(
+            points[kpi].to_list(),
+            points['IVI_SCORE'].to_list(),
+            points['IVI_RISK'].to_list(),
+            sizes=points['TOTAL_MEMBERS'].to_list(),
+            x_title=kpi,
+            y_title='IVI_SCORE',
+            title=f'{kpi} vs IVI Score'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+        if points.height < plot_df.height:
+            st.caption(
+                f"Showing {points.height:,} of {plot_df.height:,} contracts "
+                "(sampled within each risk level; outliers always shown)"
+            )
     
-    import numpy as np
-    corr = np.corrcoef(correlation, ivi_scores)[0, 1]
+    # Correlation coefficient
+    columns = matrix['columns']
+    corr = matrix['corr'][columns.index(kpi), columns.index('IVI_SCORE')]
     
     st.markdown(
         f"""
@@ -242,28 +302,11 @@ def render_correlation_analysis(df: pl.DataFrame, kpi: str):
     # Correlation with other KPIs
     st.markdown("### Correlation with Other KPIs")
     
-    # Select numeric columns
-    numeric_cols = [c for c in df.columns if df[c].dtype in [pl.Float64, pl.Int64, pl.UInt32] 
-                   and c not in ['YEAR', 'RETAINED_NEXT_YEAR', 'RETAINED_ACTUAL']][:20]
-    
-    correlations = []
-    for col in numeric_cols:
-        if col != kpi:
-            try:
-                clean_df = df.select([kpi, col]).drop_nulls()
-                if clean_df.height > 100:
-                    c = np.corrcoef(
-                        clean_df[kpi].to_numpy().flatten(),
-                        clean_df[col].to_numpy().flatten()
-                    )[0, 1]
-                    correlations.append({'KPI': col, 'Correlation': c})
-            except Exception:
-                pass
-    
-    if correlations:
-        import pandas as pd
-        corr_df = pd.DataFrame(correlations)
-        corr_df = corr_df.sort_values('Correlation', key=abs, ascending=False).head(10)
+    # Every KPI pair comes from the cached correlation matrix
+    correlations = kpi_correlations(matrix, kpi)
+    
+    if correlations.height > 0:
+        corr_df = correlations.head(10).to_pandas()
         
         fig = px.bar(
             corr_df,
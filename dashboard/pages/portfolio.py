@@ -13,11 +13,23 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.data_loader import (
-    load_ivi_scores, 
-    get_portfolio_summary, 
-    get_segment_summary,
+    load_ivi_scores_filtered,
+    load_aggregate_cube,
+    load_score_histogram,
+    load_intervention_queue,
+    load_action_list,
+    PORTFOLIO_COLUMNS,
     SEGMENT_PRIORITY
 )
+from utils.aggregates import (
+    slice_cube,
+    rollup_cube,
+    summarize_portfolio,
+    segment_counts,
+    score_bin_counts,
+    segment_summary as cube_segment_summary,
+)
+from utils.recommendations import top_interventions
 from components.charts import (
     create_ivi_distribution,
     create_risk_pie_chart,
@@ -36,29 +48,31 @@ def render_page():
         unsafe_allow_html=True
     )
     
-    # Load data
+    # Sidebar filters (minimum members: model trained on 5+ members)
+    selected_year = st.session_state.get('selected_year')
+    min_members = st.session_state.get('min_members', 5)
+    risk_filter = st.session_state.get('risk_filter', ['HIGH_RISK', 'MODERATE_RISK', 'LOW_RISK'])
+    
+    # Load data with filters and columns pushed down to the parquet scan
     try:
-        df = load_ivi_scores()
+        df = load_ivi_scores_filtered(
+            year=selected_year,
+            min_members=min_members,
+            risk_levels=tuple(risk_filter),
+            columns=PORTFOLIO_COLUMNS,
+        )
+        cube = load_aggregate_cube()
+        score_histogram = load_score_histogram()
+        queue = load_intervention_queue()
     except Exception as e:
         st.error(f"Error loading data: {e}")
         st.info("Please ensure the data files are available in /volume/data/models/")
         return
     
-    # Apply year filter
-    selected_year = st.session_state.get('selected_year')
-    if selected_year:
-        df = df.filter(pl.col('YEAR') == selected_year)
-    
-    # Apply minimum members filter (model trained on 5+ members)
-    min_members = st.session_state.get('min_members', 5)
-    df = df.filter(pl.col('TOTAL_MEMBERS') >= min_members)
-    
-    # Apply risk filter
-    risk_filter = st.session_state.get('risk_filter', ['HIGH_RISK', 'MODERATE_RISK', 'LOW_RISK'])
-    df = df.filter(pl.col('IVI_RISK').is_in(risk_filter))
-    
-    # Get summary stats
-    summary = get_portfolio_summary(df)
+    # Summaries are rolled up from the precomputed cube cells
+    cube = slice_cube(cube, selected_year, min_members, risk_filter)
+    score_histogram = slice_cube(score_histogram, selected_year, min_members, risk_filter)
+    summary = summarize_portfolio(cube, score_histogram)
     
     # Key metrics row
     st.markdown("### Key Metrics")
@@ -87,7 +101,8 @@ def render_page():
         st.metric(
             label="Avg IVI Score",
             value=f"{summary['avg_ivi_score']:.0f}",
-            delta=f"Median: {summary['median_ivi_score']:.0f}"
+            delta=f"Median ≈ {summary['median_ivi_score']:.0f}",
+            help="Median estimated from one-point score bins (within one point)"
         )
     
     with col5:
@@ -106,8 +121,7 @@ def render_page():
     
     with col1:
         st.markdown("### IVI Score Distribution")
-        scores = df['IVI_SCORE'].to_list()
-        fig = create_ivi_distribution(scores)
+        fig = create_ivi_distribution(bin_counts=score_bin_counts(score_histogram))
         st.plotly_chart(fig, use_container_width=True)
     
     with col2:
@@ -123,12 +137,7 @@ def render_page():
     
     # Segment heatmap
     st.markdown("### Contract Distribution by Segment")
-    segment_counts = df.group_by('SEGMENT').agg(pl.count().alias('count'))
-    segment_dict = dict(zip(
-        segment_counts['SEGMENT'].to_list(),
-        segment_counts['count'].to_list()
-    ))
-    fig = create_segment_heatmap(segment_dict)
+    fig = create_segment_heatmap(segment_counts(cube))
     st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("---")
@@ -174,9 +183,59 @@ def render_page():
     
     st.markdown("---")
     
+    # Intervention queue (pre-ranked by priority score)
+    st.markdown("### Intervention Queue (Highest Priority)")
+    
+    queued = top_interventions(queue, 20, selected_year, min_members, risk_filter)
+    
+    if queued.height > 0:
+        display_df = queued.select([
+            'CONTRACT_NO',
+            'YEAR',
+            'PRIORITY_SCORE',
+            'IVI_SCORE',
+            'TOTAL_MEMBERS',
+            'WRITTEN_PREMIUM',
+            'LOSS_RATIO',
+            'SEGMENT',
+            'PRIMARY_REGION'
+        ]).to_pandas()
+        
+        display_df['PRIORITY_SCORE'] = display_df['PRIORITY_SCORE'].apply(lambda x: f"{x:.1f}")
+        display_df['IVI_SCORE'] = display_df['IVI_SCORE'].apply(lambda x: f"{x:.0f}")
+        display_df['WRITTEN_PREMIUM'] = display_df['WRITTEN_PREMIUM'].apply(lambda x: f"{x:,.0f}")
+        display_df['LOSS_RATIO'] = display_df['LOSS_RATIO'].apply(lambda x: f"{x:.2f}")
+        
+        display_df.columns = [
+            'Contract', 'Year', 'Priority', 'IVI', 'Members', 'Premium (SAR)',
+            'Loss Ratio', 'Segment', 'Region'
+        ]
+        
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            label="Export Intervention Queue (CSV)",
+            data=queued.to_pandas().to_csv(index=False),
+            file_name="intervention_queue.csv",
+            mime="text/csv"
+        )
+        
+        # Recommended actions for every filtered contract, from the batch rule engine
+        actions = load_action_list(selected_year, min_members, tuple(risk_filter))
+        st.download_button(
+            label=f"Export Action List ({actions.height:,} actions, CSV)",
+            data=actions.to_pandas().to_csv(index=False),
+            file_name="action_list.csv",
+            mime="text/csv"
+        )
+    else:
+        st.info("No contracts in the intervention queue with current filters.")
+    
+    st.markdown("---")
+    
     # Summary statistics by segment
     st.markdown("### Segment Summary")
-    segment_summary = get_segment_summary(df)
+    segment_summary = cube_segment_summary(cube)
     
     if segment_summary.height > 0:
         summary_df = segment_summary.to_pandas()
@@ -198,20 +257,21 @@ def render_page():
     st.markdown("---")
     st.markdown("### Premium at Risk")
     
-    # Calculate actual retention rates by risk level
-    high_risk_df = df.filter(pl.col('IVI_RISK') == 'HIGH_RISK')
-    moderate_risk_df = df.filter(pl.col('IVI_RISK') == 'MODERATE_RISK')
-    low_risk_df = df.filter(pl.col('IVI_RISK') == 'LOW_RISK')
+    # Premium and actual retention rates by risk level
+    by_risk = {
+        row['IVI_RISK']: row
+        for row in rollup_cube(cube, ['IVI_RISK']).iter_rows(named=True)
+    }
     
-    high_risk_premium = high_risk_df['WRITTEN_PREMIUM'].sum()
-    moderate_risk_premium = moderate_risk_df['WRITTEN_PREMIUM'].sum()
-    low_risk_premium = low_risk_df['WRITTEN_PREMIUM'].sum()
+    high_risk_premium = by_risk.get('HIGH_RISK', {}).get('total_premium') or 0
+    moderate_risk_premium = by_risk.get('MODERATE_RISK', {}).get('total_premium') or 0
+    low_risk_premium = by_risk.get('LOW_RISK', {}).get('total_premium') or 0
     total_premium = summary['total_premium']
     
-    # Calculate actual retention if available
-    high_retention = high_risk_df['RETAINED_NEXT_YEAR'].mean() if high_risk_df.height > 0 else 0
-    mod_retention = moderate_risk_df['RETAINED_NEXT_YEAR'].mean() if moderate_risk_df.height > 0 else 0
-    low_retention = low_risk_df['RETAINED_NEXT_YEAR'].mean() if low_risk_df.height > 0 else 0
+    # Actual retention if available
+    high_retention = by_risk.get('HIGH_RISK', {}).get('retention_rate') or 0
+    mod_retention = by_risk.get('MODERATE_RISK', {}).get('retention_rate') or 0
+    low_retention = by_risk.get('LOW_RISK', {}).get('retention_rate') or 0
     
     col1, col2, col3 = st.columns(3)
     
@@ -15,12 +15,19 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.data_loader import (
-    load_ivi_scores,
-    get_segment_summary,
+    load_ivi_scores_filtered,
+    load_aggregate_cube,
     SEGMENT_PRIORITY,
     SEGMENT_RECOMMENDATIONS
 )
+from utils.aggregates import (
+    slice_cube,
+    rollup_cube,
+    segment_summary as cube_segment_summary,
+    cube_segments,
+)
 from components.charts import COLORS
+from pipeline.segmentation import segment_priority_expr
 
 
 def render_page():
@@ -33,27 +40,22 @@ def render_page():
         unsafe_allow_html=True
     )
     
-    # Load data
+    # Sidebar filters
+    selected_year = st.session_state.get('selected_year')
+    min_members = st.session_state.get('min_members', 5)
+    
+    # Overview and comparison are answered from the precomputed cube
     try:
-        df = load_ivi_scores()
+        cube = slice_cube(load_aggregate_cube(), selected_year, min_members)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return
     
-    # Apply year filter
-    selected_year = st.session_state.get('selected_year')
-    if selected_year:
-        df = df.filter(pl.col('YEAR') == selected_year)
-    
-    # Apply minimum members filter
-    min_members = st.session_state.get('min_members', 5)
-    df = df.filter(pl.col('TOTAL_MEMBERS') >= min_members)
-    
     # Segment selector
     st.markdown("### Select Segment")
     
     # Get unique segments
-    segments = sorted(df['SEGMENT'].unique().to_list(), 
+    segments = sorted(cube_segments(cube), 
                      key=lambda x: SEGMENT_PRIORITY.get(x, 99))
     
     col1, col2 = st.columns([2, 1])
@@ -74,20 +76,26 @@ def render_page():
     st.markdown("---")
     
     if view_type == "Overview":
-        render_segment_overview(df, selected_segment)
+        render_segment_overview(cube, selected_segment)
     elif view_type == "Comparison":
-        render_segment_comparison(df)
+        render_segment_comparison(cube)
     else:
+        try:
+            df = load_ivi_scores_filtered(year=selected_year, min_members=min_members)
+        except Exception as e:
+            st.error(f"Error loading data: {e}")
+            return
         render_segment_list(df, selected_segment)
 
 
-def render_segment_overview(df: pl.DataFrame, selected_segment: str):
+def render_segment_overview(cube: pl.DataFrame, selected_segment: str):
     """Render segment overview."""
     
     if selected_segment != "All Segments":
-        segment_df = df.filter(pl.col('SEGMENT') == selected_segment)
+        segment_cube = slice_cube(cube, segment=selected_segment)
     else:
-        segment_df = df
+        segment_cube = cube
+    totals = rollup_cube(segment_cube).row(0, named=True)
     
     # Summary metrics
     st.markdown("### Segment Metrics")
@@ -95,22 +103,22 @@ def render_segment_overview(df: pl.DataFrame, selected_segment: str):
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        st.metric("Contracts", f"{segment_df.height:,}")
+        st.metric("Contracts", f"{totals['contract_count'] or 0:,}")
     
     with col2:
-        total_members = segment_df['TOTAL_MEMBERS'].sum()
+        total_members = totals['total_members'] or 0
         st.metric("Members", f"{total_members:,}")
     
     with col3:
-        total_premium = segment_df['WRITTEN_PREMIUM'].sum()
+        total_premium = totals['total_premium'] or 0
         st.metric("Premium", f"{total_premium/1e9:.2f}B SAR")
     
     with col4:
-        avg_ivi = segment_df['IVI_SCORE'].mean()
+        avg_ivi = totals['avg_ivi_score'] or 0
         st.metric("Avg IVI", f"{avg_ivi:.0f}")
     
     with col5:
-        avg_loss = segment_df['LOSS_RATIO'].mean()
+        avg_loss = totals['avg_loss_ratio'] or 0
         st.metric("Avg Loss Ratio", f"{avg_loss:.2f}")
     
     st.markdown("---")
@@ -118,7 +126,7 @@ def render_segment_overview(df: pl.DataFrame, selected_segment: str):
     # Segment summary table
     st.markdown("### All Segments Summary")
     
-    segment_summary = get_segment_summary(df)
+    segment_summary = cube_segment_summary(cube)
     
     # Add priority and actions
     summary_data = []
@@ -198,25 +206,20 @@ def render_segment_overview(df: pl.DataFrame, selected_segment: str):
             st.markdown(f"{i}. {action}")
 
 
-def render_segment_comparison(df: pl.DataFrame):
+def render_segment_comparison(cube: pl.DataFrame):
     """Render segment comparison charts."""
     
     st.markdown("### Segment Comparison")
     
-    # Group by segment
-    segment_stats = df.group_by('SEGMENT').agg([
-        pl.count().alias('contracts'),
-        pl.col('TOTAL_MEMBERS').sum().alias('members'),
-        pl.col('WRITTEN_PREMIUM').sum().alias('premium'),
-        pl.col('IVI_SCORE').mean().alias('avg_ivi'),
-        pl.col('LOSS_RATIO').mean().alias('avg_loss_ratio'),
-        pl.col('UTILIZATION_RATE').mean().alias('avg_utilization'),
-        pl.col('CALLS_PER_MEMBER').mean().alias('avg_calls'),
-    ]).to_pandas()
-    
-    # Sort by priority
-    segment_stats['priority'] = segment_stats['SEGMENT'].map(SEGMENT_PRIORITY)
-    segment_stats = segment_stats.sort_values('priority')
+    # Roll cube cells up to segments
+    segment_stats = rollup_cube(cube, ['SEGMENT']).rename({
+        'contract_count': 'contracts',
+        'total_members': 'members',
+        'total_premium': 'premium',
+        'avg_ivi_score': 'avg_ivi',
+    }).with_columns(
+        segment_priority_expr().alias('priority')
+    ).sort('priority').to_pandas()
     
     # Chart 1: Premium by segment
     col1, col2 = st.columns(2)
@@ -267,9 +270,9 @@ def render_segment_comparison(df: pl.DataFrame):
     # Chart 3: Risk composition
     st.markdown("### Risk Tier Distribution")
     
-    risk_by_segment = df.group_by(['SEGMENT', 'IVI_RISK']).agg(
-        pl.count().alias('count')
-    ).to_pandas()
+    risk_by_segment = rollup_cube(cube, ['SEGMENT', 'IVI_RISK']).select([
+        'SEGMENT', 'IVI_RISK', pl.col('contract_count').alias('count')
+    ]).to_pandas()
     
     fig = px.bar(
         risk_by_segment,
@@ -0,0 +1,262 @@
+"""
+Precomputed aggregate cube for IVI Dashboard summaries.
+
+Contracts are rolled up once per data version into cells keyed by YEAR,
+min-members bucket, IVI_RISK, SEGMENT and PRIMARY_REGION. Pages answer
+sidebar filter changes by summing the matching cells instead of rescanning
+every contract row.
+"""
+
+import polars as pl
+from typing import Dict, List, Optional, Sequence
+
+# Minimum-members options offered in the sidebar; cells are bucketed on them
+MEMBER_BUCKETS = [1, 5, 10, 25, 50, 100]
+
+CUBE_DIMENSIONS = ['YEAR', 'MEMBERS_BUCKET', 'IVI_RISK', 'SEGMENT', 'PRIMARY_REGION']
+
+# Additive measures: stored as sums
+CUBE_SUM_COLUMNS = ['TOTAL_MEMBERS', 'WRITTEN_PREMIUM']
+
+# Averaged measures: stored as sum + non-null count so cells roll up exactly
+CUBE_MEAN_COLUMNS = [
+    'IVI_SCORE', 'LOSS_RATIO', 'RETAINED_NEXT_YEAR', 'UTILIZATION_RATE', 'CALLS_PER_MEMBER'
+]
+
+# Output names of rolled-up measures
+ROLLUP_NAMES = {
+    'TOTAL_MEMBERS': 'total_members',
+    'WRITTEN_PREMIUM': 'total_premium',
+    'IVI_SCORE': 'avg_ivi_score',
+    'LOSS_RATIO': 'avg_loss_ratio',
+    'RETAINED_NEXT_YEAR': 'retention_rate',
+    'UTILIZATION_RATE': 'avg_utilization',
+    'CALLS_PER_MEMBER': 'avg_calls',
+}
+
+
+def members_bucket_expr(column: str = 'TOTAL_MEMBERS') -> pl.Expr:
+    """
+    Map member counts to the largest sidebar threshold they satisfy.
+
+    A contract passes the filter `TOTAL_MEMBERS >= m` exactly when its bucket
+    is >= m, for every m in MEMBER_BUCKETS.
+    """
+    expr = pl.lit(0)
+    for bucket in MEMBER_BUCKETS:
+        expr = pl.when(pl.col(column) >= bucket).then(pl.lit(bucket)).otherwise(expr)
+    return expr.alias('MEMBERS_BUCKET')
+
+
+def build_aggregate_cube(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Materialize the aggregate cube from contract-level IVI scores.
+
+    Args:
+        df: IVI scores dataframe
+
+    Returns:
+        DataFrame with one row per populated cell
+    """
+    measures = [pl.len().alias('contract_count')]
+    for col in CUBE_SUM_COLUMNS:
+        if col in df.columns:
+            measures.append(pl.col(col).sum().alias(f'{col}_sum'))
+    for col in CUBE_MEAN_COLUMNS:
+        if col in df.columns:
+            measures.append(pl.col(col).sum().alias(f'{col}_sum'))
+            measures.append(pl.col(col).count().alias(f'{col}_n'))
+
+    return df.with_columns(members_bucket_expr()).group_by(CUBE_DIMENSIONS).agg(measures)
+
+
+def build_score_histogram(df: pl.DataFrame) -> pl.DataFrame:
+    """
+    Count contracts per one-point IVI score bin.
+
+    Keyed by YEAR, MEMBERS_BUCKET and IVI_RISK so that the same sidebar
+    filters as the cube apply. Used for medians and distribution charts.
+
+    Args:
+        df: IVI scores dataframe
+
+    Returns:
+        DataFrame with SCORE_BIN (0-99) and count columns
+    """
+    return df.filter(pl.col('IVI_SCORE').is_not_null()).with_columns([
+        members_bucket_expr(),
+        pl.col('IVI_SCORE').floor().clip(0, 99).cast(pl.Int32).alias('SCORE_BIN'),
+    ]).group_by(['YEAR', 'MEMBERS_BUCKET', 'IVI_RISK', 'SCORE_BIN']).agg(
+        pl.len().alias('count')
+    )
+
+
+def slice_cube(
+    cube: pl.DataFrame,
+    year: Optional[str] = None,
+    min_members: Optional[int] = None,
+    risk_levels: Optional[Sequence[str]] = None,
+    segment: Optional[str] = None,
+) -> pl.DataFrame:
+    """
+    Select the cells matching the sidebar filters.
+
+    Works for both the aggregate cube and the score histogram.
+
+    Args:
+        cube: Aggregate cube or score histogram
+        year: Optional year filter ('2022' or '2023')
+        min_members: Optional minimum members (one of MEMBER_BUCKETS)
+        risk_levels: Optional IVI_RISK levels to keep
+        segment: Optional segment to keep
+
+    Returns:
+        Filtered cells
+    """
+    if year:
+        cube = cube.filter(pl.col('YEAR') == year)
+    if min_members is not None:
+        cube = cube.filter(pl.col('MEMBERS_BUCKET') >= min_members)
+    if risk_levels is not None:
+        cube = cube.filter(pl.col('IVI_RISK').is_in(list(risk_levels)))
+    if segment is not None:
+        cube = cube.filter(pl.col('SEGMENT') == segment)
+    return cube
+
+
+def rollup_cube(cube: pl.DataFrame, by: Sequence[str] = ()) -> pl.DataFrame:
+    """
+    Roll cells up to the requested dimensions.
+
+    Args:
+        cube: (Sliced) aggregate cube
+        by: Dimensions to keep; empty rolls up to a single row
+
+    Returns:
+        DataFrame with contract_count, sum and average measures
+    """
+    sums = [pl.col('contract_count').sum()]
+    for col in CUBE_SUM_COLUMNS:
+        if f'{col}_sum' in cube.columns:
+            sums.append(pl.col(f'{col}_sum').sum())
+    for col in CUBE_MEAN_COLUMNS:
+        if f'{col}_sum' in cube.columns:
+            sums.append(pl.col(f'{col}_sum').sum())
+            sums.append(pl.col(f'{col}_n').sum())
+
+    if by:
+        rolled = cube.group_by(list(by)).agg(sums)
+    else:
+        rolled = cube.select(sums)
+
+    outputs = [pl.col(c) for c in by] + [pl.col('contract_count')]
+    for col in CUBE_SUM_COLUMNS:
+        if f'{col}_sum' in rolled.columns:
+            outputs.append(pl.col(f'{col}_sum').alias(ROLLUP_NAMES[col]))
+    for col in CUBE_MEAN_COLUMNS:
+        if f'{col}_sum' in rolled.columns:
+            outputs.append(
+                pl.when(pl.col(f'{col}_n') > 0)
+                .then(pl.col(f'{col}_sum') / pl.col(f'{col}_n'))
+                .otherwise(None)
+                .alias(ROLLUP_NAMES[col])
+            )
+
+    return rolled.select(outputs)
+
+
+def histogram_median(histogram: pl.DataFrame) -> Optional[float]:
+    """
+    Approximate the median IVI score from one-point score bins.
+
+    Interpolates linearly inside the bin holding the middle contract, so the
+    error is below one score point.
+
+    Args:
+        histogram: (Sliced) score histogram
+
+    Returns:
+        Median score, or None if the histogram is empty
+    """
+    bins = histogram.group_by('SCORE_BIN').agg(pl.col('count').sum()).sort('SCORE_BIN')
+    total = bins['count'].sum()
+    if not total:
+        return None
+
+    half = total / 2
+    cumulative = 0
+    for score_bin, count in bins.iter_rows():
+        if cumulative + count >= half:
+            return score_bin + (half - cumulative) / count
+        cumulative += count
+    return None
+
+
+def score_bin_counts(histogram: pl.DataFrame, bin_width: int = 5) -> Dict[str, List[int]]:
+    """
+    Regroup one-point score bins into wider bins, stacked by IVI_RISK.
+
+    Args:
+        histogram: (Sliced) score histogram
+        bin_width: Score points per bin (should divide 100)
+
+    Returns:
+        Dictionary of IVI_RISK -> contract count per bin (100 / bin_width bins)
+    """
+    n_bins = -(-100 // bin_width)
+    bins = histogram.group_by([
+        'IVI_RISK', (pl.col('SCORE_BIN') // bin_width).alias('BIN'),
+    ]).agg(pl.col('count').sum())
+
+    counts = {}
+    for risk, bin_index, count in bins.iter_rows():
+        counts.setdefault(risk, [0] * n_bins)[bin_index] = count
+    return counts
+
+
+def summarize_portfolio(cube: pl.DataFrame, histogram: pl.DataFrame) -> Dict:
+    """
+    Portfolio summary from cube cells (totals, means, risk counts and the
+    approximate median IVI score from the histogram, see histogram_median).
+
+    Args:
+        cube: Sliced aggregate cube
+        histogram: Score histogram sliced with the same filters
+
+    Returns:
+        Dictionary with summary metrics
+    """
+    total = rollup_cube(cube).row(0, named=True)
+    risk_counts = dict(rollup_cube(cube, ['IVI_RISK']).select(['IVI_RISK', 'contract_count']).iter_rows())
+
+    return {
+        'total_contracts': total['contract_count'] or 0,
+        'total_members': total.get('total_members') or 0,
+        'total_premium': total.get('total_premium') or 0,
+        'avg_ivi_score': total.get('avg_ivi_score'),
+        'median_ivi_score': histogram_median(histogram),
+        'high_risk_count': risk_counts.get('HIGH_RISK', 0),
+        'moderate_risk_count': risk_counts.get('MODERATE_RISK', 0),
+        'low_risk_count': risk_counts.get('LOW_RISK', 0),
+        'avg_loss_ratio': total.get('avg_loss_ratio'),
+        'retention_rate': total.get('retention_rate'),
+    }
+
+
+def segment_counts(cube: pl.DataFrame) -> Dict[str, int]:
+    """Contract counts per segment, as expected by create_segment_heatmap."""
+    rolled = rollup_cube(cube, ['SEGMENT'])
+    return dict(zip(rolled['SEGMENT'].to_list(), rolled['contract_count'].to_list()))
+
+
+def segment_summary(cube: pl.DataFrame) -> pl.DataFrame:
+    """Segment summary from cube cells, largest segments first."""
+    return rollup_cube(cube, ['SEGMENT']).select([
+        'SEGMENT', 'contract_count', 'total_members', 'total_premium',
+        'avg_ivi_score', 'avg_loss_ratio', 'retention_rate',
+    ]).sort('contract_count', descending=True)
+
+
+def cube_segments(cube: pl.DataFrame) -> List[str]:
+    """Segments present in the (sliced) cube."""
+    return cube['SEGMENT'].drop_nulls().unique().to_list()
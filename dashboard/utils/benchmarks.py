@@ -0,0 +1,170 @@
+"""
+Precomputed benchmark store for the IVI Dashboard.
+
+Benchmark statistics are computed once per data version for every
+combination of YEAR, minimum-members threshold, SEGMENT and PRIMARY_REGION
+(each dimension also has an 'ALL' level) and served by key. Metrics can be
+added without recomputing the ones already there; stores are never modified
+in place, so readers need no lock.
+"""
+
+import polars as pl
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .aggregates import MEMBER_BUCKETS
+
+# Store key dimensions; 'ALL' stands for "not filtered on this dimension"
+BENCHMARK_KEYS = ['YEAR', 'MIN_MEMBERS', 'SEGMENT', 'PRIMARY_REGION']
+ALL = 'ALL'
+
+# IVI score percentiles stored alongside the metric means
+IVI_PERCENTILES = [0.10, 0.25, 0.50, 0.75, 0.90]
+
+BenchmarkKey = Tuple[str, int, str, str]
+
+
+def benchmark_name(metric: str) -> str:
+    """Benchmark key for a KPI column (e.g. LOSS_RATIO -> avg_loss_ratio)."""
+    name = metric.lower()
+    return name if name.startswith('avg_') else f'avg_{name}'
+
+
+def benchmark_exprs(metrics: Sequence[str], percentiles: bool = True) -> List[pl.Expr]:
+    """
+    Aggregations producing benchmark values (see benchmark_name, pNN_ivi_score).
+
+    Args:
+        metrics: KPI columns to average
+        percentiles: Whether to include IVI score percentiles
+
+    Returns:
+        List of aggregation expressions
+    """
+    exprs = [pl.len().alias('contract_count')]
+    exprs += [pl.col(metric).mean().alias(benchmark_name(metric)) for metric in metrics]
+    if percentiles:
+        exprs += [
+            pl.col('IVI_SCORE').quantile(q).alias(f'p{int(q * 100)}_ivi_score')
+            for q in IVI_PERCENTILES
+        ]
+    return exprs
+
+
+def compute_benchmarks(
+    df: pl.DataFrame,
+    metrics: Sequence[str],
+    percentiles: bool = True,
+) -> pl.DataFrame:
+    """
+    Compute benchmark values for every store key.
+
+    Means and percentiles are not additive, so each grouping set is computed
+    directly from contract rows; all sets run in one parallel collect.
+
+    Args:
+        df: IVI scores dataframe
+        metrics: KPI columns to average (missing columns are skipped)
+        percentiles: Whether to include IVI score percentiles
+
+    Returns:
+        DataFrame with BENCHMARK_KEYS and one column per benchmark value
+    """
+    metrics = [metric for metric in metrics if metric in df.columns]
+    exprs = benchmark_exprs(metrics, percentiles)
+    lf = df.lazy().with_columns(pl.col('YEAR').cast(pl.Utf8))
+
+    plans = []
+    for min_members in MEMBER_BUCKETS:
+        subset = lf.filter(pl.col('TOTAL_MEMBERS') >= min_members)
+        for by_year in (True, False):
+            for by_segment in (True, False):
+                for by_region in (True, False):
+                    keys = [
+                        pl.col('YEAR') if by_year else pl.lit(ALL).alias('YEAR'),
+                        pl.lit(min_members).alias('MIN_MEMBERS'),
+                        pl.col('SEGMENT') if by_segment else pl.lit(ALL).alias('SEGMENT'),
+                        pl.col('PRIMARY_REGION') if by_region else pl.lit(ALL).alias('PRIMARY_REGION'),
+                    ]
+                    plans.append(subset.with_columns(keys).group_by(BENCHMARK_KEYS).agg(exprs))
+
+    return pl.concat(pl.collect_all(plans), how='vertical_relaxed')
+
+
+def _store_rows(table: pl.DataFrame) -> Dict[BenchmarkKey, dict]:
+    """Split a benchmark table into per-key metric dictionaries."""
+    store = {}
+    for row in table.iter_rows(named=True):
+        key = tuple(row.pop(col) for col in BENCHMARK_KEYS)
+        store[key] = row
+    return store
+
+
+def build_benchmark_store(df: pl.DataFrame, metrics: Sequence[str]) -> Dict[BenchmarkKey, dict]:
+    """
+    Build the benchmark store.
+
+    Args:
+        df: IVI scores dataframe
+        metrics: KPI columns to average
+
+    Returns:
+        Dictionary of (YEAR, MIN_MEMBERS, SEGMENT, PRIMARY_REGION) -> benchmarks
+    """
+    return _store_rows(compute_benchmarks(df, metrics))
+
+
+def add_benchmark_metrics(
+    store: Dict[BenchmarkKey, dict],
+    df: pl.DataFrame,
+    metrics: Sequence[str],
+) -> Dict[BenchmarkKey, dict]:
+    """
+    Store with metrics added, computing only the new ones.
+
+    The input store is never modified, so it can be read concurrently; it is
+    returned as is when no metric is missing.
+
+    Args:
+        store: Benchmark store from build_benchmark_store
+        df: IVI scores dataframe the store was built from
+        metrics: KPI columns that should be benchmarked
+
+    Returns:
+        The input store, or a new store that also holds the missing metrics
+    """
+    sample = next(iter(store.values()), {})
+    new_metrics = [
+        metric for metric in metrics
+        if benchmark_name(metric) not in sample and metric in df.columns
+    ]
+    if not new_metrics:
+        return store
+
+    extended = {key: dict(values) for key, values in store.items()}
+    for key, values in _store_rows(compute_benchmarks(df, new_metrics, percentiles=False)).items():
+        values.pop('contract_count')
+        extended.setdefault(key, {}).update(values)
+    return extended
+
+
+def get_benchmark(
+    store: Dict[BenchmarkKey, dict],
+    year: Optional[str] = None,
+    min_members: int = 1,
+    segment: Optional[str] = None,
+    region: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Look up benchmarks for a filter combination.
+
+    Args:
+        store: Benchmark store
+        year: Optional year ('2022' or '2023'); None for all years
+        min_members: Minimum members threshold (one of MEMBER_BUCKETS)
+        segment: Optional segment; None for all segments
+        region: Optional region; None for all regions
+
+    Returns:
+        Dictionary with benchmark metrics, or None if the key is not stored
+    """
+    return store.get((year or ALL, min_members, segment or ALL, region or ALL))
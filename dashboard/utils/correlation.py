@@ -0,0 +1,114 @@
+"""
+KPI correlation engine for the IVI Dashboard.
+
+Computes the full pairwise-complete Pearson or Spearman correlation matrix
+over every numeric KPI with a few matrix products, instead of one
+drop_nulls + np.corrcoef call per column pair.
+"""
+
+import numpy as np
+import polars as pl
+from typing import List, Optional, Sequence
+
+# Numeric columns that are labels or keys rather than KPIs
+CORRELATION_EXCLUDE = ['YEAR', 'RETAINED_NEXT_YEAR', 'RETAINED_ACTUAL']
+
+# A correlation is shown only with more than this many rows where both KPIs are present
+MIN_PAIR_COUNT = 100
+
+
+def correlation_columns(df: pl.DataFrame) -> List[str]:
+    """Numeric KPI columns of a scores table."""
+    return [
+        col for col, dtype in df.schema.items()
+        if dtype.is_numeric() and col not in CORRELATION_EXCLUDE
+    ]
+
+
+def correlation_matrix(
+    df: pl.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    method: str = 'pearson',
+) -> dict:
+    """
+    Pairwise-complete correlation matrix over KPI columns.
+
+    Each pair uses the rows where both values are present (like
+    pandas.DataFrame.corr). With nulls present, Spearman ranks each column
+    once over its own non-null values rather than re-ranking per pair.
+
+    Args:
+        df: IVI scores dataframe
+        columns: KPI columns (defaults to correlation_columns(df))
+        method: 'pearson' or 'spearman'
+
+    Returns:
+        Dictionary with 'columns', the 'corr' matrix and the per-pair row
+        'counts' matrix (both numpy arrays in column order)
+    """
+    columns = list(columns) if columns is not None else correlation_columns(df)
+
+    values = df.select([
+        pl.col(col).cast(pl.Float64).fill_nan(None) for col in columns
+    ])
+    if method == 'spearman':
+        values = values.select([pl.col(col).rank('average').cast(pl.Float64) for col in columns])
+    elif method != 'pearson':
+        raise ValueError(f"Unknown correlation method: {method}")
+
+    x = values.to_numpy()
+    present = ~np.isnan(x)
+
+    # Center on column means to keep the sums of squares well conditioned
+    x = np.where(present, x - np.nanmean(np.where(present, x, np.nan), axis=0), 0.0)
+    mask = present.astype(np.float64)
+
+    # For every pair (i, j), sums over rows where both columns are present
+    counts = mask.T @ mask
+    sum_x = x.T @ mask
+    sum_xy = x.T @ x
+    sum_xx = (x * x).T @ mask
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sum_xy - sum_x * sum_x.T / counts
+        var_x = sum_xx - sum_x ** 2 / counts
+        corr = cov / np.sqrt(var_x * var_x.T)
+
+    corr[counts < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(counts) >= 2, 1.0, np.nan))
+
+    return {
+        'columns': columns,
+        'corr': np.clip(corr, -1.0, 1.0),
+        'counts': counts.astype(np.int64),
+    }
+
+
+def kpi_correlations(
+    matrix: dict,
+    kpi: str,
+    min_count: int = MIN_PAIR_COUNT,
+) -> pl.DataFrame:
+    """
+    Correlations of one KPI with every other KPI.
+
+    Args:
+        matrix: Result of correlation_matrix
+        kpi: KPI to correlate
+        min_count: Correlations need more than this many paired rows
+
+    Returns:
+        DataFrame with KPI, Correlation and N, sorted by absolute correlation
+    """
+    columns = matrix['columns']
+    i = columns.index(kpi)
+
+    return pl.DataFrame({
+        'KPI': columns,
+        'Correlation': matrix['corr'][i],
+        'N': matrix['counts'][i],
+    }).filter(
+        (pl.col('KPI') != kpi)
+        & (pl.col('N') > min_count)
+        & pl.col('Correlation').is_not_nan()
+    ).sort(pl.col('Correlation').abs(), descending=True)
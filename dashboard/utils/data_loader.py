@@ -1,99 +1,704 @@
 """
 Data loader utilities for IVI Dashboard.
 Loads processed parquet files with caching for Streamlit.
+
+Large tables are mirrored to uncompressed Arrow IPC files and memory-mapped,
+and loaders use st.cache_resource, so every session and worker process shares
+one read-only copy of each frame instead of holding its own.
+
+Cached tables are keyed by a file fingerprint rather than a TTL. A background
+watcher reloads only the tables whose files changed and then swaps them in.
+
+Contract lookups go through prebuilt (CONTRACT_NO, YEAR) -> row offset
+indexes, so selecting a client does not scan the table.
 """
 
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
 import streamlit as st
 import polars as pl
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Sequence, Tuple
+
+from .aggregates import build_aggregate_cube, build_score_histogram
+from .search import build_search_index
+from .benchmarks import build_benchmark_store, add_benchmark_metrics, get_benchmark
+from .recommendations import build_intervention_queue, generate_recommendations_batch
+from .correlation import correlation_matrix
+from .distributions import build_kpi_sketch
+
+# Repository root, for the shared pipeline package
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from pipeline.segmentation import SEGMENT_PRIORITY
+from pipeline.scoring.model import load_bundle
+
+from .whatif import Changes, build_whatif_scorer, contract_baseline, score_whatif as _score_whatif_row
 
 # Data paths
 DATA_DIR = Path('/volume/data')
 PROCESSED_DIR = DATA_DIR / 'processed'
 MODELS_DIR = DATA_DIR / 'models'
+CACHE_DIR = DATA_DIR / 'cache' / 'dashboard'
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks for rewritten data files
+WATCH_INTERVAL_SECONDS = 30
+
+# Seconds a superseded Arrow IPC mirror is kept after its successor appears
+MIRROR_RETENTION_SECONDS = 600
+
+# Columns rendered by each page (None = page needs every column)
+PORTFOLIO_COLUMNS = (
+    'CONTRACT_NO', 'YEAR', 'IVI_SCORE', 'IVI_RISK', 'SEGMENT', 'PRIMARY_REGION',
+    'TOTAL_MEMBERS', 'WRITTEN_PREMIUM', 'LOSS_RATIO', 'RETAINED_NEXT_YEAR',
+)
+
+
+def _table_paths() -> dict:
+    """Files backing each cached table, keyed by table name."""
+    return {
+        'ivi_scores': MODELS_DIR / 'ivi_scores_all_years.parquet',
+        'shap_subscores': MODELS_DIR / 'shap_subscores.parquet',
+        'contract_level': PROCESSED_DIR / 'contract_level.parquet',
+        'provider_reference': PROCESSED_DIR / 'ref_provider.parquet',
+        'feature_importance': MODELS_DIR / 'feature_importance.csv',
+        'model_bundle': MODELS_DIR / 'ivi_model_bundle.joblib',
+    }
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    Compute a cheap version key for a data file.
+    
+    Combines mtime, size and (for parquet) a hash of the footer metadata,
+    which changes whenever row groups or statistics change.
+    
+    Args:
+        path: File to fingerprint
+    
+    Returns:
+        Hex digest identifying the current file contents
+    
+    Raises:
+        ValueError: If a parquet file is incomplete (still being written)
+    """
+    stat = path.stat()
+    digest = hashlib.blake2b(f'{stat.st_mtime_ns}:{stat.st_size}'.encode(), digest_size=16)
+    
+    if path.suffix == '.parquet':
+        with open(path, 'rb') as f:
+            f.seek(-8, os.SEEK_END)
+            tail = f.read(8)
+            if tail[4:] != b'PAR1':
+                raise ValueError(f"Incomplete parquet file: {path}")
+            footer_len = int.from_bytes(tail[:4], 'little')
+            f.seek(-(8 + footer_len), os.SEEK_END)
+            digest.update(f.read(footer_len))
+    
+    return digest.hexdigest()
+
+
+# Fingerprint currently served for each table. Only the watcher advances an
+# entry, after the new version is loaded, so pages switch over atomically.
+_served_fingerprints: dict = {}
+
+
+def current_fingerprint(table: str) -> str:
+    """Return the fingerprint of the table version pages should read."""
+    fingerprint = _served_fingerprints.get(table)
+    if fingerprint is None:
+        fingerprint = _served_fingerprints.setdefault(
+            table, file_fingerprint(_table_paths()[table])
+        )
+    return fingerprint
+
+
+def read_version(path: Path, fingerprint: str, reader):
+    """
+    Read one version of a data file.
+    
+    The fingerprint is checked before and after the read, so the result is
+    the requested version and never a newer file written meanwhile.
+    
+    Args:
+        path: Data file
+        fingerprint: Version to read (see file_fingerprint)
+        reader: Function reading the file, e.g. pl.read_parquet
+    
+    Returns:
+        Whatever reader returns
+    
+    Raises:
+        ValueError: If the file no longer holds that version
+    """
+    if file_fingerprint(path) != fingerprint:
+        raise ValueError(f"{path} no longer holds version {fingerprint[:16]}")
+    data = reader(path)
+    if file_fingerprint(path) != fingerprint:
+        raise ValueError(f"{path} changed while reading version {fingerprint[:16]}")
+    return data
+
+
+def _mirror_path(parquet_path: Path, fingerprint: str) -> Path:
+    """Arrow IPC mirror of one version of a parquet file."""
+    return CACHE_DIR / f'{parquet_path.stem}-{fingerprint[:16]}.arrow'
+
+
+def _shared_ipc_path(parquet_path: Path, fingerprint: str) -> Path:
+    """
+    Return an uncompressed Arrow IPC mirror of one version of a parquet file.
+    
+    Mirrors are named by fingerprint and written from a read checked against
+    that fingerprint (see read_version), then renamed into place. Mirrors
+    are never deleted here; see prune_mirrors.
+    
+    Raises:
+        ValueError: If the mirror is missing and the parquet file no longer
+            holds that version
+    """
+    ipc_path = _mirror_path(parquet_path, fingerprint)
+    if ipc_path.exists():
+        return ipc_path
+    
+    df = read_version(parquet_path, fingerprint, pl.read_parquet)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = ipc_path.with_name(f'{ipc_path.name}.{os.getpid()}.tmp')
+    df.rechunk().write_ipc(tmp_path, compression='uncompressed')
+    os.replace(tmp_path, ipc_path)
+    
+    return ipc_path
+
+
+def prune_mirrors(parquet_path: Path, served_fingerprint: str) -> None:
+    """
+    Delete mirrors older than the served version once it has settled.
+    
+    Only mirrors written before the served one are candidates, and only after
+    the served mirror is MIRROR_RETENTION_SECONDS old, so processes whose
+    watcher has not switched yet can still open the previous version. Newer
+    mirrors are never touched. Processes that still map a deleted mirror keep
+    a valid mapping until they drop the frame.
+    """
+    served = _mirror_path(parquet_path, served_fingerprint)
+    try:
+        served_mtime = served.stat().st_mtime
+    except OSError:
+        return
+    if time.time() - served_mtime < MIRROR_RETENTION_SECONDS:
+        return
+    
+    for mirror in CACHE_DIR.glob(f'{parquet_path.stem}-*.arrow'):
+        try:
+            if mirror != served and mirror.stat().st_mtime < served_mtime:
+                mirror.unlink()
+        except OSError:
+            continue
+
+
+def read_shared(parquet_path: Path, fingerprint: str) -> pl.DataFrame:
+    """
+    Read one version of a parquet file as a zero-copy, memory-mapped frame.
+    
+    Pages backing the frame live in the OS page cache and are shared by every
+    process that maps the same mirror. Treat the result as read-only.
+    """
+    return pl.read_ipc(_shared_ipc_path(parquet_path, fingerprint), memory_map=True)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_ivi_scores(fingerprint: str) -> pl.DataFrame:
+    """Load one version of the IVI scores."""
+    return read_shared(_table_paths()['ivi_scores'], fingerprint)
 
 
-@st.cache_data(ttl=3600)
 def load_ivi_scores() -> pl.DataFrame:
     """Load IVI scores with all features and segmentation."""
-    return pl.read_parquet(MODELS_DIR / 'ivi_scores_all_years.parquet')
+    return _load_ivi_scores(current_fingerprint('ivi_scores'))
+
+
+def scan_ivi_scores(
+    year: Optional[str] = None,
+    min_members: Optional[int] = None,
+    risk_levels: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+    fingerprint: Optional[str] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan IVI scores with filters and column selection pushed down.
+    
+    Scans the Arrow IPC mirror of one version (see _shared_ipc_path). A
+    mirror is only built from a read checked against its fingerprint, so a
+    rewrite of the scores cannot change a result cached under the old
+    fingerprint; if that version is no longer available the scan raises
+    ValueError instead. Only the requested columns are touched and the YEAR,
+    TOTAL_MEMBERS and IVI_RISK predicates run on the mapped pages.
+    
+    Args:
+        year: Optional year filter ('2022' or '2023')
+        min_members: Optional minimum TOTAL_MEMBERS
+        risk_levels: Optional IVI_RISK levels to keep
+        columns: Optional columns to read (all columns if None)
+        fingerprint: Version to scan (the served version if None)
+    
+    Returns:
+        LazyFrame over one version of the IVI scores
+    """
+    if fingerprint is None:
+        fingerprint = current_fingerprint('ivi_scores')
+    lf = pl.scan_ipc(_shared_ipc_path(_table_paths()['ivi_scores'], fingerprint))
+    
+    if year:
+        lf = lf.filter(pl.col('YEAR') == year)
+    if min_members is not None:
+        lf = lf.filter(pl.col('TOTAL_MEMBERS') >= min_members)
+    if risk_levels is not None:
+        lf = lf.filter(pl.col('IVI_RISK').is_in(list(risk_levels)))
+    if columns is not None:
+        lf = lf.select(list(columns))
+    
+    return lf
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _load_ivi_scores_filtered(
+    fingerprint: str,
+    year: Optional[str],
+    min_members: Optional[int],
+    risk_levels: Optional[Sequence[str]],
+    columns: Optional[Sequence[str]],
+) -> pl.DataFrame:
+    """Load one version of a filtered IVI score slice."""
+    return scan_ivi_scores(year, min_members, risk_levels, columns, fingerprint).collect()
+
+
+def load_ivi_scores_filtered(
+    year: Optional[str] = None,
+    min_members: Optional[int] = None,
+    risk_levels: Optional[Sequence[str]] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pl.DataFrame:
+    """Load the IVI score rows and columns a page renders (see scan_ivi_scores)."""
+    return _load_ivi_scores_filtered(
+        current_fingerprint('ivi_scores'), year, min_members, risk_levels, columns
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_shap_subscores(fingerprint: str) -> pl.DataFrame:
+    """Load one version of the SHAP subscores."""
+    return read_shared(_table_paths()['shap_subscores'], fingerprint)
 
 
-@st.cache_data(ttl=3600)
 def load_shap_subscores() -> pl.DataFrame:
     """Load SHAP-based H, E, U subscores."""
-    return pl.read_parquet(MODELS_DIR / 'shap_subscores.parquet')
+    return _load_shap_subscores(current_fingerprint('shap_subscores'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_contract_level(fingerprint: str) -> pl.DataFrame:
+    """Load one version of the contract-level data."""
+    return read_shared(_table_paths()['contract_level'], fingerprint)
 
 
-@st.cache_data(ttl=3600)
 def load_contract_level() -> pl.DataFrame:
     """Load contract-level aggregated data."""
-    return pl.read_parquet(PROCESSED_DIR / 'contract_level.parquet')
+    return _load_contract_level(current_fingerprint('contract_level'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_provider_reference(fingerprint: str) -> pl.DataFrame:
+    """Load one version of the provider reference data."""
+    return read_version(_table_paths()['provider_reference'], fingerprint, pl.read_parquet)
 
 
-@st.cache_data(ttl=3600)
 def load_provider_reference() -> pl.DataFrame:
     """Load provider reference data."""
-    return pl.read_parquet(PROCESSED_DIR / 'ref_provider.parquet')
+    return _load_provider_reference(current_fingerprint('provider_reference'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_feature_importance(fingerprint: str) -> pl.DataFrame:
+    """Load one version of the feature importance table."""
+    import pandas as pd
+    return pl.from_pandas(read_version(_table_paths()['feature_importance'], fingerprint, pd.read_csv))
 
 
-@st.cache_data(ttl=3600)
 def load_feature_importance() -> pl.DataFrame:
     """Load feature importance from model."""
-    import pandas as pd
-    return pl.from_pandas(pd.read_csv(MODELS_DIR / 'feature_importance.csv'))
+    return _load_feature_importance(current_fingerprint('feature_importance'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_model_bundle(fingerprint: str) -> dict:
+    """Load one version of the IVI model bundle."""
+    return load_bundle(_table_paths()['model_bundle'])
 
 
-def get_portfolio_summary(df: pl.DataFrame, year: Optional[str] = None) -> dict:
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_aggregate_cube(fingerprint: str) -> pl.DataFrame:
+    """Build the aggregate cube for one version of the IVI scores."""
+    return build_aggregate_cube(_load_ivi_scores(fingerprint))
+
+
+def load_aggregate_cube() -> pl.DataFrame:
+    """Load the portfolio/segment aggregate cube (see utils.aggregates)."""
+    return _load_aggregate_cube(current_fingerprint('ivi_scores'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_score_histogram(fingerprint: str) -> pl.DataFrame:
+    """Build the IVI score histogram for one version of the IVI scores."""
+    return build_score_histogram(_load_ivi_scores(fingerprint))
+
+
+def load_score_histogram() -> pl.DataFrame:
+    """Load one-point IVI score bins keyed like the aggregate cube."""
+    return _load_score_histogram(current_fingerprint('ivi_scores'))
+
+
+def build_row_index(df: pl.DataFrame, keys: Sequence[str]) -> Dict[Tuple, int]:
     """
-    Calculate portfolio-level summary statistics.
+    Map each key combination to the offset of its first row.
+    
+    Args:
+        df: Table to index
+        keys: Key columns (e.g. CONTRACT_NO, YEAR)
+    
+    Returns:
+        Dictionary of key tuple -> row offset
+    """
+    first_rows = df.select(list(keys)).with_row_index('ROW_OFFSET').group_by(
+        list(keys), maintain_order=True
+    ).agg(pl.col('ROW_OFFSET').first())
+    
+    return {row[:-1]: row[-1] for row in first_rows.iter_rows()}
+
+
+def shap_index_keys(shap_df: pl.DataFrame) -> Tuple[str, ...]:
+    """SHAP subscores are per contract, or per contract-year when YEAR is present."""
+    return ('CONTRACT_NO', 'YEAR') if 'YEAR' in shap_df.columns else ('CONTRACT_NO',)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_ivi_index(fingerprint: str) -> Dict[Tuple, int]:
+    """Build the contract-year index for one version of the IVI scores."""
+    return build_row_index(_load_ivi_scores(fingerprint), ('CONTRACT_NO', 'YEAR'))
+
+
+def load_ivi_index() -> Dict[Tuple, int]:
+    """Load the (CONTRACT_NO, YEAR) -> row offset index into load_ivi_scores()."""
+    return _load_ivi_index(current_fingerprint('ivi_scores'))
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_shap_index(fingerprint: str) -> Dict[Tuple, int]:
+    """Build the contract index for one version of the SHAP subscores."""
+    shap_df = _load_shap_subscores(fingerprint)
+    return build_row_index(shap_df, shap_index_keys(shap_df))
+
+
+def load_shap_index() -> Dict[Tuple, int]:
+    """Load the contract -> row offset index into load_shap_subscores()."""
+    return _load_shap_index(current_fingerprint('shap_subscores'))
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_search_index(
+    fingerprint: str,
+    year: Optional[str],
+    min_members: Optional[int],
+) -> dict:
+    """Build the contract search index for one version of a filtered slice."""
+    return build_search_index(
+        _load_ivi_scores_filtered(fingerprint, year, min_members, None, None)
+    )
+
+
+def load_search_index(year: Optional[str] = None, min_members: Optional[int] = None) -> dict:
+    """Load the contract search index (see utils.search) for the sidebar filters."""
+    return _load_search_index(current_fingerprint('ivi_scores'), year, min_members)
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_benchmark_store(fingerprint: str) -> dict:
+    """Build the benchmark store for one version of the IVI scores."""
+    return build_benchmark_store(_load_ivi_scores(fingerprint), BENCHMARK_METRICS)
+
+
+# Benchmark store extended with KPIs added to KPI_DEFINITIONS after it was
+# built, by fingerprint. Entries are replaced, never modified in place.
+_benchmark_stores: dict = {}
+_benchmark_lock = threading.Lock()
+
+
+def _benchmark_store(fingerprint: str) -> dict:
+    """Benchmark store for one version of the IVI scores, covering every KPI."""
+    store = _benchmark_stores.get(fingerprint) or _load_benchmark_store(fingerprint)
+    extended = add_benchmark_metrics(store, _load_ivi_scores(fingerprint), list(KPI_DEFINITIONS))
+    if extended is not store:
+        with _benchmark_lock:
+            _benchmark_stores.clear()
+            _benchmark_stores[fingerprint] = extended
+    return extended
+
+
+def get_benchmarks(
+    year: Optional[str] = None,
+    min_members: int = 1,
+    segment: Optional[str] = None,
+    region: Optional[str] = None,
+) -> Optional[dict]:
+    """
+    Serve precomputed benchmarks for a filter combination (see utils.benchmarks).
+    
+    KPIs added to KPI_DEFINITIONS after the store was built are computed on
+    first use into a new store that replaces the cached one.
     
     Args:
-        df: IVI scores dataframe
         year: Optional year filter ('2022' or '2023')
+        min_members: Minimum members threshold
+        segment: Optional segment
+        region: Optional primary region
     
     Returns:
-        Dictionary with summary metrics
+        Dictionary with benchmark metrics, or None if the combination is not stored
     """
-    if year:
-        df = df.filter(pl.col('YEAR') == year)
+    store = _benchmark_store(current_fingerprint('ivi_scores'))
+    return get_benchmark(store, year, min_members, segment, region)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_correlation_matrix(
+    fingerprint: str,
+    year: Optional[str],
+    min_members: Optional[int],
+    method: str,
+) -> dict:
+    """Compute the KPI correlation matrix for one version of a filtered slice."""
+    return correlation_matrix(
+        _load_ivi_scores_filtered(fingerprint, year, min_members, None, None), method=method
+    )
+
+
+def load_correlation_matrix(
+    year: Optional[str] = None,
+    min_members: Optional[int] = None,
+    method: str = 'pearson',
+) -> dict:
+    """Load the full KPI correlation matrix (see utils.correlation) for the sidebar filters."""
+    return _load_correlation_matrix(current_fingerprint('ivi_scores'), year, min_members, method)
+
+
+@st.cache_resource(max_entries=128, show_spinner=False)
+def _load_kpi_sketch(fingerprint: str, kpi: str) -> dict:
+    """Build the distribution sketch of one KPI for one version of the IVI scores."""
+    return build_kpi_sketch(_load_ivi_scores(fingerprint), kpi)
+
+
+def load_kpi_sketch(kpi: str) -> dict:
+    """Load the mergeable distribution sketch of a KPI (see utils.distributions)."""
+    return _load_kpi_sketch(current_fingerprint('ivi_scores'), kpi)
+
+
+def intervention_queue_path(fingerprint: str) -> Path:
+    """Persisted intervention queue for one version of the IVI scores."""
+    return CACHE_DIR / f'intervention_queue-{fingerprint[:16]}.parquet'
+
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_intervention_queue(fingerprint: str) -> pl.DataFrame:
+    """Load (building and persisting if needed) one version of the intervention queue."""
+    queue_path = intervention_queue_path(fingerprint)
+    if queue_path.exists():
+        return pl.read_parquet(queue_path)
     
-    return {
-        'total_contracts': df.height,
-        'total_members': df['TOTAL_MEMBERS'].sum(),
-        'total_premium': df['WRITTEN_PREMIUM'].sum(),
-        'avg_ivi_score': df['IVI_SCORE'].mean(),
-        'median_ivi_score': df['IVI_SCORE'].median(),
-        'high_risk_count': df.filter(pl.col('IVI_RISK') == 'HIGH_RISK').height,
-        'moderate_risk_count': df.filter(pl.col('IVI_RISK') == 'MODERATE_RISK').height,
-        'low_risk_count': df.filter(pl.col('IVI_RISK') == 'LOW_RISK').height,
-        'avg_loss_ratio': df['LOSS_RATIO'].mean(),
-        'retention_rate': df['RETAINED_NEXT_YEAR'].mean() if 'RETAINED_NEXT_YEAR' in df.columns else None,
-    }
+    queue = build_intervention_queue(_load_ivi_scores(fingerprint))
+    
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = queue_path.with_name(f'{queue_path.name}.{os.getpid()}.tmp')
+    queue.write_parquet(tmp_path)
+    os.replace(tmp_path, queue_path)
+    
+    for stale in CACHE_DIR.glob('intervention_queue-*.parquet'):
+        if stale != queue_path:
+            stale.unlink(missing_ok=True)
+    
+    return queue
 
 
-def get_segment_summary(df: pl.DataFrame) -> pl.DataFrame:
+def load_intervention_queue() -> pl.DataFrame:
+    """Load the pre-sorted intervention queue (see utils.recommendations)."""
+    return _load_intervention_queue(current_fingerprint('ivi_scores'))
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_action_list(
+    fingerprint: str,
+    year: Optional[str],
+    min_members: int,
+    risk_levels: Optional[Sequence[str]],
+) -> pl.DataFrame:
+    """Build the recommendations of every contract in one filtered slice of the IVI scores."""
+    df = _load_ivi_scores_filtered(fingerprint, year, min_members, risk_levels, None)
+    benchmark = get_benchmark(_benchmark_store(fingerprint), year, min_members)
+    if benchmark is None:
+        benchmark = get_benchmark_stats(df)
+    return generate_recommendations_batch(df, benchmark)
+
+
+def load_action_list(
+    year: Optional[str] = None,
+    min_members: int = 1,
+    risk_levels: Optional[Sequence[str]] = None,
+) -> pl.DataFrame:
     """
-    Calculate summary statistics by segment.
+    Load the recommended actions of every contract matching the sidebar filters.
     
     Args:
-        df: IVI scores dataframe
+        year: Optional year filter ('2022' or '2023')
+        min_members: Minimum members threshold
+        risk_levels: Optional IVI_RISK levels to keep
     
     Returns:
-        DataFrame with segment-level metrics
+        Long-format recommendations (see generate_recommendations_batch)
     """
-    return df.group_by('SEGMENT').agg([
-        pl.count().alias('contract_count'),
-        pl.col('TOTAL_MEMBERS').sum().alias('total_members'),
-        pl.col('WRITTEN_PREMIUM').sum().alias('total_premium'),
-        pl.col('IVI_SCORE').mean().alias('avg_ivi_score'),
-        pl.col('LOSS_RATIO').mean().alias('avg_loss_ratio'),
-        pl.col('RETAINED_NEXT_YEAR').mean().alias('retention_rate'),
-    ]).sort('contract_count', descending=True)
+    return _load_action_list(current_fingerprint('ivi_scores'), year, min_members, risk_levels)
 
 
-def get_client_details(df: pl.DataFrame, contract_no: str, year: str = '2022') -> Optional[dict]:
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _load_whatif_scorer(bundle_fingerprint: str, scores_fingerprint: str, shap_fingerprint: str) -> dict:
+    """Build the what-if scorer for one version of the model, scores and SHAP subscores."""
+    return build_whatif_scorer(
+        _load_model_bundle(bundle_fingerprint),
+        _load_ivi_scores(scores_fingerprint),
+        _load_shap_subscores(shap_fingerprint),
+    )
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _load_whatif_baseline(versions: Tuple[str, str, str], contract_no: str, year: str) -> Optional[dict]:
+    """Baseline feature vector of one contract-year (see utils.whatif)."""
+    row = get_client_details(
+        _load_ivi_scores(versions[1]), contract_no, year, index=_load_ivi_index(versions[1])
+    )
+    return None if row is None else contract_baseline(_load_whatif_scorer(*versions), row)
+
+
+@st.cache_resource(max_entries=4096, show_spinner=False)
+def _load_whatif_score(
+    versions: Tuple[str, str, str],
+    contract_no: str,
+    year: str,
+    changes: Changes,
+) -> Optional[dict]:
+    """Scores of one perturbation of one contract-year, memoized."""
+    baseline = _load_whatif_baseline(versions, contract_no, year)
+    if baseline is None:
+        return None
+    return _score_whatif_row(_load_whatif_scorer(*versions), baseline, changes)
+
+
+def score_whatif(contract_no: str, year: str, changes: Changes = ()) -> Optional[dict]:
+    """
+    Rescore a contract-year with adjusted KPIs using the production model.
+
+    Args:
+        contract_no: Contract number
+        year: Year of the contract-year
+        changes: Sorted (KPI, new value) pairs; () gives the model's baseline
+
+    Returns:
+        Dictionary of IVI and H/E/U scores (see utils.whatif.score_whatif),
+        or None if the contract-year is not scored
+    """
+    versions = (
+        current_fingerprint('model_bundle'),
+        current_fingerprint('ivi_scores'),
+        current_fingerprint('shap_subscores'),
+    )
+    return _load_whatif_score(versions, contract_no, year, tuple(changes))
+
+
+# Version-keyed loader for each watched table
+_TABLE_LOADERS = {
+    'ivi_scores': _load_ivi_scores,
+    'shap_subscores': _load_shap_subscores,
+    'contract_level': _load_contract_level,
+    'provider_reference': _load_provider_reference,
+    'feature_importance': _load_feature_importance,
+    'model_bundle': _load_model_bundle,
+}
+
+# Artifacts derived from a table, rebuilt before its new version is served
+_DERIVED_LOADERS = {
+    'ivi_scores': [
+        _load_aggregate_cube, _load_score_histogram, _load_ivi_index, _load_benchmark_store,
+        _load_intervention_queue,
+    ],
+    'shap_subscores': [_load_shap_index],
+}
+
+
+def _watch_tables(interval: float):
+    """Poll table fingerprints and swap in changed tables once loaded."""
+    while True:
+        time.sleep(interval)
+        paths = _table_paths()
+        for table, loader in _TABLE_LOADERS.items():
+            try:
+                fingerprint = file_fingerprint(paths[table])
+            except (OSError, ValueError):
+                # Missing or mid-write: keep serving the current version
+                continue
+            
+            if fingerprint == _served_fingerprints.get(table):
+                continue
+            
+            try:
+                loader(fingerprint)
+                for derived_loader in _DERIVED_LOADERS.get(table, []):
+                    derived_loader(fingerprint)
+            except Exception:
+                # Keep serving the current version; retried on the next check
+                logger.exception('Refreshing %s to version %s failed', table, fingerprint[:16])
+                continue
+            _served_fingerprints[table] = fingerprint
+        
+        for table, fingerprint in list(_served_fingerprints.items()):
+            if paths[table].suffix == '.parquet':
+                prune_mirrors(paths[table], fingerprint)
+
+
+@st.cache_resource
+def start_table_watcher(interval: float = WATCH_INTERVAL_SECONDS) -> threading.Thread:
+    """
+    Start (once per process) the background thread that refreshes changed tables.
+    
+    Args:
+        interval: Seconds between fingerprint checks
+    
+    Returns:
+        The watcher thread
+    """
+    thread = threading.Thread(
+        target=_watch_tables, args=(interval,), name='ivi-table-watcher', daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def get_client_details(
+    df: pl.DataFrame,
+    contract_no: str,
+    year: str = '2022',
+    index: Optional[Dict[Tuple, int]] = None,
+) -> Optional[dict]:
     """
     Get detailed information for a specific client.
     
@@ -101,10 +706,15 @@ def get_client_details(df: pl.DataFrame, contract_no: str, year: str = '2022') -
         df: IVI scores dataframe
         contract_no: Contract number to look up
         year: Year to filter
+        index: Optional row index built on df (see load_ivi_index)
     
     Returns:
         Dictionary with client details or None if not found
     """
+    if index is not None:
+        offset = index.get((contract_no, year))
+        return None if offset is None else df.row(offset, named=True)
+    
     client = df.filter(
         (pl.col('CONTRACT_NO') == contract_no) & 
         (pl.col('YEAR') == year)
@@ -116,6 +726,40 @@ def get_client_details(df: pl.DataFrame, contract_no: str, year: str = '2022') -
     return client.row(0, named=True)
 
 
+def get_client_shap(
+    shap_df: pl.DataFrame,
+    contract_no: str,
+    year: Optional[str] = None,
+    index: Optional[Dict[Tuple, int]] = None,
+) -> Optional[dict]:
+    """
+    Get SHAP subscores for a specific client.
+    
+    Args:
+        shap_df: SHAP subscores dataframe
+        contract_no: Contract number to look up
+        year: Year to match when the subscores are per contract-year
+        index: Optional row index built on shap_df (see load_shap_index)
+    
+    Returns:
+        Dictionary with SHAP subscores or None if not found
+    """
+    per_year = len(shap_index_keys(shap_df)) == 2
+    
+    if index is not None:
+        offset = index.get((contract_no, year) if per_year else (contract_no,))
+        return None if offset is None else shap_df.row(offset, named=True)
+    
+    client = shap_df.filter(pl.col('CONTRACT_NO') == contract_no)
+    if per_year:
+        client = client.filter(pl.col('YEAR') == year)
+    
+    if client.height == 0:
+        return None
+    
+    return client.row(0, named=True)
+
+
 def get_benchmark_stats(df: pl.DataFrame, segment: Optional[str] = None) -> dict:
     """
     Calculate benchmark statistics for comparison.
@@ -248,21 +892,11 @@ KPI_DEFINITIONS = {
     },
 }
 
-# Segment priority ordering
-SEGMENT_PRIORITY = {
-    'HIGH_RISK_LARGE_UNPROFITABLE': 1,
-    'HIGH_RISK_LARGE_PROFITABLE': 2,
-    'HIGH_RISK_SMALL_UNPROFITABLE': 3,
-    'HIGH_RISK_SMALL_PROFITABLE': 4,
-    'MODERATE_RISK_LARGE_UNPROFITABLE': 5,
-    'MODERATE_RISK_LARGE_PROFITABLE': 6,
-    'MODERATE_RISK_SMALL_UNPROFITABLE': 7,
-    'MODERATE_RISK_SMALL_PROFITABLE': 8,
-    'LOW_RISK_LARGE_UNPROFITABLE': 9,
-    'LOW_RISK_LARGE_PROFITABLE': 10,
-    'LOW_RISK_SMALL_UNPROFITABLE': 11,
-    'LOW_RISK_SMALL_PROFITABLE': 12,
-}
+# KPIs averaged in the benchmark store (get_benchmark_stats metrics + KPI_DEFINITIONS)
+BENCHMARK_METRICS = list(dict.fromkeys([
+    'UTILIZATION_RATE', 'LOSS_RATIO', 'COST_PER_MEMBER', 'CALLS_PER_MEMBER',
+    'REJECTION_RATE', 'APPROVAL_RATE', 'AVG_RESOLUTION_DAYS', 'DIAGNOSES_PER_UTILIZER',
+] + list(KPI_DEFINITIONS)))
 
 # Recommendations by segment
 SEGMENT_RECOMMENDATIONS = {
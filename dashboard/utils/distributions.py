@@ -0,0 +1,159 @@
+"""
+Mergeable KPI distribution sketches for the IVI Dashboard.
+
+For each KPI, contract values are bucketed once per data version into
+equi-depth sketch bins (count, min and max per bin) and fixed-width display
+bins, per YEAR, min-members bucket, IVI_RISK, SEGMENT and PRIMARY_REGION
+cell. Any sidebar filter combination is answered by summing the matching
+cells, so percentiles and distribution charts never touch contract rows.
+"""
+
+import numpy as np
+import polars as pl
+from typing import Dict, List, Optional, Sequence
+
+from .aggregates import members_bucket_expr, slice_cube
+
+SKETCH_DIMENSIONS = ['YEAR', 'MEMBERS_BUCKET', 'IVI_RISK', 'SEGMENT', 'PRIMARY_REGION']
+
+# Equi-depth bins per KPI: percentile error is at most one bin of the portfolio
+SKETCH_BINS = 256
+
+# Equal-width bins for distribution charts
+HISTOGRAM_BINS = 30
+
+
+def build_kpi_sketch(df: pl.DataFrame, kpi: str) -> dict:
+    """
+    Build the distribution sketch for one KPI.
+
+    Args:
+        df: IVI scores dataframe
+        kpi: KPI column
+
+    Returns:
+        Dictionary with the KPI name, display bin 'hist_edges', the 'sketch'
+        table (cells x sketch bin: count, min, max) and the 'histogram' table
+        (cells x display bin: count)
+    """
+    values = df[kpi].cast(pl.Float64).fill_nan(None).drop_nulls().to_numpy()
+    if len(values) == 0:
+        return {'kpi': kpi, 'hist_edges': np.array([]), 'sketch': None, 'histogram': None}
+
+    sketch_edges = np.unique(np.quantile(values, np.linspace(0, 1, SKETCH_BINS + 1)))
+    hist_edges = np.linspace(values.min(), values.max(), HISTOGRAM_BINS + 1)
+
+    column = df[kpi].cast(pl.Float64).fill_nan(None).to_numpy()
+    present = ~np.isnan(column)
+    cells = df.filter(pl.Series(present)).select(
+        [pl.col(kpi).cast(pl.Float64).alias('VALUE'), members_bucket_expr()]
+        + [pl.col(dim) for dim in SKETCH_DIMENSIONS if dim != 'MEMBERS_BUCKET']
+    ).with_columns([
+        pl.Series('SKETCH_BIN', np.searchsorted(sketch_edges[1:-1], column[present], side='right')),
+        pl.Series('HIST_BIN', np.clip(
+            np.searchsorted(hist_edges[1:-1], column[present], side='right'), 0, HISTOGRAM_BINS - 1
+        )),
+    ])
+
+    sketch = cells.group_by(SKETCH_DIMENSIONS + ['SKETCH_BIN']).agg([
+        pl.len().alias('count'),
+        pl.col('VALUE').min().alias('min'),
+        pl.col('VALUE').max().alias('max'),
+    ])
+    histogram = cells.group_by(SKETCH_DIMENSIONS + ['HIST_BIN']).agg(pl.len().alias('count'))
+
+    return {'kpi': kpi, 'hist_edges': hist_edges, 'sketch': sketch, 'histogram': histogram}
+
+
+def merge_sketch(
+    sketch: dict,
+    year: Optional[str] = None,
+    min_members: Optional[int] = None,
+    risk_levels: Optional[Sequence[str]] = None,
+    by: Sequence[str] = (),
+) -> dict:
+    """
+    Merge the cells matching the sidebar filters.
+
+    Args:
+        sketch: Result of build_kpi_sketch
+        year: Optional year filter
+        min_members: Optional minimum members (one of MEMBER_BUCKETS)
+        risk_levels: Optional IVI_RISK levels to keep
+        by: Dimensions to keep separate (e.g. ['IVI_RISK'])
+
+    Returns:
+        Dictionary with merged 'sketch' and 'histogram' tables and 'hist_edges'
+    """
+    if sketch['sketch'] is None:
+        return sketch
+
+    by = list(by)
+    bins = slice_cube(sketch['sketch'], year, min_members, risk_levels).group_by(
+        by + ['SKETCH_BIN']
+    ).agg([
+        pl.col('count').sum(),
+        pl.col('min').min(),
+        pl.col('max').max(),
+    ]).sort(by + ['SKETCH_BIN'])
+    histogram = slice_cube(sketch['histogram'], year, min_members, risk_levels).group_by(
+        by + ['HIST_BIN']
+    ).agg(pl.col('count').sum()).sort(by + ['HIST_BIN'])
+
+    return {'kpi': sketch['kpi'], 'hist_edges': sketch['hist_edges'], 'sketch': bins, 'histogram': histogram}
+
+
+def sketch_quantiles(bins: pl.DataFrame, quantiles: Sequence[float]) -> List[Optional[float]]:
+    """
+    Estimate quantiles from merged sketch bins.
+
+    Interpolates linearly between the min and max of the bin holding the
+    target rank; exact whenever that bin holds a single distinct value.
+
+    Args:
+        bins: Merged sketch bins for one group (SKETCH_BIN, count, min, max)
+        quantiles: Quantiles in [0, 1]
+
+    Returns:
+        Estimated values (None if the sketch is empty)
+    """
+    if bins is None or bins.height == 0:
+        return [None] * len(quantiles)
+
+    counts = bins['count'].to_numpy()
+    mins = bins['min'].to_numpy()
+    maxs = bins['max'].to_numpy()
+    before = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    total = counts.sum()
+
+    results = []
+    for q in quantiles:
+        rank = q * (total - 1)
+        i = min(np.searchsorted(before + counts, rank, side='right'), len(counts) - 1)
+        within = (rank - before[i]) / max(counts[i] - 1, 1)
+        results.append(float(mins[i] + (maxs[i] - mins[i]) * min(max(within, 0.0), 1.0)))
+    return results
+
+
+def sketch_box_stats(bins: pl.DataFrame) -> Dict[str, Optional[float]]:
+    """
+    Box plot statistics (Tukey fences clipped to the data range) from sketch bins.
+
+    Args:
+        bins: Merged sketch bins for one group
+
+    Returns:
+        Dictionary with q1, median, q3, lowerfence and upperfence
+    """
+    q1, median, q3 = sketch_quantiles(bins, [0.25, 0.5, 0.75])
+    if median is None:
+        return {'q1': None, 'median': None, 'q3': None, 'lowerfence': None, 'upperfence': None}
+
+    iqr = q3 - q1
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': max(bins['min'].min(), q1 - 1.5 * iqr),
+        'upperfence': min(bins['max'].max(), q3 + 1.5 * iqr),
+    }
@@ -2,7 +2,87 @@
 Recommendation generation logic for IVI Dashboard.
 """
 
-from typing import Dict, List, Optional
+import hashlib
+import json
+import re
+import polars as pl
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .aggregates import members_bucket_expr, slice_cube
+
+
+# Recommendation rules are defined in a JSON spec so thresholds can change
+# without a code deploy. Each rule has:
+#   kpi:            Column compared against the thresholds
+#   threshold:      Rule fires when kpi > threshold
+#   high_threshold: Optional; priority becomes HIGH when kpi > high_threshold
+#   relative_to:    Optional {key, default} benchmark; thresholds are multiples of it
+#   benchmark:      Optional {key, default} benchmark shown as {benchmark} in the cause
+#   format:         Format of {value} and {benchmark} ('.Nf', ',.Nf' or '.N%')
+#   priority, dimension, issue, cause, action, impact: Recommendation text
+RULES_PATH = Path(__file__).parent / 'recommendation_rules.json'
+
+PRIORITY_ORDER = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
+
+_REQUIRED_RULE_FIELDS = (
+    'kpi', 'threshold', 'priority', 'dimension', 'issue', 'cause', 'format', 'action', 'impact'
+)
+_FORMAT_SPEC = re.compile(r'^,?\.\d+[f%]$')
+
+# Parsed and compiled rule sets, keyed by spec content hash
+_rule_specs: Dict[str, List[Dict]] = {}
+_compiled_rules: Dict[str, List[Dict]] = {}
+
+
+def _read_rule_spec(path: Optional[Path] = None) -> Tuple[str, List[Dict]]:
+    """Read the rule spec, returning (content hash, validated rules)."""
+    content = Path(path or RULES_PATH).read_bytes()
+    spec_hash = hashlib.blake2b(content, digest_size=16).hexdigest()
+    
+    if spec_hash not in _rule_specs:
+        rules = json.loads(content)['rules']
+        for i, rule in enumerate(rules):
+            missing = [field for field in _REQUIRED_RULE_FIELDS if field not in rule]
+            if missing:
+                raise ValueError(f"Recommendation rule {i} is missing {', '.join(missing)}")
+            if rule['priority'] not in PRIORITY_ORDER:
+                raise ValueError(f"Recommendation rule {i} has unknown priority {rule['priority']!r}")
+            if not _FORMAT_SPEC.match(rule['format']):
+                raise ValueError(f"Recommendation rule {i} has unsupported format {rule['format']!r}")
+        _rule_specs[spec_hash] = rules
+    
+    return spec_hash, _rule_specs[spec_hash]
+
+
+def load_recommendation_rules(path: Optional[Path] = None) -> List[Dict]:
+    """
+    Load the recommendation rule spec.
+    
+    Args:
+        path: Optional spec path (defaults to RULES_PATH)
+    
+    Returns:
+        List of rule dictionaries
+    """
+    return _read_rule_spec(path)[1]
+
+
+def _rule_thresholds(rule: Dict, benchmark_data: Dict) -> Tuple[float, Optional[float]]:
+    """Resolve a rule's (threshold, high_threshold) against the benchmarks."""
+    scale = 1
+    if 'relative_to' in rule:
+        scale = benchmark_data.get(rule['relative_to']['key'], rule['relative_to']['default'])
+    
+    high = rule.get('high_threshold')
+    return rule['threshold'] * scale, None if high is None else high * scale
+
+
+def _rule_benchmark(rule: Dict, benchmark_data: Dict) -> Optional[float]:
+    """Benchmark value shown in a rule's cause, if any."""
+    if 'benchmark' not in rule:
+        return None
+    return benchmark_data.get(rule['benchmark']['key'], rule['benchmark']['default'])
 
 
 def generate_recommendations(client_data: Dict, benchmark_data: Dict) -> List[Dict]:
@@ -18,105 +98,212 @@ def generate_recommendations(client_data: Dict, benchmark_data: Dict) -> List[Di
     """
     recommendations = []
     
-    # Experience issues - Pre-auth rejection
-    if client_data.get('REJECTION_RATE', 0) > 0.25:
-        severity = 'HIGH' if client_data['REJECTION_RATE'] > 0.40 else 'MEDIUM'
+    for rule in load_recommendation_rules():
+        value = client_data.get(rule['kpi'], 0)
+        threshold, high_threshold = _rule_thresholds(rule, benchmark_data)
+        if value is None or value <= threshold:
+            continue
+        
+        benchmark = _rule_benchmark(rule, benchmark_data)
+        fmt = rule['format']
         recommendations.append({
-            'priority': severity,
-            'dimension': 'E',
-            'issue': 'High pre-authorization rejection rate',
-            'cause': f"Rejection rate {client_data['REJECTION_RATE']:.1%} vs {benchmark_data.get('avg_rejection_rate', 0.15):.1%} benchmark",
-            'action': 'Review rejection reasons, consider provider network expansion, assign dedicated pre-auth handler',
-            'impact': 'Could improve E_SCORE by 15-20 points'
+            'priority': 'HIGH' if high_threshold is not None and value > high_threshold else rule['priority'],
+            'dimension': rule['dimension'],
+            'issue': rule['issue'],
+            'cause': rule['cause'].format(
+                value=f"{value:{fmt}}",
+                benchmark=f"{benchmark:{fmt}}" if benchmark is not None else ''
+            ),
+            'action': rule['action'],
+            'impact': rule['impact']
         })
     
-    # Experience issues - Resolution time
-    if client_data.get('AVG_RESOLUTION_DAYS', 0) > 10:
-        severity = 'HIGH' if client_data['AVG_RESOLUTION_DAYS'] > 15 else 'MEDIUM'
-        recommendations.append({
-            'priority': severity,
-            'dimension': 'E',
-            'issue': 'Long ticket resolution time',
-            'cause': f"Average {client_data['AVG_RESOLUTION_DAYS']:.1f} days vs {benchmark_data.get('avg_resolution_days', 5):.1f} day benchmark",
-            'action': 'Assign dedicated support representative, review escalation process, implement priority queuing',
-            'impact': 'Improved E_SCORE and client satisfaction'
-        })
+    # Sort by priority
+    recommendations.sort(key=lambda x: PRIORITY_ORDER[x['priority']])
     
-    # Experience issues - High call volume
-    if client_data.get('CALLS_PER_MEMBER', 0) > 0.35:
-        severity = 'MEDIUM'
-        recommendations.append({
-            'priority': severity,
-            'dimension': 'E',
-            'issue': 'High support call volume',
-            'cause': f"{client_data['CALLS_PER_MEMBER']:.2f} calls/member vs {benchmark_data.get('avg_calls_per_member', 0.2):.2f} benchmark",
-            'action': 'Proactive communication, member education materials, digital self-service promotion',
-            'impact': 'Reduced operational costs and improved member experience'
-        })
+    return recommendations
+
+
+def format_number_expr(expr: pl.Expr, fmt: str) -> pl.Expr:
+    """
+    Format a numeric expression like Python's format() for '.Nf', ',.Nf' and '.N%'.
     
-    # Cost issues - Loss ratio
-    if client_data.get('LOSS_RATIO', 0) > 1.2:
-        severity = 'HIGH' if client_data['LOSS_RATIO'] > 1.5 else 'MEDIUM'
-        recommendations.append({
-            'priority': severity,
-            'dimension': 'U',
-            'issue': 'Unprofitable loss ratio',
-            'cause': f"Loss ratio {client_data['LOSS_RATIO']:.2f} (break-even = 1.0)",
-            'action': 'Premium adjustment discussion, benefit redesign, cost-sharing increase, wellness program enrollment',
-            'impact': 'Required for sustainable contract renewal'
-        })
+    Args:
+        expr: Numeric expression
+        fmt: Format spec
     
-    # Cost issues - High cost per member
-    avg_cost = benchmark_data.get('avg_cost_per_member', 4500)
-    if client_data.get('COST_PER_MEMBER', 0) > avg_cost * 1.5:
-        severity = 'HIGH' if client_data['COST_PER_MEMBER'] > avg_cost * 2 else 'MEDIUM'
-        recommendations.append({
-            'priority': severity,
-            'dimension': 'U',
-            'issue': 'High cost per member',
-            'cause': f"SAR {client_data['COST_PER_MEMBER']:,.0f}/member vs SAR {avg_cost:,.0f} benchmark",
-            'action': 'Claims audit, chronic condition management program, provider steering incentives',
-            'impact': 'Improved U_SCORE and profitability'
-        })
+    Returns:
+        String expression (null where the input is null)
+    """
+    percent = fmt.endswith('%')
+    decimals = int(fmt.strip(',.f%') or 0)
+    value = expr.cast(pl.Float64)
+    value = value * 100 if percent else value
+    finite = value.is_finite()
     
-    # Health issues - High utilization
-    if client_data.get('UTILIZATION_RATE', 0) > 0.75:
-        recommendations.append({
-            'priority': 'MEDIUM',
-            'dimension': 'H',
-            'issue': 'High healthcare utilization',
-            'cause': f"Utilization {client_data['UTILIZATION_RATE']:.1%} vs {benchmark_data.get('avg_utilization_rate', 0.52):.1%} benchmark",
-            'action': 'Wellness program introduction, preventive screening campaign, health education',
-            'impact': 'Long-term cost reduction and improved H_SCORE'
-        })
+    # Ties are rounded on the float product, so a value stored just off a tie
+    # (0.285) can differ from format() in the last digit
+    scaled = pl.when(finite).then((value.abs() * 10 ** decimals).round(0)).cast(pl.Int64)
+    text = (scaled // 10 ** decimals).cast(pl.Utf8)
+    if fmt.startswith(','):
+        # Group thousands by inserting separators into the reversed digits
+        text = text.str.reverse().str.replace_all(r'(\d{3})', '${1},').str.reverse().str.strip_chars_start(',')
     
-    # Health issues - High diagnoses per utilizer
-    if client_data.get('DIAGNOSES_PER_UTILIZER', 0) > 4.0:
-        recommendations.append({
-            'priority': 'MEDIUM',
-            'dimension': 'H',
-            'issue': 'High chronic condition burden',
-            'cause': f"{client_data['DIAGNOSES_PER_UTILIZER']:.1f} diagnoses/utilizer vs {benchmark_data.get('avg_diagnoses_per_utilizer', 2.8):.1f} benchmark",
-            'action': 'Disease management programs, chronic care coordination, specialist referral optimization',
-            'impact': 'Improved health outcomes and cost predictability'
-        })
+    # format() keeps the sign of values that round to zero, including -0.0
+    negative = (value < 0) | ((value == 0) & (pl.lit(1.0) / value < 0))
+    sign = pl.when(negative).then(pl.lit('-')).otherwise(pl.lit(''))
+    parts = [sign, text]
+    if decimals:
+        parts += [pl.lit('.'), (scaled % 10 ** decimals).cast(pl.Utf8).str.zfill(decimals)]
+    number = (
+        pl.when(finite).then(pl.concat_str(parts))
+        .when(value.is_nan()).then(pl.lit('nan'))
+        .when(value.is_infinite()).then(pl.concat_str([sign, pl.lit('inf')]))
+    )
     
-    # Health issues - High maximum claim
-    if client_data.get('MAX_CLAIM_AMOUNT', 0) > 100000:
-        recommendations.append({
-            'priority': 'LOW',
-            'dimension': 'H',
-            'issue': 'Catastrophic claim exposure',
-            'cause': f"Max claim SAR {client_data['MAX_CLAIM_AMOUNT']:,.0f}",
-            'action': 'Case management review, reinsurance consideration, large claim monitoring',
-            'impact': 'Risk mitigation for future catastrophic events'
+    return pl.concat_str([number, pl.lit('%')]) if percent else number
+
+
+def _template_expr(template: str, values: Dict[str, pl.Expr]) -> pl.Expr:
+    """Fill {name} placeholders in a template with string expressions."""
+    pieces = re.split(r'\{(\w+)\}', template)
+    parts = [
+        values[piece] if i % 2 else pl.lit(piece)
+        for i, piece in enumerate(pieces) if i % 2 or piece
+    ]
+    return pl.concat_str(parts)
+
+
+def _benchmark_column(key: str) -> str:
+    """Name of the literal column carrying a benchmark value during evaluation."""
+    return f'__benchmark_{key}'
+
+
+def compile_rules(path: Optional[Path] = None) -> List[Dict]:
+    """
+    Compile the rule spec into Polars expressions.
+    
+    Benchmarks enter the expressions as columns (see _benchmark_column), so a
+    compiled rule set does not depend on the benchmark values and is cached
+    by spec content hash until the spec file changes.
+    
+    Args:
+        path: Optional spec path (defaults to RULES_PATH)
+    
+    Returns:
+        List of compiled rules with 'condition', 'priority_expr' and
+        'cause_expr' expressions plus the benchmarks they read
+    """
+    spec_hash, rules = _read_rule_spec(path)
+    if spec_hash in _compiled_rules:
+        return _compiled_rules[spec_hash]
+    
+    compiled = []
+    for order, rule in enumerate(rules):
+        value = pl.col(rule['kpi'])
+        fmt = rule['format']
+        benchmarks = {}
+        
+        scale = pl.lit(1.0)
+        if 'relative_to' in rule:
+            benchmarks[rule['relative_to']['key']] = rule['relative_to']['default']
+            scale = pl.col(_benchmark_column(rule['relative_to']['key']))
+        
+        priority = pl.lit(rule['priority'])
+        if rule.get('high_threshold') is not None:
+            priority = pl.when(value > rule['high_threshold'] * scale).then(
+                pl.lit('HIGH')
+            ).otherwise(priority)
+        
+        shown_benchmark = pl.lit('')
+        if 'benchmark' in rule:
+            benchmarks[rule['benchmark']['key']] = rule['benchmark']['default']
+            # A missing benchmark reads as '' in the cause, as in the scalar path
+            shown_benchmark = format_number_expr(
+                pl.col(_benchmark_column(rule['benchmark']['key'])), fmt
+            ).fill_null('')
+        
+        compiled.append({
+            **rule,
+            'order': order,
+            'benchmarks': benchmarks,
+            'condition': value > rule['threshold'] * scale,
+            'priority_expr': priority,
+            'cause_expr': _template_expr(rule['cause'], {
+                'value': format_number_expr(value, fmt),
+                'benchmark': shown_benchmark,
+            }),
         })
     
-    # Sort by priority
-    priority_order = {'HIGH': 0, 'MEDIUM': 1, 'LOW': 2}
-    recommendations.sort(key=lambda x: priority_order[x['priority']])
+    _compiled_rules[spec_hash] = compiled
+    return compiled
+
+
+def generate_recommendations_batch(
+    df: pl.DataFrame,
+    benchmark_data: Dict,
+    id_columns: Sequence[str] = ('CONTRACT_NO', 'YEAR'),
+) -> pl.DataFrame:
+    """
+    Generate recommendations for every contract in one columnar pass.
     
-    return recommendations
+    Evaluates the compiled rule spec (see compile_rules) over the whole
+    frame in a single lazy query.
+    
+    Args:
+        df: IVI scores dataframe (one row per contract-year)
+        benchmark_data: Dictionary with benchmark metrics
+        id_columns: Columns identifying a contract in the output
+    
+    Returns:
+        Long-format DataFrame with one row per (contract, recommendation),
+        sorted by contract then priority
+    """
+    id_columns = [col for col in id_columns if col in df.columns]
+    rules = [rule for rule in compile_rules() if rule['kpi'] in df.columns]
+    if not rules:
+        return pl.DataFrame()
+    
+    # Bind benchmark values as literal columns read by the compiled expressions
+    benchmarks = {}
+    for rule in rules:
+        for key, default in rule['benchmarks'].items():
+            benchmarks[key] = benchmark_data.get(key, default)
+    lf = df.lazy().with_columns([
+        pl.lit(value, dtype=pl.Float64).alias(_benchmark_column(key))
+        for key, value in benchmarks.items()
+    ])
+    
+    # Per-rule matches carry only the row-dependent fields; rule text is joined on
+    matches = [
+        lf.filter(rule['condition']).select(id_columns + [
+            pl.lit(rule['order'], dtype=pl.Int32).alias('rule_order'),
+            pl.col(rule['kpi']).cast(pl.Float64).alias('value'),
+            rule['priority_expr'].alias('priority'),
+            rule['cause_expr'].alias('cause'),
+        ])
+        for rule in rules
+    ]
+    rule_text = pl.LazyFrame(
+        [
+            {
+                'rule_order': rule['order'],
+                'kpi': rule['kpi'],
+                'dimension': rule['dimension'],
+                'issue': rule['issue'],
+                'action': rule['action'],
+                'impact': rule['impact'],
+            }
+            for rule in rules
+        ],
+        schema_overrides={'rule_order': pl.Int32}
+    )
+    
+    return pl.concat(matches).join(rule_text, on='rule_order', how='left').with_columns(
+        pl.col('priority').replace_strict(PRIORITY_ORDER, return_dtype=pl.Int8).alias('priority_rank')
+    ).sort(id_columns + ['priority_rank', 'rule_order']).select(
+        id_columns + ['kpi', 'value', 'priority', 'dimension', 'issue', 'cause', 'action', 'impact']
+    ).collect()
 
 
 def get_segment_action_plan(segment: str) -> Dict:
@@ -181,6 +368,100 @@ def calculate_priority_score(
     return round(priority_score, 2)
 
 
+def priority_score_expr(
+    ivi_score: str = 'IVI_SCORE',
+    premium: str = 'WRITTEN_PREMIUM',
+    loss_ratio: str = 'LOSS_RATIO',
+    total_members: str = 'TOTAL_MEMBERS'
+) -> pl.Expr:
+    """
+    Vectorized calculate_priority_score over columns.
+    
+    Args:
+        ivi_score: IVI score column (0-100)
+        premium: Written premium column (SAR)
+        loss_ratio: Loss ratio column
+        total_members: Member count column
+    
+    Returns:
+        PRIORITY_SCORE expression (higher = more urgent)
+    """
+    risk_factor = (100 - pl.col(ivi_score)) / 100
+    value_factor = pl.max_horizontal(pl.col(premium), pl.lit(1000)).log10() / 10
+    actionability = (
+        pl.when(pl.col(loss_ratio) < 1.0).then(1.2)
+        .when(pl.col(loss_ratio) < 1.5).then(1.0)
+        .otherwise(0.7)
+    )
+    size_factor = pl.min_horizontal(pl.col(total_members) / 100, pl.lit(1.5))
+    
+    return (
+        risk_factor * value_factor * actionability * size_factor * 100
+    ).round(2).alias('PRIORITY_SCORE')
+
+
+# Intervention queue: top contracts by priority score per queue group.
+# MEMBERS_BUCKET and IVI_RISK are part of the group so that sidebar filters
+# select whole groups and the top-N of any filtered view stays exact.
+QUEUE_GROUPS = ['YEAR', 'MEMBERS_BUCKET', 'IVI_RISK', 'PRIMARY_REGION', 'SEGMENT']
+QUEUE_DEPTH = 100
+
+
+def build_intervention_queue(df: pl.DataFrame, depth: int = QUEUE_DEPTH) -> pl.DataFrame:
+    """
+    Build the intervention queue: top contracts by priority per group.
+    
+    Uses a partial top-k selection per group instead of sorting the
+    whole portfolio.
+    
+    Args:
+        df: IVI scores dataframe
+        depth: Contracts kept per group
+    
+    Returns:
+        Queue sorted by group then descending PRIORITY_SCORE
+    """
+    scored = df.lazy().with_columns([
+        priority_score_expr(),
+        members_bucket_expr(),
+    ]).filter(pl.col('PRIORITY_SCORE').is_not_null())
+    
+    return _top_per_group(scored, depth).collect()
+
+
+def _top_per_group(lf: pl.LazyFrame, depth: int) -> pl.LazyFrame:
+    """Keep the top rows by PRIORITY_SCORE within each queue group."""
+    return lf.group_by(QUEUE_GROUPS).agg(
+        pl.all().top_k_by('PRIORITY_SCORE', depth)
+    ).explode(pl.exclude(QUEUE_GROUPS), empty_as_null=False).sort(
+        QUEUE_GROUPS + ['PRIORITY_SCORE'],
+        descending=[False] * len(QUEUE_GROUPS) + [True]
+    )
+
+
+def top_interventions(
+    queue: pl.DataFrame,
+    n: int = 20,
+    year: Optional[str] = None,
+    min_members: Optional[int] = None,
+    risk_levels: Optional[Sequence[str]] = None,
+) -> pl.DataFrame:
+    """
+    Highest-priority contracts for the sidebar filters.
+    
+    Args:
+        queue: Intervention queue
+        n: Number of contracts (at most the queue depth)
+        year: Optional year filter
+        min_members: Optional minimum members (one of MEMBER_BUCKETS)
+        risk_levels: Optional IVI_RISK levels to keep
+    
+    Returns:
+        Top-n contracts by descending PRIORITY_SCORE
+    """
+    return slice_cube(queue, year, min_members, risk_levels).top_k(n, by='PRIORITY_SCORE')
+
+
 def get_kpi_assessment(
     kpi_name: str,
     client_value: float,
@@ -0,0 +1,88 @@
+"""
+Server-side point reduction for large scatter plots.
+
+Above a point budget, views are either downsampled (stratified by a category
+such as IVI_RISK, always keeping the extremes of both axes) or binned into a
+2D histogram, so the browser never receives every contract.
+"""
+
+import numpy as np
+import polars as pl
+from typing import Optional
+
+# Points sent to the browser before scatters are reduced
+SCATTER_POINT_LIMIT = 5000
+
+# Every stratum keeps at least this many points (or all of them)
+MIN_POINTS_PER_STRATUM = 200
+
+# Rows outside these tail quantiles on either axis are always kept
+OUTLIER_QUANTILE = 0.005
+
+# Cells per axis for density binning
+DENSITY_BINS = 60
+
+
+def downsample_points(
+    df: pl.DataFrame,
+    x: str,
+    y: str,
+    strata: Optional[str] = 'IVI_RISK',
+    max_points: int = SCATTER_POINT_LIMIT,
+    seed: int = 0,
+) -> pl.DataFrame:
+    """
+    Reduce a scatter to about max_points rows.
+
+    Each stratum is sampled in proportion to its size, with a floor so small
+    strata stay visible. Rows in the outer tails of x or y are kept
+    regardless, so outliers are never sampled away.
+
+    Args:
+        df: Rows to plot
+        x: X-axis column
+        y: Y-axis column
+        strata: Optional column to stratify on
+        max_points: Target number of points
+        seed: Sampling seed (fixed so reruns draw the same points)
+
+    Returns:
+        Subset of df (unchanged if already within budget)
+    """
+    if df.height <= max_points:
+        return df
+
+    extreme = pl.lit(False)
+    for col in (x, y):
+        extreme = extreme | (pl.col(col) < pl.col(col).quantile(OUTLIER_QUANTILE)) | (
+            pl.col(col) > pl.col(col).quantile(1 - OUTLIER_QUANTILE)
+        )
+
+    group = pl.col(strata) if strata else pl.lit(0)
+    size = pl.len().over(group)
+    quota = pl.max_horizontal(
+        (size * max_points / df.height).ceil(),
+        pl.min_horizontal(size, pl.lit(MIN_POINTS_PER_STRATUM)),
+    )
+    draw = pl.int_range(pl.len()).shuffle(seed=seed).over(group)
+
+    return df.filter(extreme | (draw < quota))
+
+
+def bin_points(df: pl.DataFrame, x: str, y: str, bins: int = DENSITY_BINS) -> dict:
+    """
+    Bin a scatter into a 2D histogram.
+
+    Args:
+        df: Rows to plot
+        x: X-axis column
+        y: Y-axis column
+        bins: Cells per axis
+
+    Returns:
+        Dictionary with 'x_edges', 'y_edges' and 'counts' (y by x)
+    """
+    points = df.select([pl.col(x).cast(pl.Float64), pl.col(y).cast(pl.Float64)]).drop_nulls().to_numpy()
+    counts, x_edges, y_edges = np.histogram2d(points[:, 0], points[:, 1], bins=bins)
+
+    return {'x_edges': x_edges, 'y_edges': y_edges, 'counts': counts.T}
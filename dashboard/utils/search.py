@@ -0,0 +1,94 @@
+"""
+Contract search index for the IVI Dashboard.
+
+Keeps contract numbers sorted for prefix lookups by bisection, plus one
+lowercase search string per contract (contract number, client name and
+region when available) for vectorized substring matching. Pages ask for one
+page of matches at a time, so the selector payload stays bounded regardless
+of portfolio size.
+"""
+
+import polars as pl
+from bisect import bisect_left
+from typing import List, Tuple
+
+# Columns searched by substring, when present in the scores table
+SEARCH_COLUMNS = ['CONTRACT_NO', 'CLIENT_NAME', 'PRIMARY_REGION']
+
+# Matches shown per selector page
+SEARCH_PAGE_SIZE = 50
+
+
+def build_search_index(df: pl.DataFrame) -> dict:
+    """
+    Build the search index over the contracts in a scores table.
+
+    Args:
+        df: IVI scores dataframe (one or more rows per contract)
+
+    Returns:
+        Dictionary with sorted 'contracts', their lowercase 'keys' and the
+        per-contract search 'text' series
+    """
+    columns = [col for col in SEARCH_COLUMNS if col in df.columns]
+
+    contracts = df.select(columns).unique(subset='CONTRACT_NO', keep='first').with_columns(
+        pl.col('CONTRACT_NO').cast(pl.Utf8).str.to_lowercase().alias('KEY')
+    ).sort('KEY')
+
+    text = pl.concat_str(
+        [pl.col(col).cast(pl.Utf8).fill_null('') for col in columns], separator=' | '
+    ).str.to_lowercase()
+
+    return {
+        'contracts': contracts['CONTRACT_NO'].to_list(),
+        'keys': contracts['KEY'].to_list(),
+        'text': contracts.select(text.alias('TEXT'))['TEXT'],
+    }
+
+
+def search_contracts(
+    index: dict,
+    query: str = '',
+    page: int = 0,
+    page_size: int = SEARCH_PAGE_SIZE,
+) -> Tuple[List[str], int]:
+    """
+    Return one page of contracts matching a query.
+
+    Contract-number prefix matches come first (in sorted order), followed by
+    contracts whose number, client name or region contains the query.
+
+    Args:
+        index: Search index from build_search_index
+        query: Search text (case-insensitive); empty lists all contracts
+        page: Zero-based page number
+        page_size: Matches per page
+
+    Returns:
+        Tuple of (contracts on the requested page, total number of matches)
+    """
+    contracts = index['contracts']
+    query = query.strip().lower()
+    start = page * page_size
+
+    if not query:
+        return contracts[start:start + page_size], len(contracts)
+
+    # Prefix matches form a contiguous run of the sorted keys
+    keys = index['keys']
+    first = bisect_left(keys, query)
+    last = bisect_left(keys, query + '\U0010ffff', lo=first)
+
+    # Substring matches elsewhere in the search text
+    others = index['text'].str.contains(query, literal=True).arg_true()
+    others = others.filter((others < first) | (others >= last))
+
+    total = (last - first) + len(others)
+    prefix_page = list(range(first, last)[start:start + page_size])
+
+    remaining = page_size - len(prefix_page)
+    other_start = max(0, start - (last - first))
+    other_page = others[other_start:other_start + remaining].to_list() if remaining else []
+
+    return [contracts[i] for i in prefix_page + other_page], total
@@ -0,0 +1,173 @@
+"""
+What-if rescoring for the Client Deep Dive page.
+
+A scorer is built once per model and data version. It holds:
+- the LightGBM ensemble as flat arrays (pipeline.scoring.compiled), for the IVI score
+- the feature x group matrix, for the SHAP sub-scores
+- the rule-score reference
+- the min-max bounds of the published SHAP sub-scores
+
+The compiled ensemble is checked against LightGBM on a sample of scored
+rows when the scorer is built; if they disagree, the scorer falls back to
+the booster. A contract's baseline feature vector is built once. Each perturbation
+copies that vector, overwrites the adjusted KPIs and scores a single row,
+so the page never goes through pandas or the sklearn wrapper.
+"""
+
+import bisect
+import warnings
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import polars as pl
+
+from pipeline.scoring.compiled import check_ensemble, export_ensemble, predict_proba
+from pipeline.scoring.explain import SUBSCORE_GROUPS, group_matrix
+from pipeline.scoring.model import feature_matrix, rule_reference, rule_scores
+from pipeline.segmentation import IVI_RISK_BREAKS, IVI_RISK_LEVELS
+
+# KPIs adjustable in the what-if panel (display settings in KPI_DEFINITIONS)
+WHATIF_KPIS = [
+    'REJECTION_RATE', 'APPROVAL_RATE', 'CALLS_PER_MEMBER', 'AVG_RESOLUTION_DAYS',
+    'UTILIZATION_RATE', 'LOSS_RATIO', 'COST_PER_MEMBER',
+]
+
+# Scored rows the compiled ensemble is checked on
+CHECK_ROWS = 256
+
+Changes = Tuple[Tuple[str, float], ...]
+
+
+def build_whatif_scorer(
+    bundle: dict,
+    scores: pl.DataFrame,
+    shap_df: Optional[pl.DataFrame] = None,
+) -> dict:
+    """
+    Precompute everything a what-if rescore needs.
+
+    Args:
+        bundle: Model bundle (see pipeline.scoring.model.load_bundle)
+        scores: IVI scores (training-year rows are the rule-score reference)
+        shap_df: Optional SHAP sub-scores with raw group sums (scaling bounds)
+
+    Returns:
+        Scorer dictionary (read-only); 'ensemble' is None when the compiled
+        ensemble does not match the booster
+    """
+    model = bundle['model']
+    features = list(bundle['features'])
+    groups = list(bundle['feature_groups'])
+
+    bounds = None
+    if shap_df is not None and shap_df.height and all(g in shap_df.columns for g in groups):
+        stats = shap_df.select(
+            [pl.col(g).min().alias(f'{g}_min') for g in groups]
+            + [pl.col(g).max().alias(f'{g}_max') for g in groups]
+        ).row(0, named=True)
+        bounds = {g: (stats[f'{g}_min'], stats[f'{g}_max']) for g in groups}
+
+    num_iteration = model.best_iteration_ or None
+    sample = scores.sample(n=min(CHECK_ROWS, scores.height), seed=0)
+    try:
+        ensemble = export_ensemble(model)
+        check_ensemble(ensemble, model.booster_, feature_matrix(sample, features), num_iteration)
+    except ValueError as e:
+        warnings.warn(f'Compiled ensemble not used: {e}')
+        ensemble = None
+
+    rule_names = [f for feats in bundle['rule_features'].values() for f, _ in feats]
+    return {
+        'features': features,
+        'index': {f: i for i, f in enumerate(features)},
+        'ensemble': ensemble,
+        'booster': model.booster_,
+        'num_iteration': num_iteration,
+        'groups': groups,
+        'group_matrix': group_matrix(features, bundle['feature_groups']),
+        'bounds': bounds,
+        'rule_features': bundle['rule_features'],
+        'rule_names': [f for f in dict.fromkeys(rule_names) if f in scores.columns],
+        'reference': rule_reference(scores.lazy(), bundle['rule_features']),
+    }
+
+
+def contract_baseline(scorer: dict, row: dict) -> dict:
+    """
+    Baseline inputs of one contract-year.
+
+    Args:
+        scorer: See build_whatif_scorer
+        row: IVI scores row of the contract-year
+
+    Returns:
+        Dictionary with the model feature vector 'x' and raw 'rule_values'
+    """
+    x = feature_matrix(pl.from_dicts([row]), scorer['features'])[0]
+    rule_values = {
+        f: np.nan if row.get(f) is None else float(row[f]) for f in scorer['rule_names']
+    }
+    return {'x': x, 'rule_values': rule_values}
+
+
+def ivi_risk_level(score: float) -> str:
+    """IVI_RISK level of a score (same breaks as pipeline.segmentation)."""
+    return IVI_RISK_LEVELS[bisect.bisect_right(IVI_RISK_BREAKS, score)]
+
+
+def score_whatif(scorer: dict, baseline: dict, changes: Sequence[Tuple[str, float]]) -> Dict[str, float]:
+    """
+    Rescore a contract-year with some KPIs replaced.
+
+    All changes are applied together; every other feature keeps the
+    contract's values.
+
+    Args:
+        scorer: See build_whatif_scorer
+        baseline: See contract_baseline
+        changes: (KPI, new value) pairs
+
+    Returns:
+        IVI_PROBA, IVI_SCORE, IVI_RISK, H/E/U_SCORE_RULE and, when the SHAP
+        bounds are known, H/E/U_SCORE
+    """
+    x = baseline['x'].copy()
+    rule_values = dict(baseline['rule_values'])
+    for kpi, value in changes:
+        if kpi in scorer['index']:
+            x[scorer['index'][kpi]] = value
+        if kpi in rule_values:
+            rule_values[kpi] = value
+
+    if scorer['ensemble'] is not None:
+        proba = float(predict_proba(scorer['ensemble'], x)[0])
+    else:
+        proba = float(scorer['booster'].predict(x[None, :], num_iteration=scorer['num_iteration'])[0])
+    result = {
+        'IVI_PROBA': proba,
+        'IVI_SCORE': proba * 100,
+        'IVI_RISK': ivi_risk_level(proba * 100),
+    }
+
+    if scorer['bounds'] is not None:
+        contrib = scorer['booster'].predict(
+            x[None, :], pred_contrib=True, num_iteration=scorer['num_iteration']
+        )[0]
+        sums = dict(zip(scorer['groups'], contrib[:-1] @ scorer['group_matrix']))
+        for score, group in SUBSCORE_GROUPS.items():
+            if group not in sums:
+                continue
+            low, high = scorer['bounds'][group]
+            result[score] = (
+                float(np.clip((sums[group] - low) / (high - low) * 100, 0, 100))
+                if high > low else 50.0
+            )
+
+    rules = rule_scores(
+        pl.DataFrame({k: [v] for k, v in rule_values.items()}, schema={k: pl.Float64 for k in rule_values}),
+        scorer['reference'],
+        scorer['rule_features'],
+    )
+    for dim, values in rules.items():
+        result[f'{dim}_SCORE_RULE'] = float(values[0]) * 100
+    return result
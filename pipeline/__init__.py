@@ -0,0 +1,3 @@
+"""
+IVI data pipeline package initialization.
+"""
@@ -0,0 +1,551 @@
+"""
+Incremental contract-year aggregates for the IVI pipeline.
+
+Every contract-year feature of notebook 01 is kept as a mergeable partial
+state: sums and counts, (count, mean, M2) triples for standard deviations,
+exact distinct-value sets for n_unique counts, exact value counts for
+medians and log-bucket sketches for other quantiles. New ingestion
+partitions are aggregated on their own and merged into the stored states,
+so a monthly refresh costs the size of the drop rather than the whole
+history.
+
+Medians are exact, as in notebook 01. Sketched quantiles (P90_CLAIM_AMOUNT)
+are within SKETCH_ACCURACY of the direct aggregation, not equal to it: a
+model must be trained on features built the same way (incremental or full
+rebuild) as the ones it scores.
+"""
+
+import json
+import math
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import polars as pl
+
+from .ingestion import CACHE_DIR, dataset_dir
+
+KEYS = ['CONTRACT_NO', 'YEAR']
+
+# Relative accuracy of quantile sketches
+SKETCH_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+STATE_DIR_NAME = 'contract_year'
+
+# File naming the current state version of a source
+CURRENT_NAME = 'CURRENT'
+
+
+def _year_expr() -> pl.Expr:
+    return pl.col('CONT_YYMM').cast(pl.Utf8).str.slice(0, 4).alias('YEAR')
+
+
+def _month_expr() -> pl.Expr:
+    return pl.col('CONT_YYMM').cast(pl.Utf8).str.slice(4, 2).cast(pl.Int32).alias('MONTH')
+
+
+# Per source: contract key, derived columns and (output, kind, expression[, quantile]).
+# Kinds: count, sum, min, max, mean, std, n_unique, median, quantile.
+CONTRACT_YEAR_SPECS = {
+    'claims': {
+        'key': 'CONT_NO',
+        'prepare': lambda: [
+            _year_expr(),
+            _month_expr(),
+            pl.col('INCUR_DATE_FROM').dt.quarter().alias('QUARTER'),
+        ],
+        'aggregates': [
+            ('CLAIM_LINES', 'count', None),
+            ('UNIQUE_CLAIMS', 'n_unique', pl.col('VOU_NO')),
+            ('MEMBERS_WITH_CLAIMS', 'n_unique', pl.col('ADHERENT_NO')),
+            ('UNIQUE_PROVIDERS', 'n_unique', pl.col('PROV_CODE')),
+            ('UNIQUE_DIAGNOSES', 'n_unique', pl.col('DIAG_CODE')),
+            ('TOTAL_BILLED', 'sum', pl.col('SUM_OF_NETBILLED')),
+            ('AVG_CLAIM_AMOUNT', 'mean', pl.col('SUM_OF_NETBILLED')),
+            ('STD_CLAIM_AMOUNT', 'std', pl.col('SUM_OF_NETBILLED')),
+            ('MAX_CLAIM_AMOUNT', 'max', pl.col('SUM_OF_NETBILLED')),
+            ('P90_CLAIM_AMOUNT', 'quantile', pl.col('SUM_OF_NETBILLED'), 0.9),
+            ('Q1_CLAIMS', 'sum', pl.col('QUARTER') == 1),
+            ('Q2_CLAIMS', 'sum', pl.col('QUARTER') == 2),
+            ('Q3_CLAIMS', 'sum', pl.col('QUARTER') == 3),
+            ('Q4_CLAIMS', 'sum', pl.col('QUARTER') == 4),
+            ('ACTIVE_MONTHS', 'n_unique', pl.col('MONTH')),
+            ('FIRST_CLAIM_DATE', 'min', pl.col('INCUR_DATE_FROM')),
+            ('LAST_CLAIM_DATE', 'max', pl.col('INCUR_DATE_FROM')),
+        ],
+    },
+    'calls': {
+        'key': 'CONT_NO',
+        'prepare': lambda: [
+            _year_expr(),
+            pl.col('CRT_DATE').dt.month().alias('MONTH'),
+            pl.col('CRT_DATE').dt.quarter().alias('QUARTER'),
+            pl.col('CRT_DATE').dt.weekday().alias('WEEKDAY'),
+            (pl.col('UPD_DATE') - pl.col('CRT_DATE')).dt.total_days().alias('RESOLUTION_DAYS'),
+        ],
+        'aggregates': [
+            ('TOTAL_CALLS', 'count', None),
+            ('UNIQUE_CALLS', 'n_unique', pl.col('CALL_ID')),
+            ('UNIQUE_CALLERS', 'n_unique', pl.col('MBR_NO')),
+            ('CALL_CATEGORIES', 'n_unique', pl.col('CALL_CAT')),
+            ('AVG_RESOLUTION_DAYS', 'mean', pl.col('RESOLUTION_DAYS')),
+            ('MEDIAN_RESOLUTION_DAYS', 'median', pl.col('RESOLUTION_DAYS')),
+            ('Q1_CALLS', 'sum', pl.col('QUARTER') == 1),
+            ('Q2_CALLS', 'sum', pl.col('QUARTER') == 2),
+            ('Q3_CALLS', 'sum', pl.col('QUARTER') == 3),
+            ('Q4_CALLS', 'sum', pl.col('QUARTER') == 4),
+            ('WEEKEND_CALLS', 'sum', pl.col('WEEKDAY') >= 5),
+            ('WEEKDAY_CALLS', 'sum', pl.col('WEEKDAY') < 5),
+            ('ACTIVE_CALL_MONTHS', 'n_unique', pl.col('MONTH')),
+        ],
+    },
+    'preauth': {
+        'key': 'CONT_NO',
+        'prepare': lambda: [_year_expr(), _month_expr()],
+        'aggregates': [
+            ('PREAUTH_ITEMS', 'count', None),
+            ('PREAUTH_EPISODES', 'n_unique', pl.col('PREAUTH_EPISODE_ID')),
+            ('MEMBERS_WITH_PREAUTH', 'n_unique', pl.col('MBR_NO')),
+            ('PREAUTH_PROVIDERS', 'n_unique', pl.col('PROV_CODE')),
+            ('TOTAL_EST_AMOUNT', 'sum', pl.col('EST_AMT')),
+            ('AVG_EST_AMOUNT', 'mean', pl.col('EST_AMT')),
+            ('MAX_EST_AMOUNT', 'max', pl.col('EST_AMT')),
+            ('APPROVED_COUNT', 'sum', pl.col('EPISODE_STATUS (STATUS)') == 'A'),
+            ('REJECTED_COUNT', 'sum', pl.col('EPISODE_STATUS (STATUS)') == 'R'),
+            ('PENDING_COUNT', 'sum', pl.col('EPISODE_STATUS (STATUS)') == 'P'),
+            ('ACTIVE_PREAUTH_MONTHS', 'n_unique', pl.col('MONTH')),
+        ],
+    },
+    'member': {
+        'key': 'CONTRACT_NO',
+        'prepare': lambda: [_year_expr(), _month_expr()],
+        'aggregates': [
+            ('TOTAL_MEMBERS', 'n_unique', pl.col('ADHERENT_NO')),
+            ('PLAN_COUNT', 'n_unique', pl.col('PLAN_ID')),
+            ('WRITTEN_PREMIUM', 'sum', pl.col('WP')),
+            ('EARNED_PREMIUM', 'sum', pl.col('WE')),
+            ('AVG_PREMIUM_PER_MEMBER', 'mean', pl.col('WP')),
+            ('MALE_COUNT', 'sum', pl.col('GENDER') == 'M'),
+            ('FEMALE_COUNT', 'sum', pl.col('GENDER') == 'F'),
+            ('NATIONALITY_COUNT', 'n_unique', pl.col('NATIONALITY')),
+            ('NETWORK_COUNT', 'n_unique', pl.col('PLAN_NETWORK')),
+            ('ACTIVE_MONTHS', 'n_unique', pl.col('MONTH')),
+            ('FIRST_ACTIVE_MONTH', 'min', pl.col('MONTH')),
+            ('LAST_ACTIVE_MONTH', 'max', pl.col('MONTH')),
+        ],
+    },
+}
+
+
+def _aggregates(source: str, kinds: Optional[List[str]] = None) -> list:
+    """Aggregate specs of a source, optionally restricted to some kinds."""
+    return [
+        spec for spec in CONTRACT_YEAR_SPECS[source]['aggregates']
+        if kinds is None or spec[1] in kinds
+    ]
+
+
+def prepare_rows(lf: pl.LazyFrame, source: str) -> pl.LazyFrame:
+    """
+    Add the derived columns of a source and its CONTRACT_NO key.
+
+    Args:
+        lf: Raw rows of the source
+        source: One of CONTRACT_YEAR_SPECS
+
+    Returns:
+        LazyFrame with CONTRACT_NO, YEAR and the derived columns
+    """
+    spec = CONTRACT_YEAR_SPECS[source]
+    lf = lf.with_columns(spec['prepare']())
+    if spec['key'] != 'CONTRACT_NO':
+        lf = lf.rename({spec['key']: 'CONTRACT_NO'})
+    return lf
+
+
+def aggregate_exprs(source: str) -> List[pl.Expr]:
+    """
+    Direct aggregations of a source's contract-year features.
+
+    Used by full rebuilds that aggregate raw rows in one pass instead of
+    going through partial states. Quantiles use the 'nearest' rank, as the
+    sketches do; medians are exact on both paths.
+
+    Args:
+        source: One of CONTRACT_YEAR_SPECS
+
+    Returns:
+        Aggregation expressions over prepared rows grouped by KEYS
+    """
+    exprs = []
+    for out, kind, expr, *param in _aggregates(source):
+        if kind == 'count':
+            exprs.append(pl.len().cast(pl.UInt32).alias(out))
+        elif kind == 'n_unique':
+            exprs.append(expr.n_unique().cast(pl.UInt32).alias(out))
+        elif kind == 'median':
+            exprs.append(expr.median().alias(out))
+        elif kind == 'quantile':
+            exprs.append(expr.quantile(param[0]).alias(out))
+        else:
+            exprs.append(getattr(expr, kind)().alias(out))
+    return exprs
+
+
+def scalar_state_exprs(source: str) -> List[pl.Expr]:
+    """Aggregations producing the scalar partial states of raw rows."""
+    exprs = []
+    for out, kind, expr, *_ in _aggregates(source, ['count', 'sum', 'min', 'max', 'mean', 'std']):
+        if kind == 'count':
+            exprs.append(pl.len().cast(pl.UInt32).alias(out))
+        elif kind in ('sum', 'min', 'max'):
+            exprs.append(getattr(expr, kind)().alias(out))
+        elif kind == 'mean':
+            exprs += [expr.sum().alias(f'{out}__sum'), expr.count().alias(f'{out}__n')]
+        else:
+            exprs += [
+                expr.count().alias(f'{out}__n'),
+                expr.mean().alias(f'{out}__mean'),
+                ((expr - expr.mean()) ** 2).sum().alias(f'{out}__m2'),
+            ]
+    return exprs
+
+
+def merge_scalar_exprs(source: str) -> List[pl.Expr]:
+    """Aggregations merging stacked scalar states of the same contract-year."""
+    exprs = []
+    for out, kind, *_ in _aggregates(source, ['count', 'sum', 'min', 'max', 'mean', 'std']):
+        if kind in ('count', 'sum'):
+            exprs.append(pl.col(out).sum())
+        elif kind in ('min', 'max'):
+            exprs.append(getattr(pl.col(out), kind)())
+        elif kind == 'mean':
+            exprs += [pl.col(f'{out}__sum').sum(), pl.col(f'{out}__n').sum()]
+        else:
+            # Chan et al. parallel variance: M2 = sum(M2_i + n_i * (mean_i - mean)^2)
+            n, mean, m2 = pl.col(f'{out}__n'), pl.col(f'{out}__mean'), pl.col(f'{out}__m2')
+            total = pl.when(n.sum() > 0).then((n * mean).sum() / n.sum())
+            exprs += [
+                n.sum(),
+                total.alias(f'{out}__mean'),
+                (m2 + n * (mean - total) ** 2).sum().alias(f'{out}__m2'),
+            ]
+    return exprs
+
+
+def sketch_bucket_exprs(expr: pl.Expr) -> List[pl.Expr]:
+    """Sign and log-bucket of each value (bucket 0 for zero)."""
+    return [
+        expr.sign().cast(pl.Int8).alias('SIGN'),
+        pl.when(expr != 0).then(
+            (expr.abs().log() / math.log(SKETCH_GAMMA)).ceil()
+        ).otherwise(0).cast(pl.Int32).alias('BUCKET'),
+    ]
+
+
+def sketch_quantile(sketch: pl.LazyFrame, quantile: float) -> pl.LazyFrame:
+    """
+    Quantile per contract-year from merged sketch buckets.
+
+    Picks the bucket holding the 'nearest' rank (as pl.Expr.quantile does)
+    and returns its midpoint, within SKETCH_ACCURACY of the exact value.
+
+    Args:
+        sketch: Sketch rows (CONTRACT_NO, YEAR, SIGN, BUCKET, count)
+        quantile: Quantile in [0, 1]
+
+    Returns:
+        LazyFrame with CONTRACT_NO, YEAR and VALUE
+    """
+    value = pl.col('SIGN') * 2 * pl.lit(SKETCH_GAMMA).pow(pl.col('BUCKET')) / (SKETCH_GAMMA + 1)
+    return sketch.with_columns(value.alias('VALUE')).sort(KEYS + ['VALUE']).with_columns([
+        pl.col('count').cum_sum().over(KEYS).alias('CUMULATIVE'),
+        pl.col('count').sum().over(KEYS).alias('TOTAL'),
+    ]).filter(
+        pl.col('CUMULATIVE') > (quantile * (pl.col('TOTAL') - 1) + 0.5).floor()
+    ).group_by(KEYS).agg(pl.col('VALUE').min())
+
+
+def count_median(counts: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Exact median per contract-year from merged value counts.
+
+    Averages the two middle values (one for odd counts), as pl.Expr.median
+    does.
+
+    Args:
+        counts: Value count rows (CONTRACT_NO, YEAR, VALUE, count)
+
+    Returns:
+        LazyFrame with CONTRACT_NO, YEAR and VALUE
+    """
+    middle = (pl.col('TOTAL') - 1) / 2
+    ranked = counts.sort(KEYS + ['VALUE']).with_columns([
+        pl.col('count').cum_sum().over(KEYS).alias('CUMULATIVE'),
+        pl.col('count').sum().over(KEYS).alias('TOTAL'),
+    ])
+    return ranked.group_by(KEYS).agg([
+        pl.col('VALUE').filter(pl.col('CUMULATIVE') > middle.floor()).min().alias('LOW'),
+        pl.col('VALUE').filter(pl.col('CUMULATIVE') > middle.ceil()).min().alias('HIGH'),
+    ]).select(KEYS + [((pl.col('LOW') + pl.col('HIGH')) / 2).alias('VALUE')])
+
+
+def partial_states(rows: pl.LazyFrame, source: str) -> Dict[str, pl.LazyFrame]:
+    """
+    Partial states of raw rows, keyed by state name.
+
+    'scalars' holds one row per contract-year; 'distinct-<OUT>' the distinct
+    (contract-year, value) pairs, 'values-<OUT>' the count of each
+    (contract-year, value) and 'sketch-<OUT>' the sketch buckets.
+
+    Args:
+        rows: Raw rows of the source
+        source: One of CONTRACT_YEAR_SPECS
+
+    Returns:
+        Dictionary of state name -> LazyFrame
+    """
+    rows = prepare_rows(rows, source)
+    states = {'scalars': rows.group_by(KEYS).agg(scalar_state_exprs(source))}
+    for out, kind, expr, *_ in _aggregates(source, ['n_unique', 'median', 'quantile']):
+        if kind == 'n_unique':
+            states[f'distinct-{out}'] = rows.select(KEYS + [expr.alias('VALUE')]).unique()
+        elif kind == 'median':
+            states[f'values-{out}'] = rows.filter(expr.is_not_null()).group_by(
+                KEYS + [expr.alias('VALUE')]
+            ).agg(pl.len().cast(pl.UInt32).alias('count'))
+        else:
+            states[f'sketch-{out}'] = rows.filter(expr.is_not_null()).select(
+                KEYS + sketch_bucket_exprs(expr)
+            ).group_by(KEYS + ['SIGN', 'BUCKET']).agg(pl.len().cast(pl.UInt32).alias('count'))
+    return states
+
+
+def merge_states(old: pl.LazyFrame, new: pl.LazyFrame, name: str, source: str) -> pl.LazyFrame:
+    """
+    Merge stored and new partial states.
+
+    Only contract-years present in the new states are regrouped; the rest
+    of the stored state passes through untouched.
+
+    Args:
+        old: Stored state
+        new: State of the new rows
+        name: State name (see partial_states)
+        source: One of CONTRACT_YEAR_SPECS
+
+    Returns:
+        Merged state
+    """
+    touched = new.select(KEYS).unique()
+    unchanged = old.join(touched, on=KEYS, how='anti', nulls_equal=True)
+    affected = pl.concat([old.join(touched, on=KEYS, how='semi', nulls_equal=True), new])
+
+    if name == 'scalars':
+        merged = affected.group_by(KEYS).agg(merge_scalar_exprs(source))
+    elif name.startswith('distinct-'):
+        merged = affected.unique()
+    elif name.startswith('values-'):
+        merged = affected.group_by(KEYS + ['VALUE']).agg(pl.col('count').sum())
+    else:
+        merged = affected.group_by(KEYS + ['SIGN', 'BUCKET']).agg(pl.col('count').sum())
+    return pl.concat([unchanged, merged])
+
+
+def finalize_states(states: Dict[str, pl.LazyFrame], source: str) -> pl.LazyFrame:
+    """
+    Contract-year features of a source from its (merged) partial states.
+
+    Args:
+        states: Dictionary of state name -> LazyFrame
+        source: One of CONTRACT_YEAR_SPECS
+
+    Returns:
+        LazyFrame with CONTRACT_NO, YEAR and the features in spec order
+    """
+    scalars = states['scalars']
+    for out, kind, expr, *param in _aggregates(source, ['n_unique', 'median', 'quantile']):
+        if kind == 'n_unique':
+            values = states[f'distinct-{out}'].group_by(KEYS).agg(pl.len().cast(pl.UInt32).alias(out))
+        elif kind == 'median':
+            values = count_median(states[f'values-{out}']).rename({'VALUE': out})
+        else:
+            values = sketch_quantile(states[f'sketch-{out}'], param[0]).rename({'VALUE': out})
+        scalars = scalars.join(values, on=KEYS, how='left', nulls_equal=True)
+
+    features = []
+    for out, kind, *_ in _aggregates(source):
+        if kind == 'mean':
+            n = pl.col(f'{out}__n')
+            features.append(pl.when(n > 0).then(pl.col(f'{out}__sum') / n).alias(out))
+        elif kind == 'std':
+            n = pl.col(f'{out}__n')
+            features.append(pl.when(n > 1).then((pl.col(f'{out}__m2') / (n - 1)).sqrt()).alias(out))
+        else:
+            features.append(pl.col(out))
+    return scalars.select(KEYS + features)
+
+
+def state_names(source: str) -> List[str]:
+    """Names of the partial states of a source (see partial_states)."""
+    prefixes = {'n_unique': 'distinct', 'median': 'values', 'quantile': 'sketch'}
+    return ['scalars'] + [
+        f'{prefixes[kind]}-{out}' for out, kind, *_ in _aggregates(source, list(prefixes))
+    ]
+
+
+def state_dir(cache_dir: Path, source: str) -> Path:
+    """Directory holding the state versions of one source."""
+    return cache_dir / STATE_DIR_NAME / source
+
+
+def current_state_dir(cache_dir: Path, source: str) -> Optional[Path]:
+    """
+    Version directory of a source's current states.
+
+    A version holds every state file plus parts.json (the part files merged
+    into it). It is written in full before CURRENT is switched to it with a
+    single rename, so a crashed update leaves the previous version in place.
+
+    Args:
+        cache_dir: Ingestion output directory
+        source: One of CONTRACT_YEAR_SPECS
+
+    Returns:
+        Version directory, or None before the first update
+    """
+    pointer = state_dir(cache_dir, source) / CURRENT_NAME
+    if not pointer.exists():
+        return None
+    version = state_dir(cache_dir, source) / pointer.read_text().strip()
+    return version if version.is_dir() else None
+
+
+def _part_files(dataset: Path) -> Dict[str, list]:
+    """Ingested part files of a dataset with their size and mtime."""
+    parts = {}
+    for path in dataset.glob('*/*/*.parquet'):
+        stat = path.stat()
+        parts[path.relative_to(dataset).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+    return parts
+
+
+def _partition_year(part: str) -> str:
+    """YEAR label of a part file path ('YEAR=2022/MONTH=01/...')."""
+    return part.split('/', 1)[0].split('=', 1)[1]
+
+
+def update_contract_year_state(source: str, cache_dir: Path = CACHE_DIR) -> dict:
+    """
+    Merge newly ingested partitions into the stored states of a source.
+
+    Part files already merged are skipped. If a merged part file was
+    replaced or removed (a changed source file), the states of its YEAR are
+    dropped and rebuilt from that year's partitions, since distinct sets
+    and extremes cannot be un-merged. States stored for other specs are
+    rebuilt from every partition. The result is written as a new version
+    (see current_state_dir), so states and merged parts change together.
+
+    Args:
+        source: One of CONTRACT_YEAR_SPECS
+        cache_dir: Ingestion output directory
+
+    Returns:
+        Dictionary with the merged 'parts' and 'rebuilt_years'
+    """
+    dataset = dataset_dir(cache_dir, source)
+    target = state_dir(cache_dir, source)
+    current = current_state_dir(cache_dir, source)
+
+    parts = _part_files(dataset)
+    merged = {}
+    if current is not None and {path.stem for path in current.glob('*.parquet')} == set(state_names(source)):
+        merged = json.loads((current / 'parts.json').read_text())
+    else:
+        current = None
+    stale_years = sorted({
+        _partition_year(part) for part, stat in merged.items() if parts.get(part) != stat
+    })
+    merged = {part: stat for part, stat in merged.items() if _partition_year(part) not in stale_years}
+    new_parts = sorted(part for part in parts if part not in merged)
+
+    if not new_parts and not stale_years and current is not None:
+        return {'parts': [], 'rebuilt_years': []}
+
+    new_states = partial_states(
+        pl.scan_parquet([str(dataset / part) for part in new_parts], hive_partitioning=False),
+        source,
+    ) if new_parts else {}
+    stale = pl.col('YEAR').fill_null('0000').is_in(stale_years)
+    results = {}
+    if current is not None:
+        for path in current.glob('*.parquet'):
+            results[path.stem] = pl.scan_parquet(path).filter(~stale)
+    for name, state in new_states.items():
+        results[name] = merge_states(results[name], state, name, source) if name in results else state
+
+    # Write the whole new version, then switch CURRENT to it in one rename
+    version = target / f'v{time.time_ns()}'
+    version.mkdir(parents=True)
+    try:
+        for name, frame in zip(results, pl.collect_all(list(results.values()))):
+            frame.write_parquet(version / f'{name}.parquet')
+        merged.update({part: parts[part] for part in new_parts})
+        (version / 'parts.json').write_text(json.dumps(merged, indent=2, sort_keys=True))
+        pointer = target / f'{CURRENT_NAME}.tmp'
+        pointer.write_text(version.name)
+        os.replace(pointer, target / CURRENT_NAME)
+    except BaseException:
+        shutil.rmtree(version, ignore_errors=True)
+        raise
+
+    # Superseded versions (and states stored before versioning) are dropped
+    for path in target.iterdir():
+        if path == version or path.name == CURRENT_NAME:
+            continue
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+    return {'parts': new_parts, 'rebuilt_years': stale_years}
+
+
+def load_contract_year_features(source: str, cache_dir: Path = CACHE_DIR) -> pl.DataFrame:
+    """
+    Contract-year features of a source from its stored states.
+
+    Args:
+        source: One of CONTRACT_YEAR_SPECS
+        cache_dir: Ingestion output directory
+
+    Returns:
+        DataFrame with CONTRACT_NO, YEAR and the features
+    """
+    current = current_state_dir(cache_dir, source)
+    if current is None:
+        raise FileNotFoundError(f'No contract-year states for {source} in {state_dir(cache_dir, source)}')
+    states = {path.stem: pl.scan_parquet(path) for path in current.glob('*.parquet')}
+    return finalize_states(states, source).collect()
+
+
+def refresh_contract_year(source: str, cache_dir: Path = CACHE_DIR) -> pl.DataFrame:
+    """
+    Update the states of a source and return its contract-year features.
+
+    Args:
+        source: One of CONTRACT_YEAR_SPECS
+        cache_dir: Ingestion output directory
+
+    Returns:
+        DataFrame with CONTRACT_NO, YEAR and the features
+    """
+    update = update_contract_year_state(source, cache_dir)
+    print(
+        f'[{source}] merged {len(update["parts"])} new part files'
+        + (f', rebuilt years {update["rebuilt_years"]}' if update['rebuilt_years'] else '')
+    )
+    return load_contract_year_features(source, cache_dir)
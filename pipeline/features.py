@@ -0,0 +1,416 @@
+"""
+Fused feature build for the IVI pipeline.
+
+Every output of notebook 01 (contract, contract-year, member and dimension
+levels) is derived from a single prepared LazyFrame per source, and all
+aggregations are collected together with pl.collect_all. Common subplan
+elimination turns the shared source frames into one scan each, so a full
+build reads every parquet dataset once instead of once per output. Only
+the small aggregated frames are joined and finished eagerly.
+
+Only the contract-year features can be refreshed incrementally (see
+pipeline.contract_year); every other table is rebuilt from the full
+ingested history on each run.
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+import polars as pl
+
+from .contract_year import CONTRACT_YEAR_SPECS, KEYS, aggregate_exprs, prepare_rows, refresh_contract_year
+from .ingestion import CACHE_DIR, DATA_DIR, SAS_SOURCES, scan_dataset, sync_dataset
+
+OUTPUT_DIR = Path('/volume/data/processed')
+
+# Polars engine for the fused collect
+ENGINE = 'streaming'
+
+# Contract-years labelled with RETAINED_NEXT_YEAR (present again the year after)
+RETENTION_YEAR = '2022'
+
+PROVIDER_COLUMNS = ['PROV_CODE', 'PROV_NAME', 'PROVIDER_NETWORK', 'PROVIDER_PRACTICE', 'PROVIDER_REGION']
+
+# Output tables written by write_feature_tables, in order
+OUTPUT_TABLES = [
+    'contract_level',
+    'contract_year_level',
+    'member_level',
+    'dim_nationality',
+    'dim_provider',
+    'dim_diagnosis',
+    'dim_calls',
+]
+
+
+def aggregation_plans(
+    sources: Dict[str, pl.LazyFrame],
+    contract_year: bool = True,
+) -> Dict[str, pl.LazyFrame]:
+    """
+    Lazy aggregations of every output, all derived from the source frames.
+
+    Args:
+        sources: Prepared rows by source (see prepare_rows)
+        contract_year: Include the contract-year aggregations
+
+    Returns:
+        Dictionary of aggregate name -> LazyFrame
+    """
+    member, claims, calls, preauth = (
+        sources['member'], sources['claims'], sources['calls'], sources['preauth']
+    )
+
+    plans = {
+        'member_contract': member.group_by('CONTRACT_NO').agg([
+            pl.col('ADHERENT_NO').n_unique().alias('TOTAL_MEMBERS'),
+            pl.col('PLAN_ID').n_unique().alias('TOTAL_PLANS'),
+            pl.col('WP').sum().alias('TOTAL_WRITTEN_PREMIUM'),
+            pl.col('WE').sum().alias('TOTAL_EARNED'),
+            pl.col('PLAN_NETWORK').n_unique().alias('UNIQUE_NETWORKS'),
+            pl.col('NATIONALITY').n_unique().alias('UNIQUE_NATIONALITIES'),
+            (pl.col('GENDER') == 'M').sum().alias('MALE_COUNT'),
+            (pl.col('GENDER') == 'F').sum().alias('FEMALE_COUNT'),
+            pl.col('CONT_YYMM').min().alias('CONTRACT_START'),
+            pl.col('CONT_YYMM').max().alias('CONTRACT_END'),
+        ]),
+        'claims_contract': claims.group_by('CONTRACT_NO').agg([
+            pl.len().alias('TOTAL_CLAIM_LINES'),
+            pl.col('VOU_NO').n_unique().alias('UNIQUE_CLAIMS'),
+            pl.col('SUM_OF_NETBILLED').sum().alias('TOTAL_NET_BILLED'),
+            pl.col('SUM_OF_NETBILLED').mean().alias('AVG_NET_BILLED'),
+            pl.col('SUM_OF_NETBILLED').max().alias('MAX_NET_BILLED'),
+            pl.col('SUM_OF_NETBILLED').std().alias('STD_NET_BILLED'),
+            pl.col('ADHERENT_NO').n_unique().alias('MEMBERS_WITH_CLAIMS'),
+            pl.col('PROV_CODE').n_unique().alias('UNIQUE_PROVIDERS'),
+            pl.col('DIAG_CODE').n_unique().alias('UNIQUE_DIAGNOSES'),
+            pl.col('BEN_HEAD').n_unique().alias('UNIQUE_BENEFIT_HEADS'),
+            pl.col('INCUR_DATE_FROM').min().alias('FIRST_CLAIM_DATE'),
+            pl.col('INCUR_DATE_FROM').max().alias('LAST_CLAIM_DATE'),
+        ]),
+        'calls_contract': calls.group_by('CONTRACT_NO').agg([
+            pl.len().alias('TOTAL_CALLS'),
+            pl.col('CALL_ID').n_unique().alias('UNIQUE_CALLS'),
+            pl.col('CALL_CAT').n_unique().alias('UNIQUE_CALL_CATEGORIES'),
+            pl.col('MBR_NO').n_unique().alias('UNIQUE_CALLERS'),
+        ]),
+        'preauth_contract': preauth.group_by('CONTRACT_NO').agg([
+            pl.len().alias('TOTAL_PREAUTH_ITEMS'),
+            pl.col('PREAUTH_EPISODE_ID').n_unique().alias('UNIQUE_PREAUTH_EPISODES'),
+            pl.col('MBR_NO').n_unique().alias('MEMBERS_WITH_PREAUTH'),
+            pl.col('EST_AMT').sum().alias('TOTAL_ESTIMATED_AMT'),
+            pl.col('EST_AMT').mean().alias('AVG_ESTIMATED_AMT'),
+            pl.col('PROV_CODE').n_unique().alias('UNIQUE_PROVIDERS_PREAUTH'),
+        ]),
+        'preauth_status': preauth.group_by(['CONTRACT_NO', 'EPISODE_STATUS (STATUS)']).agg(
+            pl.len().alias('count')
+        ),
+        'member_base': member.group_by('ADHERENT_NO').agg([
+            pl.col('CONTRACT_NO').first().alias('CONTRACT_NO'),
+            pl.col('PLAN_ID').first().alias('PLAN_ID'),
+            pl.col('GENDER').first().alias('GENDER'),
+            pl.col('NATIONALITY').first().alias('NATIONALITY'),
+            pl.col('PLAN_NETWORK').first().alias('PLAN_NETWORK'),
+            pl.col('WP').sum().alias('TOTAL_PREMIUM'),
+            pl.col('WE').sum().alias('TOTAL_EARNED'),
+            pl.col('CONT_YYMM').n_unique().alias('MONTHS_ENROLLED'),
+        ]),
+        'member_claims': claims.group_by('ADHERENT_NO').agg([
+            pl.len().alias('TOTAL_CLAIM_LINES'),
+            pl.col('VOU_NO').n_unique().alias('UNIQUE_CLAIMS'),
+            pl.col('SUM_OF_NETBILLED').sum().alias('TOTAL_BILLED'),
+            pl.col('SUM_OF_NETBILLED').mean().alias('AVG_BILLED'),
+            pl.col('SUM_OF_NETBILLED').max().alias('MAX_BILLED'),
+            pl.col('PROV_CODE').n_unique().alias('UNIQUE_PROVIDERS'),
+            pl.col('DIAG_CODE').n_unique().alias('UNIQUE_DIAGNOSES'),
+            pl.col('BEN_HEAD').n_unique().alias('UNIQUE_BENEFITS'),
+        ]),
+        'dim_nationality': member.join(
+            claims.select(['ADHERENT_NO', 'SUM_OF_NETBILLED']), on='ADHERENT_NO', how='left'
+        ).group_by(['CONTRACT_NO', 'NATIONALITY']).agg([
+            pl.col('ADHERENT_NO').n_unique().alias('MEMBER_COUNT'),
+            pl.col('SUM_OF_NETBILLED').sum().alias('TOTAL_BILLED'),
+            pl.col('SUM_OF_NETBILLED').mean().alias('AVG_BILLED'),
+            pl.col('SUM_OF_NETBILLED').count().alias('CLAIM_COUNT'),
+        ]),
+        'dim_provider': claims.group_by(['CONTRACT_NO', 'PROV_CODE']).agg([
+            pl.col('VOU_NO').n_unique().alias('CLAIM_COUNT'),
+            pl.col('SUM_OF_NETBILLED').sum().alias('TOTAL_BILLED'),
+            pl.col('SUM_OF_NETBILLED').mean().alias('AVG_BILLED'),
+            pl.col('ADHERENT_NO').n_unique().alias('UNIQUE_MEMBERS'),
+        ]),
+        'dim_diagnosis': claims.group_by(['CONTRACT_NO', 'DIAG_CODE']).agg([
+            pl.len().alias('OCCURRENCE_COUNT'),
+            pl.col('SUM_OF_NETBILLED').sum().alias('TOTAL_BILLED'),
+            pl.col('ADHERENT_NO').n_unique().alias('UNIQUE_MEMBERS'),
+        ]),
+        'dim_calls': calls.group_by(['CONTRACT_NO', 'CALL_CAT']).agg([
+            pl.len().alias('CALL_COUNT'),
+            pl.col('MBR_NO').n_unique().alias('UNIQUE_CALLERS'),
+        ]),
+    }
+
+    if contract_year:
+        for source in CONTRACT_YEAR_SPECS:
+            plans[f'{source}_contract_year'] = sources[source].group_by(KEYS).agg(
+                aggregate_exprs(source)
+            )
+    return plans
+
+
+def preauth_status_rates(status_counts: pl.DataFrame) -> pl.DataFrame:
+    """Share of each preauth episode status per contract ('<STATUS>_RATE' columns)."""
+    rates = status_counts.pivot(
+        on='EPISODE_STATUS (STATUS)', index='CONTRACT_NO', values='count'
+    ).fill_null(0)
+    status_cols = [c for c in rates.columns if c != 'CONTRACT_NO']
+    total = pl.sum_horizontal(status_cols)
+    return rates.select(
+        ['CONTRACT_NO'] + [(pl.col(col) / total).alias(f'{col}_RATE') for col in status_cols]
+    )
+
+
+def contract_level(parts: Dict[str, pl.DataFrame]) -> pl.DataFrame:
+    """
+    All-time contract-level dataset from its aggregates.
+
+    Args:
+        parts: Collected aggregates (see aggregation_plans)
+
+    Returns:
+        One row per contract with the derived IVI features
+    """
+    df = parts['member_contract'].join(
+        parts['claims_contract'], on='CONTRACT_NO', how='left'
+    ).join(
+        parts['calls_contract'], on='CONTRACT_NO', how='left'
+    ).join(
+        parts['preauth_contract'], on='CONTRACT_NO', how='left'
+    ).join(
+        preauth_status_rates(parts['preauth_status']), on='CONTRACT_NO', how='left'
+    )
+
+    # Fill nulls for contracts with no activity
+    fill_cols = [
+        c for c in df.columns
+        if c != 'CONTRACT_NO' and df[c].dtype in [pl.Float64, pl.Int64, pl.Int32, pl.Float32]
+    ]
+    df = df.with_columns([pl.col(c).fill_null(0) for c in fill_cols])
+
+    df = df.with_columns([
+        # Utilization metrics
+        (pl.col('MEMBERS_WITH_CLAIMS') / pl.col('TOTAL_MEMBERS')).alias('UTILIZATION_RATE'),
+        (pl.col('TOTAL_CLAIM_LINES') / pl.col('TOTAL_MEMBERS')).alias('CLAIMS_PER_MEMBER'),
+        (pl.col('TOTAL_NET_BILLED') / pl.col('TOTAL_MEMBERS')).alias('COST_PER_MEMBER'),
+        (pl.col('TOTAL_NET_BILLED') / pl.col('MEMBERS_WITH_CLAIMS').replace(0, None)).alias('COST_PER_UTILIZER'),
+        # Loss ratio (key sustainability metric)
+        (pl.col('TOTAL_NET_BILLED') / pl.col('TOTAL_EARNED').replace(0, None)).alias('LOSS_RATIO'),
+        # Experience metrics
+        (pl.col('TOTAL_CALLS') / pl.col('TOTAL_MEMBERS')).alias('CALLS_PER_MEMBER'),
+        (pl.col('UNIQUE_PREAUTH_EPISODES') / pl.col('TOTAL_MEMBERS')).alias('PREAUTH_PER_MEMBER'),
+        # Gender ratio
+        (pl.col('MALE_COUNT') / pl.col('TOTAL_MEMBERS')).alias('MALE_RATIO'),
+        # Provider diversity
+        (pl.col('UNIQUE_PROVIDERS') / pl.col('MEMBERS_WITH_CLAIMS').replace(0, None)).alias('PROVIDERS_PER_UTILIZER'),
+    ])
+    return df.fill_null(0)
+
+
+def member_level(parts: Dict[str, pl.DataFrame]) -> pl.DataFrame:
+    """
+    Member-level dataset from its aggregates.
+
+    Args:
+        parts: Collected aggregates (see aggregation_plans)
+
+    Returns:
+        One row per member with claims totals and utilization flags
+    """
+    claim_cols = [c for c in parts['member_claims'].columns if c != 'ADHERENT_NO']
+    df = parts['member_base'].join(
+        parts['member_claims'], on='ADHERENT_NO', how='left'
+    ).with_columns([
+        # Members with no claims
+        pl.col(c).fill_null(0) for c in claim_cols
+    ])
+    return df.with_columns([
+        (pl.col('TOTAL_BILLED') > 0).cast(pl.Int8).alias('IS_UTILIZER'),
+        (pl.col('TOTAL_BILLED') / pl.col('TOTAL_EARNED').replace(0, None)).alias('MEMBER_LOSS_RATIO'),
+    ])
+
+
+def contract_year_level(frames: Dict[str, pl.DataFrame]) -> pl.DataFrame:
+    """
+    Contract-year ML dataset with its derived features and retention target.
+
+    Args:
+        frames: Contract-year features by source (direct or incremental)
+
+    Returns:
+        One row per member contract-year
+    """
+    preauth = frames['preauth'].with_columns([
+        (pl.col('APPROVED_COUNT') / (pl.col('APPROVED_COUNT') + pl.col('REJECTED_COUNT')).replace(0, None)).alias('APPROVAL_RATE'),
+        (pl.col('REJECTED_COUNT') / (pl.col('APPROVED_COUNT') + pl.col('REJECTED_COUNT')).replace(0, None)).alias('REJECTION_RATE'),
+    ])
+    member = frames['member'].with_columns([
+        (pl.col('MALE_COUNT') / pl.col('TOTAL_MEMBERS')).alias('MALE_RATIO'),
+        (pl.col('ACTIVE_MONTHS') / 12).alias('YEAR_COVERAGE'),
+    ])
+
+    df = member.join(
+        frames['claims'], on=KEYS, how='left'
+    ).join(
+        frames['calls'], on=KEYS, how='left'
+    ).join(
+        preauth, on=KEYS, how='left'
+    )
+
+    numeric_cols = [
+        c for c in df.columns
+        if df[c].dtype in [pl.Float64, pl.Int64, pl.Int32, pl.Float32, pl.UInt32] and c not in KEYS
+    ]
+    df = df.with_columns([pl.col(c).fill_null(0) for c in numeric_cols])
+
+    df = df.with_columns([
+        # Utilization metrics
+        (pl.col('MEMBERS_WITH_CLAIMS') / pl.col('TOTAL_MEMBERS').replace(0, None)).fill_null(0).alias('UTILIZATION_RATE'),
+        (pl.col('TOTAL_BILLED') / pl.col('TOTAL_MEMBERS').replace(0, None)).fill_null(0).alias('COST_PER_MEMBER'),
+        (pl.col('TOTAL_BILLED') / pl.col('MEMBERS_WITH_CLAIMS').replace(0, None)).fill_null(0).alias('COST_PER_UTILIZER'),
+        # Loss ratio (key metric)
+        (pl.col('TOTAL_BILLED') / pl.col('EARNED_PREMIUM').replace(0, None)).fill_null(0).alias('LOSS_RATIO'),
+        # Experience metrics
+        (pl.col('TOTAL_CALLS') / pl.col('TOTAL_MEMBERS').replace(0, None)).fill_null(0).alias('CALLS_PER_MEMBER'),
+        (pl.col('PREAUTH_EPISODES') / pl.col('TOTAL_MEMBERS').replace(0, None)).fill_null(0).alias('PREAUTH_PER_MEMBER'),
+        # Claim intensity
+        (pl.col('CLAIM_LINES') / pl.col('TOTAL_MEMBERS').replace(0, None)).fill_null(0).alias('CLAIM_LINES_PER_MEMBER'),
+        (pl.col('UNIQUE_CLAIMS') / pl.col('MEMBERS_WITH_CLAIMS').replace(0, None)).fill_null(0).alias('CLAIMS_PER_UTILIZER'),
+        # Seasonal concentration
+        (pl.max_horizontal('Q1_CLAIMS', 'Q2_CLAIMS', 'Q3_CLAIMS', 'Q4_CLAIMS') /
+         (pl.col('Q1_CLAIMS') + pl.col('Q2_CLAIMS') + pl.col('Q3_CLAIMS') + pl.col('Q4_CLAIMS')).replace(0, None)
+         ).fill_null(0).alias('QUARTER_CONCENTRATION'),
+        # Provider diversity
+        (pl.col('UNIQUE_PROVIDERS') / pl.col('MEMBERS_WITH_CLAIMS').replace(0, None)).fill_null(0).alias('PROVIDERS_PER_UTILIZER'),
+        # Diagnosis complexity
+        (pl.col('UNIQUE_DIAGNOSES') / pl.col('MEMBERS_WITH_CLAIMS').replace(0, None)).fill_null(0).alias('DIAGNOSES_PER_UTILIZER'),
+    ])
+
+    # Retention target: RETENTION_YEAR contracts that hold members again the next year
+    renewed = member.filter(pl.col('YEAR') == str(int(RETENTION_YEAR) + 1))['CONTRACT_NO']
+    return df.with_columns(
+        pl.when(pl.col('YEAR') == RETENTION_YEAR)
+        .then(pl.col('CONTRACT_NO').is_in(renewed.implode()).cast(pl.Int8))
+        .otherwise(None)
+        .alias('RETAINED_NEXT_YEAR')
+    )
+
+
+def build_feature_tables(
+    lf_member: pl.LazyFrame,
+    lf_claims: pl.LazyFrame,
+    lf_calls: pl.LazyFrame,
+    lf_preauth: pl.LazyFrame,
+    df_provider: Optional[pl.DataFrame] = None,
+    contract_year: Optional[Dict[str, pl.DataFrame]] = None,
+    engine: str = ENGINE,
+) -> Dict[str, pl.DataFrame]:
+    """
+    Build every curated table from one fused scan per source.
+
+    Args:
+        lf_member, lf_claims, lf_calls, lf_preauth: Raw source rows
+        df_provider: Provider reference joined onto dim_provider
+        contract_year: Precomputed contract-year features by source (e.g.
+            from refresh_contract_year); aggregated in the fused scan if None
+        engine: Polars engine for the collect
+
+    Returns:
+        Dictionary of OUTPUT_TABLES name -> DataFrame
+    """
+    sources = {
+        name: prepare_rows(lf, name)
+        for name, lf in [
+            ('member', lf_member), ('claims', lf_claims), ('calls', lf_calls), ('preauth', lf_preauth)
+        ]
+    }
+    plans = aggregation_plans(sources, contract_year=contract_year is None)
+    parts = dict(zip(plans, pl.collect_all(list(plans.values()), engine=engine)))
+
+    if contract_year is None:
+        contract_year = {source: parts[f'{source}_contract_year'] for source in CONTRACT_YEAR_SPECS}
+
+    dim_provider = parts['dim_provider']
+    if df_provider is not None:
+        dim_provider = dim_provider.join(
+            df_provider.select(PROVIDER_COLUMNS), on='PROV_CODE', how='left'
+        )
+
+    return {
+        'contract_level': contract_level(parts),
+        'contract_year_level': contract_year_level(contract_year),
+        'member_level': member_level(parts),
+        'dim_nationality': parts['dim_nationality'],
+        'dim_provider': dim_provider,
+        'dim_diagnosis': parts['dim_diagnosis'],
+        'dim_calls': parts['dim_calls'],
+    }
+
+
+def write_feature_tables(tables: Dict[str, pl.DataFrame], output_dir: Path = OUTPUT_DIR) -> None:
+    """Atomically write each table to '<name>.parquet'."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in OUTPUT_TABLES:
+        path = output_dir / f'{name}.parquet'
+        tmp = path.with_suffix('.tmp')
+        tables[name].write_parquet(tmp)
+        os.replace(tmp, path)
+        print(f'{name}: {tables[name].shape} -> {path.name}')
+
+
+def run_feature_build(
+    data_dir: Path = DATA_DIR,
+    cache_dir: Path = CACHE_DIR,
+    output_dir: Path = OUTPUT_DIR,
+    full_rebuild: bool = False,
+) -> Dict[str, pl.DataFrame]:
+    """
+    Nightly build: ingest new raw files, build and write every table.
+
+    Contract-year features are refreshed from their stored partial states
+    (only new partitions are aggregated) unless full_rebuild is set. The
+    other tables (contract_level, member_level and the dim_* tables) are
+    all-time aggregates without stored states, so they are always rebuilt
+    from the full history; the partitions sync_dataset reports as touched
+    are not used to narrow that scan.
+
+    Args:
+        data_dir: Directory of the raw SAS files and Provider_Info.xlsx
+        cache_dir: Ingestion output directory
+        output_dir: Directory of the curated parquet files
+        full_rebuild: Aggregate the contract-year features from every raw
+            row in the fused scan instead
+
+    Returns:
+        Dictionary of OUTPUT_TABLES name -> DataFrame
+    """
+    for name in SAS_SOURCES:
+        sync_dataset(name, data_dir, cache_dir)
+
+    df_provider = pl.read_excel(data_dir / 'Provider_Info.xlsx')
+    df_provider = df_provider.rename({col: col.strip().upper() for col in df_provider.columns})
+
+    contract_year = None if full_rebuild else {
+        source: refresh_contract_year(source, cache_dir) for source in CONTRACT_YEAR_SPECS
+    }
+    tables = build_feature_tables(
+        scan_dataset(cache_dir, 'member'),
+        scan_dataset(cache_dir, 'claims'),
+        scan_dataset(cache_dir, 'calls'),
+        scan_dataset(cache_dir, 'preauth'),
+        df_provider,
+        contract_year,
+    )
+    write_feature_tables(tables, output_dir)
+    df_provider.write_parquet(output_dir / 'ref_provider.parquet')
+    return tables
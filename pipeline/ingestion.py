@@ -0,0 +1,407 @@
+"""
+Streaming SAS ingestion for the IVI pipeline.
+
+Raw sas7bdat extracts are read in row chunks and each chunk is written
+straight to YEAR/MONTH-partitioned parquet, so peak memory is bounded by the
+chunk size rather than the size of the extract. A manifest records every
+source file's hash, row count and parts, so a refresh only ingests the
+files (monthly drops) that are new or changed.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import polars as pl
+
+try:
+    import pyreadstat
+    HAS_PYREADSTAT = True
+except ImportError:
+    HAS_PYREADSTAT = False
+
+# Data paths
+DATA_DIR = Path('/volume/data/KAU-Bupa')
+CACHE_DIR = Path('/volume/data/cache')
+
+# Base raw extract by dataset name (monthly drops share its file stem)
+SAS_SOURCES = {
+    'member': 'sampled_member.sas7bdat',
+    'calls': 'sampled_calls.sas7bdat',
+    'claims': 'sampled_claims.sas7bdat',
+    'preauth': 'sampled_preauth.sas7bdat',
+}
+
+# Rows per chunk (peak memory is a small multiple of one chunk)
+CHUNK_ROWS = 500_000
+
+# Text encoding of the SAS extracts
+SAS_ENCODING = 'latin1'
+
+# Hive partition columns, derived from CONT_YYMM
+PARTITION_COLUMNS = ['YEAR', 'MONTH']
+
+MANIFEST_NAME = 'ingest_manifest.json'
+
+HASH_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def decode_bytes_columns(df: pd.DataFrame, encoding: str = SAS_ENCODING) -> pd.DataFrame:
+    """
+    Decode bytes values in object columns.
+
+    Uses the vectorized pandas string accessor instead of a Python callback
+    per value. SAS text columns hold either all bytes or all str, so the
+    first non-missing value decides whether a column is decoded.
+
+    Args:
+        df: Chunk read from a SAS file
+        encoding: Text encoding of the file
+
+    Returns:
+        The chunk with bytes decoded to str
+    """
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+        first = df[col].first_valid_index()
+        if first is not None and isinstance(df[col].at[first], bytes):
+            df[col] = df[col].str.decode(encoding)
+    return df
+
+
+def _to_polars(df: pd.DataFrame, schema: Optional[Dict[str, pl.DataType]]) -> pl.DataFrame:
+    """Convert a pandas chunk, aligning it to the schema of the first chunk."""
+    chunk = pl.from_pandas(decode_bytes_columns(df))
+    chunk = chunk.rename({col: col.strip().upper() for col in chunk.columns})
+
+    if schema is None:
+        # All-missing text columns come through untyped in the first chunk
+        return chunk.with_columns([
+            pl.col(col).cast(pl.Utf8) for col, dtype in chunk.schema.items() if dtype == pl.Null
+        ])
+    return chunk.select([
+        pl.col(col).cast(dtype, strict=False) if col in chunk.columns
+        else pl.lit(None, dtype=dtype).alias(col)
+        for col, dtype in schema.items()
+    ])
+
+
+def iter_sas_chunks(
+    sas_path: Path,
+    chunk_rows: int = CHUNK_ROWS,
+    num_processes: Optional[int] = None,
+) -> Iterator[pl.DataFrame]:
+    """
+    Read a SAS file as a sequence of Polars chunks.
+
+    Uses pyreadstat when installed (decoding in parallel within each chunk),
+    otherwise the pandas SAS reader. Column names are stripped and
+    upper-cased, and every chunk has the schema of the first one.
+
+    Args:
+        sas_path: sas7bdat file
+        chunk_rows: Rows per chunk
+        num_processes: pyreadstat worker processes (defaults to all cores)
+
+    Yields:
+        Polars DataFrames of at most chunk_rows rows
+    """
+    if HAS_PYREADSTAT:
+        reader = (
+            chunk for chunk, _ in pyreadstat.read_file_in_chunks(
+                pyreadstat.read_sas7bdat,
+                str(sas_path),
+                chunksize=chunk_rows,
+                multiprocess=True,
+                num_processes=num_processes or multiprocessing.cpu_count(),
+                encoding=SAS_ENCODING,
+            )
+        )
+    else:
+        reader = pd.read_sas(sas_path, chunksize=chunk_rows, encoding=SAS_ENCODING)
+
+    schema = None
+    for chunk in reader:
+        df = _to_polars(chunk, schema)
+        schema = schema or df.schema
+        yield df
+
+
+def dataset_dir(output_dir: Path, name: str) -> Path:
+    """Directory holding the partitioned parquet parts of one dataset."""
+    return output_dir / name
+
+
+def source_files(data_dir: Path, name: str) -> List[Path]:
+    """
+    Raw files of a dataset: the base extract plus any monthly drops.
+
+    A drop is any sas7bdat named after the base extract with a suffix,
+    e.g. sampled_claims_202403.sas7bdat next to sampled_claims.sas7bdat.
+
+    Args:
+        data_dir: Directory of the raw SAS files
+        name: Dataset name (one of SAS_SOURCES)
+
+    Returns:
+        Source files in name order
+    """
+    stem = Path(SAS_SOURCES[name]).stem
+    return sorted(data_dir.glob(f'{stem}*.sas7bdat'))
+
+
+def partition_exprs() -> List[pl.Expr]:
+    """YEAR and MONTH partition labels from CONT_YYMM ('0000'/'00' when missing)."""
+    period = pl.col('CONT_YYMM').cast(pl.Utf8)
+    return [
+        period.str.slice(0, 4).fill_null('0000').alias(PARTITION_COLUMNS[0]),
+        period.str.slice(4, 2).fill_null('00').alias(PARTITION_COLUMNS[1]),
+    ]
+
+
+def partition_path(year: str, month: str) -> str:
+    """Hive-style directory of one partition, relative to the dataset."""
+    return f'{PARTITION_COLUMNS[0]}={year}/{PARTITION_COLUMNS[1]}={month}'
+
+
+def file_digest(path: Path) -> str:
+    """blake2b digest of a file, read in blocks."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_manifest(output_dir: Path) -> dict:
+    """
+    Load the ingestion manifest.
+
+    Args:
+        output_dir: Ingestion output directory
+
+    Returns:
+        Manifest dictionary ({'version', 'datasets': {name: {file: entry}}})
+    """
+    path = output_dir / MANIFEST_NAME
+    if not path.exists():
+        return {'version': 1, 'datasets': {}}
+    return json.loads(path.read_text())
+
+
+def write_manifest(output_dir: Path, manifest: dict) -> None:
+    """Atomically replace the ingestion manifest."""
+    path = output_dir / MANIFEST_NAME
+    tmp = path.with_suffix('.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path)
+
+
+def staging_dir(output_dir: Path, name: str, sas_path: Path) -> Path:
+    """Directory one source file's parts are written to before being swapped in."""
+    return output_dir / f'.{name}.staging' / sas_path.stem
+
+
+def ingest_sas_file(
+    sas_path: Path,
+    target: Path,
+    chunk_rows: int = CHUNK_ROWS,
+) -> dict:
+    """
+    Stream one SAS file into YEAR/MONTH-partitioned parquet parts.
+
+    Each chunk is split by partition and written as new part files named
+    after the source file, so a file's parts can be found and replaced
+    without touching other files' data. target is emptied first; callers
+    pass a staging directory and swap the parts in (see swap_parts).
+
+    Args:
+        sas_path: sas7bdat file
+        target: Directory to write the partitioned parts to
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Manifest entry with rows, partitions and parts (relative paths)
+    """
+    # Clear parts left by an interrupted earlier run of this file
+    shutil.rmtree(target, ignore_errors=True)
+
+    rows = 0
+    parts = []
+    partitions = set()
+    for i, chunk in enumerate(iter_sas_chunks(sas_path, chunk_rows)):
+        labelled = chunk.with_columns(partition_exprs())
+        for (year, month), part in labelled.partition_by(
+            PARTITION_COLUMNS, as_dict=True, include_key=False
+        ).items():
+            relative = f'{partition_path(year, month)}/{sas_path.stem}-{i:05d}.parquet'
+            (target / relative).parent.mkdir(parents=True, exist_ok=True)
+            part.write_parquet(target / relative)
+            parts.append(relative)
+            partitions.add((year, month))
+        rows += chunk.height
+        print(f'[{sas_path.stem}] {rows:,} rows')
+
+    return {'rows': rows, 'partitions': sorted(partitions), 'parts': parts}
+
+
+def swap_parts(staging: Path, target: Path, old_parts: Sequence[str], new_parts: Sequence[str]) -> None:
+    """
+    Replace a source file's live parts with its fully staged ones.
+
+    Args:
+        staging: Staging directory written by ingest_sas_file
+        target: Dataset directory
+        old_parts: The file's current parts (relative paths)
+        new_parts: Staged parts (relative paths)
+    """
+    for part in old_parts:
+        (target / part).unlink(missing_ok=True)
+    for part in new_parts:
+        (target / part).parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging / part, target / part)
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def sync_dataset(
+    name: str,
+    data_dir: Path = DATA_DIR,
+    output_dir: Path = CACHE_DIR,
+    chunk_rows: int = CHUNK_ROWS,
+    full: bool = False,
+) -> List[Tuple[str, str]]:
+    """
+    Bring an ingested dataset up to date with its source files.
+
+    Files whose size and mtime match the manifest are skipped without
+    reading them; otherwise their content hash decides. New files are
+    appended, changed files have their parts replaced and removed files
+    have their parts deleted. A new or changed file is read completely into
+    a staging directory before its parts are swapped into the dataset, and
+    the manifest is saved after every swap, so a failed read leaves the
+    dataset and manifest as they were.
+
+    Args:
+        name: Dataset name (one of SAS_SOURCES)
+        data_dir: Directory of the raw SAS files
+        output_dir: Ingestion output directory
+        chunk_rows: Rows per chunk
+        full: Discard the existing dataset and ingest every file again
+
+    Returns:
+        (YEAR, MONTH) partitions whose data changed
+    """
+    target = dataset_dir(output_dir, name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(output_dir)
+    if full:
+        shutil.rmtree(target, ignore_errors=True)
+        manifest['datasets'].pop(name, None)
+    entries = manifest['datasets'].setdefault(name, {})
+
+    touched = set()
+    sources = {path.name: path for path in source_files(data_dir, name)}
+
+    for file_name in sorted(set(entries) - set(sources)):
+        print(f'[{name}] {file_name} removed, dropping its partitions')
+        for part in entries[file_name]['parts']:
+            (target / part).unlink(missing_ok=True)
+        touched.update(tuple(p) for p in entries.pop(file_name)['partitions'])
+        write_manifest(output_dir, manifest)
+
+    for file_name, path in sources.items():
+        stat = path.stat()
+        entry = entries.get(file_name)
+        if entry and (entry['size'], entry['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            continue
+
+        digest = file_digest(path)
+        if entry and entry['hash'] == digest:
+            entry['mtime_ns'] = stat.st_mtime_ns
+            write_manifest(output_dir, manifest)
+            continue
+
+        if entry:
+            print(f'[{name}] {file_name} changed, replacing its partitions')
+            touched.update(tuple(p) for p in entry['partitions'])
+        else:
+            print(f'[{name}] Streaming {file_name} in chunks of {chunk_rows:,} rows...')
+
+        staging = staging_dir(output_dir, name, path)
+        new_entry = ingest_sas_file(path, staging, chunk_rows)
+        swap_parts(staging, target, entry['parts'] if entry else [], new_entry['parts'])
+        new_entry.update({'hash': digest, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+        entries[file_name] = new_entry
+        touched.update(tuple(p) for p in new_entry['partitions'])
+        write_manifest(output_dir, manifest)
+
+    return sorted(touched)
+
+
+def scan_dataset(
+    output_dir: Path,
+    name: str,
+    partitions: Optional[Sequence[Tuple[str, str]]] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan an ingested dataset.
+
+    YEAR (string) and MONTH (integer) come from the partition directories.
+
+    Args:
+        output_dir: Ingestion output directory
+        name: Dataset name (e.g. 'claims')
+        partitions: Optional (YEAR, MONTH) partitions to restrict the scan to
+
+    Returns:
+        LazyFrame over the selected part files
+    """
+    target = dataset_dir(output_dir, name)
+    if partitions is None:
+        sources = [str(target / '*' / '*' / '*.parquet')]
+    else:
+        sources = [
+            str(path) for year, month in partitions
+            for path in sorted((target / partition_path(year, month)).glob('*.parquet'))
+        ]
+
+    return pl.scan_parquet(
+        sources,
+        hive_partitioning=True,
+        hive_schema={PARTITION_COLUMNS[0]: pl.Utf8, PARTITION_COLUMNS[1]: pl.Int32},
+    )
+
+
+def load_sas_dataset(
+    name: str,
+    data_dir: Path = DATA_DIR,
+    output_dir: Path = CACHE_DIR,
+    use_cache: bool = True,
+    chunk_rows: int = CHUNK_ROWS,
+) -> pl.LazyFrame:
+    """
+    Ingest new or changed raw files of a dataset and scan it lazily.
+
+    Args:
+        name: Dataset name (one of SAS_SOURCES)
+        data_dir: Directory of the raw SAS files
+        output_dir: Ingestion output directory
+        use_cache: Keep previously ingested files (False re-ingests everything)
+        chunk_rows: Rows per chunk
+
+    Returns:
+        LazyFrame over the ingested parquet dataset
+    """
+    touched = sync_dataset(name, data_dir, output_dir, chunk_rows, full=not use_cache)
+    if touched:
+        print(f'[{name}] {len(touched)} partitions updated')
+    else:
+        print(f'[{name}] Loading from parquet cache...')
+
+    return scan_dataset(output_dir, name)
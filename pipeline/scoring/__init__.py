@@ -0,0 +1,6 @@
+"""
+IVI scoring package: batch scoring of contract-year features with the
+persisted model bundle, outside of notebook 03.
+
+Run as `python -m pipeline.scoring --help`.
+"""
@@ -0,0 +1,121 @@
+"""
+Batch scoring of contract-year features.
+
+score_frame turns prepared rows (and, when known, their retention
+probabilities) into the published IVI scores. The helpers below split an
+input file into row batches for spawned worker processes and append the
+returned batches to one parquet file in input order; refresh_scores
+(pipeline.scoring.store) is the single entry point that drives them.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import polars as pl
+
+from ..segmentation import add_segments
+from .model import feature_matrix, output_columns, predict_proba, rule_scores
+
+# Rows per scoring batch
+BATCH_ROWS = 50_000
+
+SCORES_NAME = 'ivi_scores_all_years.parquet'
+
+
+def score_frame(
+    df: pl.DataFrame,
+    bundle: dict,
+    reference: Dict[str, np.ndarray],
+    proba: Optional[np.ndarray] = None,
+) -> pl.DataFrame:
+    """
+    Score prepared contract-year rows.
+
+    Args:
+        df: Scoring rows (see scoring_rows)
+        bundle: Model bundle (see load_bundle)
+        reference: Rule score reference (see rule_reference)
+        proba: Known retention probabilities per row (predicted when None)
+
+    Returns:
+        Output columns plus IVI_PROBA, IVI_SCORE, rule scores, IVI_RISK and SEGMENT
+    """
+    features = bundle['features']
+    if proba is None:
+        proba = predict_proba(bundle['model'], feature_matrix(df, features), features)
+    rules = rule_scores(df, reference, bundle['rule_features'])
+    weights = bundle['weights_heu']
+
+    out = df.select(output_columns(features, df.columns)).with_columns([
+        pl.Series('IVI_PROBA', proba),
+        pl.Series('IVI_SCORE', proba * 100),
+        pl.Series('IVI_SCORE_ML', proba * 100),
+        pl.Series('H_SCORE_RULE', rules['H'] * 100),
+        pl.Series('E_SCORE_RULE', rules['E'] * 100),
+        pl.Series('U_SCORE_RULE', rules['U'] * 100),
+    ]).with_columns([
+        (
+            weights['H'] * pl.col('H_SCORE_RULE')
+            + weights['E'] * pl.col('E_SCORE_RULE')
+            + weights['U'] * pl.col('U_SCORE_RULE')
+        ).alias('IVI_SCORE_RULE'),
+        (
+            (pl.col('H_SCORE_RULE').sqrt() * pl.col('E_SCORE_RULE').sqrt() * pl.col('U_SCORE_RULE').sqrt())
+            .pow(1 / 3) * 10
+        ).alias('IVI_SCORE_RULE_NL'),
+        (
+            pl.col('RETAINED_NEXT_YEAR') if 'RETAINED_NEXT_YEAR' in df.columns
+            else pl.lit(None, dtype=pl.Float64)
+        ).alias('RETAINED_ACTUAL'),
+    ])
+    return add_segments(out)
+
+
+def batch_ranges(n_rows: int, batch_rows: int) -> List[tuple]:
+    """(offset, length) of each batch."""
+    return [(offset, min(batch_rows, n_rows - offset)) for offset in range(0, n_rows, batch_rows)]
+
+
+def process_pool(workers: int, initializer: Callable, initargs: tuple) -> ProcessPoolExecutor:
+    """Spawned worker pool; each worker runs the initializer once."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def write_batches(batches: Iterable[pl.DataFrame], path: Path, label: str) -> int:
+    """
+    Append frames to one parquet file as they arrive.
+
+    Args:
+        batches: Frames with the same columns, in output order
+        path: Parquet file to create (nothing is written when all frames are empty)
+        label: Progress log prefix
+
+    Returns:
+        Number of rows written
+    """
+    import pyarrow.parquet as pq
+
+    written = 0
+    writer = None
+    try:
+        for batch in batches:
+            if batch.height == 0:
+                continue
+            table = batch.to_arrow()
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            written += batch.height
+            print(f'[{label}] {written:,} rows')
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
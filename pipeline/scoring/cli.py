@@ -0,0 +1,45 @@
+"""Command-line entry point: `python -m pipeline.scoring`."""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .batch import BATCH_ROWS, SCORES_NAME
+from .explain import SHAP_NAME
+from .model import BUNDLE_NAME, MIN_MEMBERS, MODELS_DIR, PROCESSED_DIR, TRAIN_YEAR
+from .store import STORE_DIR, refresh_scores
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Rescore changed contract-years and refresh the scores and SHAP sub-scores."""
+    parser = argparse.ArgumentParser(
+        prog='python -m pipeline.scoring',
+        description='Score contract-year features with the persisted IVI model.',
+    )
+    parser.add_argument('--input', type=Path, default=PROCESSED_DIR / 'contract_year_level.parquet')
+    parser.add_argument('--output', type=Path, default=MODELS_DIR / SCORES_NAME)
+    parser.add_argument('--shap-output', type=Path, default=MODELS_DIR / SHAP_NAME)
+    parser.add_argument('--bundle', type=Path, default=MODELS_DIR / BUNDLE_NAME)
+    parser.add_argument('--store-dir', type=Path, default=STORE_DIR)
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--batch-rows', type=int, default=BATCH_ROWS)
+    parser.add_argument('--min-members', type=int, default=MIN_MEMBERS)
+    parser.add_argument('--train-year', default=TRAIN_YEAR)
+    parser.add_argument('--full', action='store_true', help='ignore the score store and rescore every row')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    summary = refresh_scores(
+        args.input, args.output, args.shap_output, args.bundle, args.store_dir,
+        workers=args.workers,
+        batch_rows=args.batch_rows,
+        min_members=args.min_members,
+        train_year=args.train_year,
+        full=args.full,
+    )
+    print(
+        f"[scoring] {summary['rows']:,} rows ({summary['rescored']:,} rescored, "
+        f"{summary['reused']:,} reused) -> {args.output}, {args.shap_output} "
+        f'in {time.perf_counter() - start:.1f}s'
+    )
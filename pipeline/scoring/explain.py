@@ -0,0 +1,206 @@
+"""
+Chunked tree SHAP with H/E/U group decomposition.
+
+Worker processes compute exact tree SHAP contributions for row batches
+with LightGBM's native TreeSHAP (the same values shap.TreeExplainer gives
+for the model) and reduce them to feature-group sums with one matrix
+multiply against a precomputed feature x group indicator matrix. Batches
+stream to a raw parquet file; the group sums are then min-max scaled to
+0-100 across all scored contract-years, as in notebook 03.
+"""
+
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import polars as pl
+
+from .batch import BATCH_ROWS, batch_ranges, process_pool, write_batches
+from .model import (
+    BUNDLE_NAME,
+    KEYS,
+    LABEL,
+    MIN_MEMBERS,
+    MODELS_DIR,
+    PROCESSED_DIR,
+    feature_matrix,
+    load_bundle,
+    predict_proba,
+    scoring_rows,
+)
+
+SHAP_NAME = 'shap_subscores.parquet'
+
+# Dashboard sub-score -> feature group
+SUBSCORE_GROUPS = {'H_SCORE': 'H_HEALTH', 'E_SCORE': 'E_EXPERIENCE', 'U_SCORE': 'U_UTILIZATION'}
+
+# Per-process explain state, set by _init_worker
+_STATE: dict = {}
+
+
+def group_matrix(features: Sequence[str], feature_groups: Dict[str, List[str]]) -> np.ndarray:
+    """
+    Feature x group indicator matrix.
+
+    Args:
+        features: Model feature names, in model order
+        feature_groups: Group -> member features (features outside the model are ignored)
+
+    Returns:
+        (n_features, n_groups) float64 array with 1 where the feature belongs to the group
+    """
+    index = {f: i for i, f in enumerate(features)}
+    matrix = np.zeros((len(features), len(feature_groups)), dtype=np.float64)
+    for j, members in enumerate(feature_groups.values()):
+        for feature in members:
+            if feature in index:
+                matrix[index[feature], j] = 1.0
+    return matrix
+
+
+def shap_contributions(model, X: np.ndarray, features: Sequence[str]) -> np.ndarray:
+    """
+    Tree SHAP values of the retained class (log-odds).
+
+    Args:
+        model: Fitted LGBMClassifier
+        X: Feature matrix in model order
+        features: Model feature names
+
+    Returns:
+        (rows, n_features + 1) array; the last column is the expected value
+    """
+    import pandas as pd
+
+    return model.predict(pd.DataFrame(X, columns=list(features)), pred_contrib=True)
+
+
+def explain_frame(df: pl.DataFrame, bundle: dict, groups: np.ndarray) -> pl.DataFrame:
+    """
+    Raw SHAP group sums of prepared contract-year rows.
+
+    Args:
+        df: Scoring rows (see scoring_rows)
+        bundle: Model bundle (see load_bundle)
+        groups: Indicator matrix (see group_matrix)
+
+    Returns:
+        Keys, one column per feature group, IVI_PROBA and ACTUAL
+    """
+    features = bundle['features']
+    X = feature_matrix(df, features)
+    contrib = shap_contributions(bundle['model'], X, features)
+    sums = contrib[:, :-1] @ groups
+    # The model's own link (sigmoid parameter included), not 1 / (1 + exp(-sum))
+    proba = predict_proba(bundle['model'], X, features)
+
+    return df.select(KEYS).with_columns([
+        *[pl.Series(group, sums[:, j]) for j, group in enumerate(bundle['feature_groups'])],
+        pl.Series('IVI_PROBA', proba),
+        (pl.col(LABEL) if LABEL in df.columns else pl.lit(None, dtype=pl.Float64)).alias('ACTUAL'),
+    ])
+
+
+def subscore_exprs(lf: pl.LazyFrame, feature_groups: Sequence[str]) -> List[pl.Expr]:
+    """
+    0-100 scores of the group sums, min-max scaled over the whole frame.
+
+    Groups with no spread score 50. IVI_SCORE and the dashboard's
+    H_SCORE / E_SCORE / U_SCORE aliases are included.
+    """
+    bounds = lf.select(
+        [pl.col(g).min().alias(f'{g}_min') for g in feature_groups]
+        + [pl.col(g).max().alias(f'{g}_max') for g in feature_groups]
+    ).collect().row(0, named=True)
+
+    exprs = []
+    for group in feature_groups:
+        low, high = bounds[f'{group}_min'], bounds[f'{group}_max']
+        if low is not None and high > low:
+            exprs.append(((pl.col(group) - low) / (high - low) * 100).alias(f'{group}_SCORE'))
+        else:
+            exprs.append(pl.lit(50.0).alias(f'{group}_SCORE'))
+    exprs.append((pl.col('IVI_PROBA') * 100).alias('IVI_SCORE'))
+    exprs += [
+        pl.col(f'{group}_SCORE').alias(score)
+        for score, group in SUBSCORE_GROUPS.items()
+        if group in feature_groups
+    ]
+    return exprs
+
+
+def _init_worker(bundle_path: str, min_members: int) -> None:
+    """Load the bundle and build the group matrix once per worker."""
+    bundle = load_bundle(Path(bundle_path))
+    bundle['model'].set_params(n_jobs=1)
+    groups = group_matrix(bundle['features'], bundle['feature_groups'])
+    _STATE.update(bundle=bundle, groups=groups, min_members=min_members)
+
+
+def _explain_batch(input_path: str, offset: int, length: int) -> pl.DataFrame:
+    """Read, prepare and explain one row batch of the input file."""
+    rows = scoring_rows(
+        pl.scan_parquet(input_path).slice(offset, length), _STATE['min_members']
+    ).collect()
+    return explain_frame(rows, _STATE['bundle'], _STATE['groups'])
+
+
+def finalize_subscores(raw: pl.LazyFrame, output_path: Path, feature_groups: Sequence[str]) -> None:
+    """Scale raw group sums into sub-scores and atomically replace output_path."""
+    tmp = output_path.with_suffix('.tmp')
+    try:
+        raw.with_columns(subscore_exprs(raw, feature_groups)).sink_parquet(tmp)
+        os.replace(tmp, output_path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def explain_parquet(
+    input_path: Path = PROCESSED_DIR / 'contract_year_level.parquet',
+    output_path: Path = MODELS_DIR / SHAP_NAME,
+    bundle_path: Path = MODELS_DIR / BUNDLE_NAME,
+    workers: Optional[int] = None,
+    batch_rows: int = BATCH_ROWS,
+    min_members: int = MIN_MEMBERS,
+) -> int:
+    """
+    Compute SHAP sub-scores for every contract-year of a parquet file.
+
+    Args:
+        input_path: contract_year_level parquet
+        output_path: SHAP sub-scores parquet to replace
+        bundle_path: Model bundle
+        workers: Worker processes (defaults to all cores)
+        batch_rows: Input rows per batch
+        min_members: Minimum TOTAL_MEMBERS explained
+
+    Returns:
+        Number of rows written
+    """
+    feature_groups = list(load_bundle(bundle_path)['feature_groups'])
+    n_rows = pl.scan_parquet(input_path).select(pl.len()).collect().item()
+    ranges = batch_ranges(n_rows, batch_rows)
+    workers = max(1, min(workers or multiprocessing.cpu_count(), len(ranges) or 1))
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    raw = output_path.with_suffix('.raw.parquet')
+    try:
+        with process_pool(workers, _init_worker, (str(bundle_path), min_members)) as pool:
+            written = write_batches(
+                pool.map(
+                    _explain_batch,
+                    [str(input_path)] * len(ranges),
+                    [offset for offset, _ in ranges],
+                    [length for _, length in ranges],
+                ),
+                raw,
+                'shap',
+            )
+        if written == 0:
+            raise ValueError(f'No rows to explain in {input_path}')
+        finalize_subscores(pl.scan_parquet(raw), output_path, feature_groups)
+    finally:
+        raw.unlink(missing_ok=True)
+    return written
@@ -0,0 +1,213 @@
+"""
+Model bundle loading and feature preparation for IVI scoring.
+
+Mirrors the scoring steps of notebook 03: LOSS_RATIO recomputed from
+written premium, contracts below MIN_MEMBERS dropped, one-hot region and
+network features, missing / infinite values set to 0, and H/E/U rule
+scores as ECDF percentiles against the training year.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import polars as pl
+
+# Data paths
+DATA_DIR = Path('/volume/data')
+PROCESSED_DIR = DATA_DIR / 'processed'
+MODELS_DIR = DATA_DIR / 'models'
+
+BUNDLE_NAME = 'ivi_model_bundle.joblib'
+
+# Contract-years below this member count are not scored (notebook 03)
+MIN_MEMBERS = 5
+
+# Year whose feature distribution the rule scores are ranked against
+TRAIN_YEAR = '2022'
+
+KEYS = ['CONTRACT_NO', 'YEAR']
+LABEL = 'RETAINED_NEXT_YEAR'
+CATEGORICAL = {'REGION_': 'PRIMARY_REGION', 'NETWORK_': 'PRIMARY_NETWORK'}
+
+# Rule features per dimension: (feature, higher_is_better_for_health).
+# Used when the bundle predates 'rule_features'.
+RULE_FEATURES: Dict[str, List[Tuple[str, bool]]] = {
+    'H': [
+        ('UTILIZATION_RATE', False),
+        ('DIAGNOSES_PER_UTILIZER', False),
+        ('CLAIMS_PER_UTILIZER', False),
+        ('AVG_CLAIM_AMOUNT', False),
+        ('P90_CLAIM_AMOUNT', False),
+        ('CLAIM_LINES_PER_MEMBER', False),
+    ],
+    'E': [
+        ('CALLS_PER_MEMBER', False),
+        ('AVG_RESOLUTION_DAYS', False),
+        ('REJECTION_RATE', False),
+        ('APPROVAL_RATE', True),
+        ('PREAUTH_PER_MEMBER', False),
+    ],
+    'U': [
+        ('LOSS_RATIO', False),
+        ('COST_PER_MEMBER', False),
+        ('COST_PER_UTILIZER', False),
+    ],
+}
+
+WEIGHTS_HEU = {'H': 0.30, 'E': 0.30, 'U': 0.40}
+
+
+def load_bundle(path: Path = MODELS_DIR / BUNDLE_NAME) -> dict:
+    """
+    Load the model bundle saved by notebook 03.
+
+    Args:
+        path: joblib bundle with 'model', 'features' and optional
+            'rule_features' / 'weights_heu'
+
+    Returns:
+        Bundle dictionary with the optional keys filled in
+    """
+    import joblib
+
+    bundle = joblib.load(path)
+    bundle.setdefault('rule_features', RULE_FEATURES)
+    bundle.setdefault('weights_heu', WEIGHTS_HEU)
+    return bundle
+
+
+def scoring_rows(lf: pl.LazyFrame, min_members: int = MIN_MEMBERS) -> pl.LazyFrame:
+    """
+    Contract-year rows as notebook 03 scores them.
+
+    Args:
+        lf: contract_year_level rows
+        min_members: Minimum TOTAL_MEMBERS
+
+    Returns:
+        LazyFrame with LOSS_RATIO on written premium and small contracts dropped
+    """
+    columns = lf.collect_schema().names()
+    if {'TOTAL_BILLED', 'WRITTEN_PREMIUM'}.issubset(columns):
+        lf = lf.with_columns(
+            pl.when(pl.col('WRITTEN_PREMIUM') > 0)
+            .then(pl.col('TOTAL_BILLED') / pl.col('WRITTEN_PREMIUM'))
+            .otherwise(None)
+            .alias('LOSS_RATIO')
+        )
+    return lf.filter(pl.col('TOTAL_MEMBERS') >= min_members)
+
+
+def output_columns(features: Sequence[str], columns: Sequence[str]) -> List[str]:
+    """Input columns carried into the scores file (keys, raw features, segment inputs, label, categoricals)."""
+    keep = KEYS + [f for f in features if f in columns and f not in KEYS]
+    keep += [c for c in ['TOTAL_MEMBERS', 'LOSS_RATIO', LABEL, *CATEGORICAL.values()] if c in columns]
+    return list(dict.fromkeys(keep))
+
+
+def feature_exprs(features: Sequence[str], columns: Sequence[str]) -> List[pl.Expr]:
+    """
+    Model feature columns, in model order.
+
+    Features present in the frame are used as is; REGION_* / NETWORK_*
+    dummies are derived from PRIMARY_REGION / PRIMARY_NETWORK; anything
+    else is 0. Nulls, NaN and infinities become 0.
+
+    Args:
+        features: Model feature names
+        columns: Columns of the frame
+
+    Returns:
+        Float64 expressions named after the features
+    """
+    exprs = []
+    for feature in features:
+        if feature in columns:
+            value = pl.col(feature).cast(pl.Float64)
+        else:
+            value = pl.lit(0.0)
+            for prefix, source in CATEGORICAL.items():
+                if feature.startswith(prefix) and source in columns:
+                    category = feature[len(prefix):]
+                    value = (
+                        pl.col(source).cast(pl.Utf8).fill_null('Unknown') == category
+                    ).cast(pl.Float64)
+                    break
+        exprs.append(
+            pl.when(value.is_finite()).then(value).otherwise(0.0).fill_null(0.0).alias(feature)
+        )
+    return exprs
+
+
+def feature_matrix(df: pl.DataFrame, features: Sequence[str]) -> np.ndarray:
+    """Feature matrix (rows x features, float64) of a frame, in model order."""
+    return df.select(feature_exprs(features, df.columns)).to_numpy().astype(np.float64, copy=False)
+
+
+def predict_proba(model, X: np.ndarray, features: Sequence[str]) -> np.ndarray:
+    """Retention probability from the sklearn wrapper, keeping feature names."""
+    import pandas as pd
+
+    return model.predict_proba(pd.DataFrame(X, columns=list(features)))[:, 1]
+
+
+def rule_reference(
+    lf: pl.LazyFrame,
+    rule_features: Dict[str, List[Tuple[str, bool]]],
+    train_year: str = TRAIN_YEAR,
+) -> Dict[str, np.ndarray]:
+    """
+    Sorted training-year values of every rule feature.
+
+    Args:
+        lf: Scoring rows (see scoring_rows)
+        rule_features: Rule features per dimension
+        train_year: Reference YEAR
+
+    Returns:
+        Dictionary of feature -> sorted non-NaN values
+    """
+    columns = lf.collect_schema().names()
+    names = [f for feats in rule_features.values() for f, _ in feats if f in columns]
+    df = lf.filter(pl.col('YEAR').cast(pl.Utf8) == train_year).select(names).collect()
+    reference = {}
+    for name in names:
+        values = df[name].cast(pl.Float64).to_numpy()
+        reference[name] = np.sort(values[~np.isnan(values)])
+    return reference
+
+
+def rule_scores(
+    df: pl.DataFrame,
+    reference: Dict[str, np.ndarray],
+    rule_features: Dict[str, List[Tuple[str, bool]]],
+) -> Dict[str, np.ndarray]:
+    """
+    H/E/U rule scores (0-1) as mean ECDF percentiles against the reference.
+
+    Args:
+        df: Scoring rows
+        reference: Sorted reference values (see rule_reference)
+        rule_features: Rule features per dimension
+
+    Returns:
+        Dictionary of dimension -> score per row
+    """
+    scores = {}
+    for dim, feats in rule_features.items():
+        parts = []
+        for feature, higher_is_better in feats:
+            if feature not in reference:
+                continue
+            train = reference[feature]
+            values = df[feature].cast(pl.Float64).fill_null(np.nan).to_numpy()
+            if train.size == 0:
+                p = np.full(values.shape, 0.5)
+            else:
+                p = np.searchsorted(train, values, side='right') / train.size
+            if not higher_is_better:
+                p = 1.0 - p
+            parts.append(np.clip(p, 0.0, 1.0))
+        scores[dim] = np.vstack(parts).mean(axis=0) if parts else np.full(df.height, 0.5)
+    return scores
@@ -0,0 +1,194 @@
+"""
+Incremental IVI rescoring backed by a persisted score store.
+
+The expensive model outputs of a contract-year (retention probability and
+SHAP group sums, one tree-SHAP pass) are kept in a store keyed by
+CONTRACT_NO / YEAR together with a fingerprint of the row's model feature
+vector. A refresh fingerprints the current contract_year_level rows and
+only runs the model for rows that are new or whose fingerprint changed;
+a different model bundle (or Polars version, which the row hash depends
+on) invalidates the whole store. Rule scores, segments and the SHAP
+min-max scaling are cheap and are recomputed for every row, so the
+published files are identical to a full rescore.
+"""
+
+import json
+import multiprocessing
+import os
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+
+from ..ingestion import file_digest
+from .batch import BATCH_ROWS, SCORES_NAME, batch_ranges, process_pool, score_frame, write_batches
+from .explain import SHAP_NAME, _explain_batch, _init_worker, finalize_subscores
+from .model import (
+    BUNDLE_NAME,
+    KEYS,
+    LABEL,
+    MIN_MEMBERS,
+    MODELS_DIR,
+    PROCESSED_DIR,
+    TRAIN_YEAR,
+    feature_exprs,
+    load_bundle,
+    rule_reference,
+    scoring_rows,
+)
+
+STORE_DIR = MODELS_DIR / 'score_store'
+STORE_NAME = 'model_outputs.parquet'
+STORE_META_NAME = 'store.json'
+
+
+def fingerprint_expr(features, columns) -> pl.Expr:
+    """FINGERPRINT: 64-bit hash of a row's model feature vector."""
+    return pl.struct(feature_exprs(features, columns)).hash(seed=0).alias('FINGERPRINT')
+
+
+def store_meta(bundle_path: Path) -> dict:
+    """What the stored outputs depend on besides the feature vector."""
+    return {'version': 1, 'model': file_digest(bundle_path), 'polars': pl.__version__}
+
+
+def read_store(store_dir: Path, meta: dict) -> Optional[pl.DataFrame]:
+    """
+    Load the stored model outputs.
+
+    Args:
+        store_dir: Score store directory
+        meta: Current store_meta
+
+    Returns:
+        Stored rows, or None when there is no store or it was built for
+        another model / Polars version
+    """
+    meta_path = store_dir / STORE_META_NAME
+    if not meta_path.exists() or not (store_dir / STORE_NAME).exists():
+        return None
+    if json.loads(meta_path.read_text()) != meta:
+        return None
+    return pl.read_parquet(store_dir / STORE_NAME)
+
+
+def write_store(store_dir: Path, store: pl.DataFrame, meta: dict) -> None:
+    """Atomically replace the stored model outputs and their metadata."""
+    store_dir.mkdir(parents=True, exist_ok=True)
+    tmp = store_dir / f'{STORE_NAME}.tmp'
+    store.write_parquet(tmp)
+    os.replace(tmp, store_dir / STORE_NAME)
+    meta_tmp = store_dir / f'{STORE_META_NAME}.tmp'
+    meta_tmp.write_text(json.dumps(meta, indent=2, sort_keys=True))
+    os.replace(meta_tmp, store_dir / STORE_META_NAME)
+
+
+def _write_atomic(df: pl.DataFrame, path: Path) -> None:
+    """Write a parquet file through a temporary file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    try:
+        df.write_parquet(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def refresh_scores(
+    input_path: Path = PROCESSED_DIR / 'contract_year_level.parquet',
+    scores_path: Path = MODELS_DIR / SCORES_NAME,
+    shap_path: Path = MODELS_DIR / SHAP_NAME,
+    bundle_path: Path = MODELS_DIR / BUNDLE_NAME,
+    store_dir: Path = STORE_DIR,
+    workers: Optional[int] = None,
+    batch_rows: int = BATCH_ROWS,
+    min_members: int = MIN_MEMBERS,
+    train_year: str = TRAIN_YEAR,
+    full: bool = False,
+) -> dict:
+    """
+    Rescore changed contract-years and republish the scores and SHAP sub-scores.
+
+    Args:
+        input_path: contract_year_level parquet
+        scores_path: IVI scores parquet to replace
+        shap_path: SHAP sub-scores parquet to replace
+        bundle_path: Model bundle
+        store_dir: Score store directory
+        workers: Worker processes (defaults to all cores)
+        batch_rows: Rows per model batch
+        min_members: Minimum TOTAL_MEMBERS scored
+        train_year: Reference YEAR of the rule scores
+        full: Ignore the store and run the model for every row
+
+    Returns:
+        Summary with 'rows', 'rescored' and 'reused' counts
+    """
+    bundle = load_bundle(bundle_path)
+    features = bundle['features']
+    feature_groups = list(bundle['feature_groups'])
+    meta = store_meta(bundle_path)
+
+    rows_lf = scoring_rows(pl.scan_parquet(input_path), min_members)
+    columns = rows_lf.collect_schema().names()
+    current = rows_lf.select(KEYS + [fingerprint_expr(features, columns)]).collect()
+
+    store = None if full else read_store(store_dir, meta)
+    if store is None:
+        reused = None
+        stale = current
+    else:
+        reused = store.join(current, on=KEYS + ['FINGERPRINT'], how='semi')
+        stale = current.join(reused, on=KEYS, how='anti')
+
+    outputs = [] if reused is None else [reused]
+    if stale.height:
+        store_dir.mkdir(parents=True, exist_ok=True)
+        pending = store_dir / 'pending.parquet'
+        fresh = store_dir / 'fresh.parquet'
+        try:
+            rows_lf.join(stale.lazy().select(KEYS), on=KEYS, how='semi').sink_parquet(pending)
+            ranges = batch_ranges(stale.height, batch_rows)
+            n_workers = max(1, min(workers or multiprocessing.cpu_count(), len(ranges)))
+            with process_pool(n_workers, _init_worker, (str(bundle_path), min_members)) as pool:
+                write_batches(
+                    pool.map(
+                        _explain_batch,
+                        [str(pending)] * len(ranges),
+                        [offset for offset, _ in ranges],
+                        [length for _, length in ranges],
+                    ),
+                    fresh,
+                    'rescore',
+                )
+            outputs.append(
+                pl.read_parquet(fresh).drop('ACTUAL').join(stale, on=KEYS, how='inner')
+            )
+        finally:
+            pending.unlink(missing_ok=True)
+            fresh.unlink(missing_ok=True)
+
+    if not outputs:
+        raise ValueError(f'No rows to score in {input_path}')
+    store = pl.concat(outputs, how='diagonal_relaxed').select(
+        KEYS + ['FINGERPRINT', *feature_groups, 'IVI_PROBA']
+    )
+    write_store(store_dir, store, meta)
+
+    # Cheap per-row work is redone for every row from the stored outputs
+    df = rows_lf.collect().join(
+        store.select(KEYS + ['IVI_PROBA']), on=KEYS, how='left', maintain_order='left'
+    )
+    reference = rule_reference(rows_lf, bundle['rule_features'], train_year)
+    scores = score_frame(df.drop('IVI_PROBA'), bundle, reference, df['IVI_PROBA'].to_numpy())
+    _write_atomic(scores, scores_path)
+
+    labels = df.select(KEYS + [
+        (pl.col(LABEL) if LABEL in df.columns else pl.lit(None, dtype=pl.Float64)).alias('ACTUAL')
+    ])
+    raw = labels.join(store.drop('FINGERPRINT'), on=KEYS, how='left', maintain_order='left').select(
+        KEYS + [*feature_groups, 'IVI_PROBA', 'ACTUAL']
+    )
+    finalize_subscores(raw.lazy(), shap_path, feature_groups)
+
+    return {'rows': df.height, 'rescored': stale.height, 'reused': df.height - stale.height}
@@ -0,0 +1,153 @@
+"""
+Contract segmentation as Polars expressions.
+
+Size segments, loss-ratio risk tiers, IVI risk levels, size and
+profitability classes and the combined 12-way SEGMENT are all built with
+cut / when-then expressions, so they run natively inside Polars plans
+instead of calling back into Python for every row. Shared by the notebooks,
+the scoring pipeline and the dashboard.
+"""
+
+from typing import Sequence, Union
+
+import polars as pl
+
+# Contract size segments (notebook 02): member count breaks, left-closed
+SIZE_SEGMENT_BREAKS = [50, 200, 1000, 5000]
+SIZE_SEGMENTS = ['Micro (<50)', 'Small (50-199)', 'Medium (200-999)', 'Large (1K-5K)', 'Enterprise (5K+)']
+
+# Loss ratio risk tiers (notebook 02): upper bounds, last tier open-ended
+RISK_TIER_BREAKS = [0.6, 0.85, 1.0, 1.3]
+RISK_TIERS = ['Low Risk', 'Moderate', 'Break-even', 'Elevated', 'High Risk']
+
+# IVI risk levels: IVI score upper bounds, last level open-ended
+IVI_RISK_BREAKS = [30, 60]
+IVI_RISK_LEVELS = ['HIGH_RISK', 'MODERATE_RISK', 'LOW_RISK']
+
+# Contracts with at least this many members are LARGE
+LARGE_CONTRACT_MEMBERS = 100
+
+# Loss ratio from which a contract is UNPROFITABLE
+UNPROFITABLE_LOSS_RATIO = 0.85
+
+# Segment priority ordering (1 = most urgent)
+SEGMENT_PRIORITY = {
+    'HIGH_RISK_LARGE_UNPROFITABLE': 1,
+    'HIGH_RISK_LARGE_PROFITABLE': 2,
+    'HIGH_RISK_SMALL_UNPROFITABLE': 3,
+    'HIGH_RISK_SMALL_PROFITABLE': 4,
+    'MODERATE_RISK_LARGE_UNPROFITABLE': 5,
+    'MODERATE_RISK_LARGE_PROFITABLE': 6,
+    'MODERATE_RISK_SMALL_UNPROFITABLE': 7,
+    'MODERATE_RISK_SMALL_PROFITABLE': 8,
+    'LOW_RISK_LARGE_UNPROFITABLE': 9,
+    'LOW_RISK_LARGE_PROFITABLE': 10,
+    'LOW_RISK_SMALL_UNPROFITABLE': 11,
+    'LOW_RISK_SMALL_PROFITABLE': 12,
+}
+
+FrameT = Union[pl.DataFrame, pl.LazyFrame]
+
+
+def _numeric(column: str) -> pl.Expr:
+    """Column as Float64 with NaN treated as missing."""
+    return pl.col(column).cast(pl.Float64).fill_nan(None)
+
+
+def _tiers(value: pl.Expr, breaks: Sequence[float], labels: Sequence[str]) -> pl.Expr:
+    """First label whose upper bound the value is below, else the last label."""
+    expr = pl.when(value < breaks[0]).then(pl.lit(labels[0]))
+    for bound, label in zip(breaks[1:], labels[1:]):
+        expr = expr.when(value < bound).then(pl.lit(label))
+    return expr.otherwise(pl.lit(labels[-1]))
+
+
+def size_segment_expr(members: str = 'TOTAL_MEMBERS') -> pl.Expr:
+    """SIZE_SEGMENT label from the member count (null when missing)."""
+    return pl.col(members).cut(
+        SIZE_SEGMENT_BREAKS, labels=SIZE_SEGMENTS, left_closed=True
+    ).cast(pl.Utf8).alias('SIZE_SEGMENT')
+
+
+def risk_tier_expr(loss_ratio: str = 'LOSS_RATIO') -> pl.Expr:
+    """RISK_TIER label from the loss ratio (missing ratios are 'High Risk')."""
+    return _tiers(pl.col(loss_ratio), RISK_TIER_BREAKS, RISK_TIERS).alias('RISK_TIER')
+
+
+def ivi_risk_expr(ivi_score: str = 'IVI_SCORE') -> pl.Expr:
+    """IVI_RISK level from the IVI score (missing scores are LOW_RISK)."""
+    return _tiers(pl.col(ivi_score), IVI_RISK_BREAKS, IVI_RISK_LEVELS).alias('IVI_RISK')
+
+
+def size_class_expr(members: str = 'TOTAL_MEMBERS') -> pl.Expr:
+    """SIZE_CLASS: LARGE from LARGE_CONTRACT_MEMBERS members, else SMALL."""
+    return pl.when(_numeric(members) >= LARGE_CONTRACT_MEMBERS).then(
+        pl.lit('LARGE')
+    ).otherwise(pl.lit('SMALL')).alias('SIZE_CLASS')
+
+
+def profit_class_expr(loss_ratio: str = 'LOSS_RATIO') -> pl.Expr:
+    """PROFIT_CLASS: UNPROFITABLE from UNPROFITABLE_LOSS_RATIO, else PROFITABLE."""
+    return pl.when(_numeric(loss_ratio) >= UNPROFITABLE_LOSS_RATIO).then(
+        pl.lit('UNPROFITABLE')
+    ).otherwise(pl.lit('PROFITABLE')).alias('PROFIT_CLASS')
+
+
+def segment_expr(
+    ivi_risk: str = 'IVI_RISK',
+    size_class: str = 'SIZE_CLASS',
+    profit_class: str = 'PROFIT_CLASS',
+) -> pl.Expr:
+    """Combined SEGMENT (e.g. 'HIGH_RISK_LARGE_UNPROFITABLE')."""
+    return pl.concat_str(
+        [pl.col(ivi_risk), pl.col(size_class), pl.col(profit_class)], separator='_'
+    ).alias('SEGMENT')
+
+
+def segment_priority_expr(segment: str = 'SEGMENT') -> pl.Expr:
+    """SEGMENT_PRIORITY rank of the segment (99 for unknown segments)."""
+    return pl.col(segment).replace_strict(
+        SEGMENT_PRIORITY, default=99, return_dtype=pl.Int32
+    ).alias('SEGMENT_PRIORITY')
+
+
+def label_order_expr(column: str, labels: Sequence[str]) -> pl.Expr:
+    """Position of each label in an ordered list (99 for others), for sorting."""
+    return pl.col(column).replace_strict(
+        {label: i for i, label in enumerate(labels)}, default=99, return_dtype=pl.Int64
+    ).alias('order')
+
+
+def add_segments(df: FrameT) -> FrameT:
+    """
+    Add IVI_RISK, SIZE_CLASS, PROFIT_CLASS and SEGMENT to scored rows.
+
+    SIZE_CLASS and PROFIT_CLASS are 'UNKNOWN' when TOTAL_MEMBERS or
+    LOSS_RATIO is not present.
+
+    Args:
+        df: DataFrame or LazyFrame with IVI_SCORE
+
+    Returns:
+        Frame of the same kind with the segment columns
+    """
+    columns = df.collect_schema().names()
+    return df.with_columns([
+        ivi_risk_expr(),
+        size_class_expr() if 'TOTAL_MEMBERS' in columns else pl.lit('UNKNOWN').alias('SIZE_CLASS'),
+        profit_class_expr() if 'LOSS_RATIO' in columns else pl.lit('UNKNOWN').alias('PROFIT_CLASS'),
+    ]).with_columns(segment_expr())
+
+
+def add_contract_tiers(df: FrameT) -> FrameT:
+    """
+    Add SIZE_SEGMENT and RISK_TIER to contract-level rows.
+
+    Args:
+        df: DataFrame or LazyFrame with TOTAL_MEMBERS and LOSS_RATIO
+
+    Returns:
+        Frame of the same kind with the tier columns
+    """
+    return df.with_columns([size_segment_expr(), risk_tier_expr()])
+
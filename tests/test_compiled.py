@@ -0,0 +1,68 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+lgb = pytest.importorskip('lightgbm')
+
+from pipeline.scoring import compiled
+
+
+def _training_data(seed: int = 0):
+    """Random features with NaN and exact zeros, so missing routing is exercised."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(600, 6))
+    X[rng.random(X.shape) < 0.1] = np.nan
+    X[rng.random(X.shape) < 0.1] = 0.0
+    y = ((np.nan_to_num(X[:, 0]) + np.nan_to_num(X[:, 1]) * X[:, 2].clip(-1, 1)) > 0).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'zero_as_missing': True},
+    {'objective': 'binary', 'sigmoid': 0.7},
+])
+def test_compiled_matches_booster(params):
+    X, y = _training_data()
+    model = lgb.LGBMClassifier(n_estimators=40, num_leaves=15, verbose=-1, **params)
+    model.fit(X, y)
+    ensemble = compiled.export_ensemble(model)
+
+    expected = model.booster_.predict(X)
+    np.testing.assert_allclose(compiled.predict_proba(ensemble, X), expected, rtol=0, atol=1e-12)
+    np.testing.assert_allclose(model.predict_proba(X)[:, 1], expected, rtol=0, atol=1e-12)
+    assert compiled.check_ensemble(ensemble, model.booster_, X) <= 1e-12
+
+
+def test_numpy_kernel_matches_loop():
+    X, y = _training_data(1)
+    model = lgb.LGBMClassifier(n_estimators=20, verbose=-1).fit(X, y)
+    ensemble = compiled.export_ensemble(model)
+    arrays = [ensemble[k] for k in compiled.ARRAY_KEYS]
+
+    np.testing.assert_allclose(
+        compiled._raw_score_numpy(X, *arrays),
+        compiled._raw_score_loop(X, *arrays),
+        rtol=0, atol=1e-12,
+    )
+
+
+def test_best_iteration_is_used():
+    X, y = _training_data(2)
+    model = lgb.LGBMClassifier(n_estimators=200, verbose=-1)
+    model.fit(X[:400], y[:400], eval_set=[(X[400:], y[400:])], callbacks=[lgb.early_stopping(5, verbose=False)])
+    ensemble = compiled.export_ensemble(model)
+
+    np.testing.assert_allclose(
+        compiled.predict_proba(ensemble, X), model.predict_proba(X)[:, 1], rtol=0, atol=1e-12
+    )
+
+
+def test_check_ensemble_rejects_mismatch():
+    X, y = _training_data(3)
+    model = lgb.LGBMClassifier(n_estimators=10, verbose=-1).fit(X, y)
+    ensemble = compiled.export_ensemble(model)
+    ensemble['default_left'] = ~ensemble['default_left']
+    ensemble['threshold'] = ensemble['threshold'] + 0.5
+
+    with pytest.raises(ValueError):
+        compiled.check_ensemble(ensemble, model.booster_, X)
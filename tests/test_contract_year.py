@@ -0,0 +1,132 @@
+import datetime as dt
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pl = pytest.importorskip('polars')
+
+from pipeline import contract_year as cy
+
+
+def _calls(seed: int, n: int = 400) -> pl.DataFrame:
+    """Random call rows over a few contract-years, with null resolution dates."""
+    rng = np.random.default_rng(seed)
+    created = [dt.datetime(2022, 1, 1) + dt.timedelta(days=int(d)) for d in rng.integers(0, 700, n)]
+    updated = [
+        None if rng.random() < 0.05 else c + dt.timedelta(days=int(d))
+        for c, d in zip(created, rng.integers(0, 30, n))
+    ]
+    return pl.DataFrame({
+        'CONT_NO': rng.choice(['A', 'B', 'C', 'D'], n),
+        'CONT_YYMM': [c.strftime('%Y%m') for c in created],
+        'CRT_DATE': created,
+        'UPD_DATE': pl.Series(updated, dtype=pl.Datetime('us')),
+        'CALL_ID': rng.integers(0, 300, n),
+        'MBR_NO': rng.integers(0, 50, n),
+        'CALL_CAT': rng.choice(['X', 'Y', 'Z'], n),
+    })
+
+
+def _claims(seed: int, n: int = 400) -> pl.DataFrame:
+    """Random claim lines with continuous, skewed amounts."""
+    rng = np.random.default_rng(seed)
+    incurred = [dt.datetime(2022, 1, 1) + dt.timedelta(days=int(d)) for d in rng.integers(0, 700, n)]
+    return pl.DataFrame({
+        'CONT_NO': rng.choice(['A', 'B', 'C'], n),
+        'CONT_YYMM': [c.strftime('%Y%m') for c in incurred],
+        'INCUR_DATE_FROM': incurred,
+        'VOU_NO': rng.integers(0, 200, n),
+        'ADHERENT_NO': rng.integers(0, 40, n),
+        'PROV_CODE': rng.integers(0, 10, n),
+        'DIAG_CODE': rng.integers(0, 30, n),
+        'SUM_OF_NETBILLED': rng.lognormal(5, 1, n),
+    })
+
+
+def _from_states(parts, source: str) -> pl.DataFrame:
+    """Features from the partial states of each part merged in turn."""
+    states = {}
+    for part in parts:
+        for name, state in cy.partial_states(part.lazy(), source).items():
+            states[name] = cy.merge_states(states[name], state, name, source) if name in states else state
+    return cy.finalize_states(states, source).collect().sort(cy.KEYS)
+
+
+def _direct(parts, source: str) -> pl.DataFrame:
+    rows = cy.prepare_rows(pl.concat(parts).lazy(), source)
+    return rows.group_by(cy.KEYS).agg(cy.aggregate_exprs(source)).collect().sort(cy.KEYS)
+
+
+def test_median_from_states_is_exact():
+    parts = [_calls(0), _calls(1), _calls(2, n=7)]
+    merged = _from_states(parts, 'calls')
+    direct = _direct(parts, 'calls')
+
+    assert merged['MEDIAN_RESOLUTION_DAYS'].to_list() == direct['MEDIAN_RESOLUTION_DAYS'].to_list()
+    assert merged['MEDIAN_RESOLUTION_DAYS'].null_count() < merged.height
+
+
+def test_sketch_quantile_within_accuracy():
+    parts = [_claims(0), _claims(1)]
+    merged = _from_states(parts, 'claims')
+    direct = _direct(parts, 'claims')
+
+    sketched = merged['P90_CLAIM_AMOUNT'].to_numpy()
+    exact = direct['P90_CLAIM_AMOUNT'].to_numpy()
+    assert np.all(np.abs(sketched - exact) <= cy.SKETCH_ACCURACY * np.abs(exact) + 1e-9)
+
+
+@pytest.mark.parametrize('source, parts', [
+    ('calls', [_calls(3), _calls(4)]),
+    ('claims', [_claims(3), _claims(4)]),
+])
+def test_states_match_direct_aggregation(source, parts):
+    merged = _from_states(parts, source)
+    direct = _direct(parts, source)
+    assert merged.columns == direct.columns
+
+    sketched = {out for out, kind, *_ in cy.CONTRACT_YEAR_SPECS[source]['aggregates'] if kind == 'quantile'}
+    for col in merged.columns:
+        if col in sketched:
+            continue
+        if merged[col].dtype.is_float():
+            np.testing.assert_allclose(merged[col].to_numpy(), direct[col].to_numpy(), rtol=1e-9)
+        else:
+            assert merged[col].to_list() == direct[col].to_list(), col
+
+
+def _write_part(cache_dir, source, rows, name):
+    path = cy.dataset_dir(cache_dir, source) / 'YEAR=2022' / 'MONTH=01' / f'{name}.parquet'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows.write_parquet(path)
+
+
+def test_crashed_update_merges_nothing_twice(tmp_path, monkeypatch):
+    parts = [_calls(5), _calls(6)]
+    _write_part(tmp_path, 'calls', parts[0], 'a')
+    cy.update_contract_year_state('calls', tmp_path)
+    _write_part(tmp_path, 'calls', parts[1], 'b')
+
+    # Crash after some state files of the new version are written
+    written = []
+    original = pl.DataFrame.write_parquet
+
+    def crash(self, *args, **kwargs):
+        written.append(args)
+        if len(written) == 3:
+            raise OSError('disk full')
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(pl.DataFrame, 'write_parquet', crash)
+    with pytest.raises(OSError):
+        cy.update_contract_year_state('calls', tmp_path)
+    monkeypatch.setattr(pl.DataFrame, 'write_parquet', original)
+
+    assert cy.update_contract_year_state('calls', tmp_path)['parts'] == ['YEAR=2022/MONTH=01/b.parquet']
+    merged = cy.load_contract_year_features('calls', tmp_path).sort(cy.KEYS)
+    direct = _direct(parts, 'calls')
+    assert merged['TOTAL_CALLS'].to_list() == direct['TOTAL_CALLS'].to_list()
+    assert merged['MEDIAN_RESOLUTION_DAYS'].to_list() == direct['MEDIAN_RESOLUTION_DAYS'].to_list()
+    assert [p.name for p in cy.state_dir(tmp_path, 'calls').iterdir() if p.is_dir()] == [
+        cy.current_state_dir(tmp_path, 'calls').name
+    ]
@@ -0,0 +1,51 @@
+import os
+import time
+
+import pytest
+
+pl = pytest.importorskip('polars')
+pytest.importorskip('streamlit')
+
+from dashboard.utils import data_loader
+
+
+@pytest.fixture
+def scores(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, 'CACHE_DIR', tmp_path / 'cache')
+    return tmp_path / 'ivi_scores_all_years.parquet'
+
+
+def _write(path, value, mtime):
+    pl.DataFrame({'X': [value]}).write_parquet(path)
+    os.utime(path, (mtime, mtime))
+    return data_loader.file_fingerprint(path)
+
+
+def test_mirror_is_never_built_from_another_version(scores):
+    old = _write(scores, 1, 1_000)
+    new = _write(scores, 2, 2_000)
+
+    with pytest.raises(ValueError):
+        data_loader._shared_ipc_path(scores, old)
+    mirror = data_loader._shared_ipc_path(scores, new)
+    assert pl.read_ipc(mirror)['X'].to_list() == [2]
+
+
+def test_prune_keeps_newer_and_recent_mirrors(scores, monkeypatch):
+    old = _write(scores, 1, 1_000)
+    old_mirror = data_loader._shared_ipc_path(scores, old)
+    os.utime(old_mirror, (time.time() - 60, time.time() - 60))
+    new = _write(scores, 2, 2_000)
+    new_mirror = data_loader._shared_ipc_path(scores, new)
+
+    # The new version was just published: the old mirror is kept for a while
+    data_loader.prune_mirrors(scores, new)
+    assert old_mirror.exists()
+
+    monkeypatch.setattr(data_loader, 'MIRROR_RETENTION_SECONDS', 0)
+    # A process still serving the old version never deletes the newer mirror
+    data_loader.prune_mirrors(scores, old)
+    assert new_mirror.exists()
+
+    data_loader.prune_mirrors(scores, new)
+    assert not old_mirror.exists() and new_mirror.exists()
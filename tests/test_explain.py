@@ -0,0 +1,28 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pl = pytest.importorskip('polars')
+lgb = pytest.importorskip('lightgbm')
+
+from pipeline.scoring.explain import explain_frame, group_matrix
+
+
+@pytest.mark.parametrize('params', [{}, {'objective': 'binary', 'sigmoid': 0.7}])
+def test_explain_frame_proba_matches_model(params):
+    rng = np.random.default_rng(0)
+    features = ['F0', 'F1', 'F2', 'F3']
+    X = rng.normal(size=(300, len(features)))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int)
+    model = lgb.LGBMClassifier(n_estimators=30, num_leaves=7, verbose=-1, **params)
+    model.fit(X, y)
+
+    feature_groups = {'H_HEALTH': ['F0', 'F1'], 'E_EXPERIENCE': ['F2'], 'U_UTILIZATION': ['F3']}
+    bundle = {'model': model, 'features': features, 'feature_groups': feature_groups}
+    df = pl.DataFrame({
+        'CONTRACT_NO': [str(i) for i in range(len(X))],
+        'YEAR': ['2022'] * len(X),
+        **{f: X[:, j] for j, f in enumerate(features)},
+    })
+
+    out = explain_frame(df, bundle, group_matrix(features, feature_groups))
+    np.testing.assert_allclose(out['IVI_PROBA'].to_numpy(), model.booster_.predict(X), atol=1e-12)
@@ -0,0 +1,34 @@
+import pytest
+
+go = pytest.importorskip('plotly.graph_objects')
+plotly = pytest.importorskip('plotly')
+
+from dashboard.components import figure_cache
+
+
+@pytest.mark.parametrize('a, b', [
+    (['1', '2'], [1, 2]),
+    ([True], [1]),
+    ([1, 2], [1.5, 2]),
+    (['a', 1], ['a', '1']),
+])
+def test_fingerprint_tells_values_apart(a, b):
+    assert figure_cache.figure_fingerprint('f', (a,), {}) != figure_cache.figure_fingerprint('f', (b,), {})
+
+
+def test_cached_figure_skips_rebuild():
+    figure_cache.clear_figure_cache()
+    calls = []
+
+    @figure_cache.cache_figure
+    def bar(values):
+        calls.append(values)
+        return go.Figure(go.Bar(y=values))
+
+    first, second = bar([1, 2, 3]), bar([1, 2, 3])
+    assert len(calls) == 1
+
+    # st.plotly_chart's conversion takes the cached spec as is, without a rebuild
+    spec = plotly.tools.return_figure_from_figure_or_data(second, validate_figure=True)
+    assert spec is second.to_dict()
+    assert spec['data'][0]['y'] == first.to_dict()['data'][0]['y'] == [1, 2, 3]
@@ -0,0 +1,34 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pl = pytest.importorskip('polars')
+
+from dashboard.utils.recommendations import format_number_expr
+
+
+def _values() -> list:
+    """Random magnitudes plus exact ties and specials."""
+    rng = np.random.default_rng(0)
+    random = rng.normal(size=2000) * 10.0 ** rng.integers(-3, 8, 2000)
+    ties = [k / 2 for k in range(-20, 21)] + [k / 8 for k in range(-40, 41)]
+    specials = [-0.0, float('nan'), float('inf'), float('-inf')]
+    return [float(v) for v in random] + ties + specials
+
+
+@pytest.mark.parametrize('fmt', ['.0f', '.1f', '.2f', ',.0f', ',.2f', '.0%', '.1%'])
+def test_format_number_expr_matches_format(fmt):
+    values = _values()
+    out = pl.DataFrame({'x': values}).select(format_number_expr(pl.col('x'), fmt)).to_series().to_list()
+    assert out == [f'{v:{fmt}}' for v in values]
+
+
+def test_format_number_expr_keeps_nulls():
+    out = pl.DataFrame({'x': [1.5, None]}).select(format_number_expr(pl.col('x'), '.1f')).to_series()
+    assert out.to_list() == ['1.5', None]
+
+
+def test_format_number_expr_near_ties_within_last_digit():
+    # Values stored just off a tie may round either way
+    values = [0.285, 2.675, 1.005, 0.045, -0.015]
+    out = pl.DataFrame({'x': values}).select(format_number_expr(pl.col('x'), '.2f')).to_series().to_list()
+    assert all(abs(float(o) - float(f'{v:.2f}')) <= 0.01 + 1e-12 for o, v in zip(out, values))